@@ -1,10 +1,14 @@
-from fastapi import APIRouter
-from app.api import questions, answers, sessions, reports
+from fastapi import APIRouter, Depends
+from app.api import questions, answers, sessions, reports, exports, jobs
+from app.services.question_bank import question_bank
 
-router = APIRouter()
+# 處理請求前確認記憶體題庫與資料庫的題庫修訂號一致
+router = APIRouter(dependencies=[Depends(question_bank.ensure_current)])
 
 # 包含所有 API 路由
 router.include_router(questions.router, prefix="/api/v1", tags=["questions"])
 router.include_router(answers.router, prefix="/api/v1", tags=["answers"])
 router.include_router(sessions.router, prefix="/api/v1", tags=["sessions"])
 router.include_router(reports.router, prefix="/api/v1", tags=["reports"])
+router.include_router(exports.router, prefix="/api/v1", tags=["exports"])
+router.include_router(jobs.router, prefix="/api/v1", tags=["jobs"])
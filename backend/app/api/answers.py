@@ -1,56 +1,81 @@
-from fastapi import APIRouter, HTTPException
-import sqlite3
-import json
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
+from ..repositories import answers as answer_repo
+from ..repositories.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor
 from ..schemas.answer import AnswerCreate, AnswerResponse, AnswerListResponse, TestSubmission, TestSubmissionResponse
+from ..services.question_bank import question_bank
+from ..services.report_store import materialize_reports
 
 router = APIRouter()
 
+# 一份測驗的題數（與出題數量相同）
+QUESTIONS_PER_TEST = 30
+
 @router.post("/answers/submit", response_model=TestSubmissionResponse)
-def submit_test_answers(submission: TestSubmission):
+async def submit_test_answers(submission: TestSubmission, background_tasks: BackgroundTasks):
     """提交測驗答案"""
     try:
-        conn = sqlite3.connect('personality_test.db')
-        cursor = conn.cursor()
-        
         # 前端測驗類型到後端測驗類型的映射（現在直接使用實際的測驗類型）
         test_type_mapping = {
             "mbti": "MBTI",
-            "disc": "DISC", 
+            "disc": "DISC",
             "big5": "BIG5",
             "enneagram": "enneagram"
         }
-        
+
         # 獲取實際的後端測驗類型
         backend_test_type = test_type_mapping.get(submission.test_type, submission.test_type)
-        
-        # 檢查該測驗類型的總題目數
-        cursor.execute("SELECT COUNT(*) FROM test_question WHERE test_type = ?", (backend_test_type,))
-        total_questions = cursor.fetchone()[0]
-        
+
+        # 題目數量與 ID 皆由記憶體題庫取得，不需查詢資料庫
+        total_questions = question_bank.count(backend_test_type)
+
         if total_questions == 0:
             raise HTTPException(status_code=404, detail=f"找不到 {submission.test_type} 類型的題目")
-        
-        # 插入答案
-        answered_count = 0
+
+        # 寫入前先驗證整批答案（缺少欄位的項目略過，題目不存在或不屬於此測驗類型則整批拒絕）
+        valid_answers = []
+        unknown_question_ids = []
+        mismatched_question_ids = []
         for answer_data in submission.answers:
             question_id = answer_data.get("question_id")
             answer = answer_data.get("answer")
-            
-            if question_id and answer:
-                cursor.execute("""
-                    INSERT INTO test_answer (user_id, question_id, answer, session_id, created_at)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (submission.user_id, question_id, answer, submission.session_id, datetime.now()))
-                answered_count += 1
-        
-        conn.commit()
-        conn.close()
-        
+
+            if not question_id or not answer:
+                continue
+            try:
+                question_id = int(question_id)
+            except (TypeError, ValueError):
+                unknown_question_ids.append(question_id)
+                continue
+            question = question_bank.get(question_id)
+            if question is None:
+                unknown_question_ids.append(question_id)
+                continue
+            if question.test_type != backend_test_type:
+                # 其他測驗的題目會被計入本測驗的累計分數，不可混入
+                mismatched_question_ids.append(question_id)
+                continue
+            valid_answers.append((question_id, str(answer)))
+
+        if unknown_question_ids:
+            raise HTTPException(status_code=400, detail=f"包含不存在的題目：{unknown_question_ids[:10]}")
+        if mismatched_question_ids:
+            raise HTTPException(
+                status_code=400,
+                detail=f"包含不屬於 {submission.test_type} 的題目：{mismatched_question_ids[:10]}"
+            )
+
+        # 整批以單一交易寫入
+        answered_count = await answer_repo.insert_answers(submission.user_id, valid_answers, submission.session_id)
+
+        # 整批提交完成一份測驗時，於背景將該測驗的分析結果寫入 test_report
+        if answered_count >= min(QUESTIONS_PER_TEST, total_questions):
+            background_tasks.add_task(materialize_reports, submission.user_id, [backend_test_type])
+
         completion_rate = (answered_count / total_questions) * 100 if total_questions > 0 else 0
-        
+
         return TestSubmissionResponse(
             user_id=submission.user_id,
             test_type=submission.test_type,
@@ -59,12 +84,14 @@ def submit_test_answers(submission: TestSubmission):
             completion_rate=completion_rate,
             message=f"成功提交 {answered_count} 題答案"
         )
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"提交失敗：{str(e)}")
 
 @router.post("/answers/")
-def submit_single_answer(data: Dict[str, Any]):
+async def submit_single_answer(data: Dict[str, Any]):
     """
     單題答案提交
     """
@@ -75,35 +102,26 @@ def submit_single_answer(data: Dict[str, Any]):
         session_id = data.get("session_id")  # 新增 session_id 支援
         if not user_id or not question_id or not answer:
             raise HTTPException(status_code=400, detail="缺少必要參數")
-        conn = sqlite3.connect('personality_test.db')
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO test_answer (user_id, question_id, answer, session_id, created_at) VALUES (?, ?, ?, ?, ?)",
-            (user_id, question_id, answer, session_id, datetime.now())
-        )
-        conn.commit()
-        conn.close()
+        await answer_repo.insert_answer(user_id, question_id, answer, session_id)
         return {"message": "答案提交成功"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"提交失敗：{str(e)}")
 
 @router.get("/answers/{user_id}", response_model=AnswerListResponse)
-def get_user_answers(user_id: str):
-    """取得用戶的所有答案"""
+async def get_user_answers(
+    user_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """取得用戶的答案（新到舊；指定 limit 時以 cursor 分頁）"""
     try:
-        conn = sqlite3.connect('personality_test.db')
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, user_id, question_id, answer, created_at 
-            FROM test_answer 
-            WHERE user_id = ? 
-            ORDER BY created_at DESC
-        """, (user_id,))
-        
-        answers = cursor.fetchall()
-        conn.close()
-        
+        after = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        answers, next_key = await answer_repo.list_user_answers(user_id, limit, after)
+
         answer_list = []
         for a in answers:
             answer_list.append(AnswerResponse(
@@ -113,76 +131,55 @@ def get_user_answers(user_id: str):
                 answer=a[3],
                 created_at=datetime.fromisoformat(a[4])
             ))
-        
+
         return AnswerListResponse(
             answers=answer_list,
             total=len(answer_list),
-            user_id=user_id
+            user_id=user_id,
+            next_cursor=encode_cursor(next_key) if next_key else None
         )
-        
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"查詢失敗：{str(e)}")
 
 @router.get("/answers/{user_id}/{test_type}")
-def get_user_answers_by_type(user_id: str, test_type: str):
-    """取得用戶特定測驗類型的答案"""
+async def get_user_answers_by_type(
+    user_id: str,
+    test_type: str,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """取得用戶特定測驗類型的答案（新到舊；指定 limit 時以 cursor 分頁）"""
     try:
-        conn = sqlite3.connect('personality_test.db')
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT ta.id, ta.user_id, ta.question_id, ta.answer, ta.created_at,
-                   tq.text, tq.category, tq.test_type
-            FROM test_answer ta
-            JOIN test_question tq ON ta.question_id = tq.id
-            WHERE ta.user_id = ? AND tq.test_type = ?
-            ORDER BY ta.created_at DESC
-        """, (user_id, test_type))
-        
-        answers = cursor.fetchall()
-        conn.close()
-        
-        answer_list = []
-        for a in answers:
-            answer_list.append({
-                "id": a[0],
-                "user_id": a[1],
-                "question_id": a[2],
-                "answer": a[3],
-                "created_at": a[4],
-                "text": a[5],
-                "category": a[6],
-                "test_type": a[7]
-            })
-        
+        after = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        answer_list, next_key = await answer_repo.list_user_answers_by_type(user_id, test_type, limit, after)
+
         return {
             "answers": answer_list,
             "total": len(answer_list),
             "user_id": user_id,
-            "test_type": test_type
+            "test_type": test_type,
+            "next_cursor": encode_cursor(next_key) if next_key else None
         }
-        
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"查詢失敗：{str(e)}")
 
 @router.delete("/answers/{user_id}")
-def delete_user_answers(user_id: str):
+async def delete_user_answers(user_id: str):
     """刪除用戶的所有答案"""
     try:
-        conn = sqlite3.connect('personality_test.db')
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM test_answer WHERE user_id = ?", (user_id,))
-        deleted_count = cursor.rowcount
-        
-        conn.commit()
-        conn.close()
-        
+        deleted_count = await answer_repo.delete_user_answers(user_id)
+
         return {
             "message": f"成功刪除 {deleted_count} 筆答案",
             "deleted_count": deleted_count,
             "user_id": user_id
         }
-        
+
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"刪除失敗：{str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"刪除失敗：{str(e)}")
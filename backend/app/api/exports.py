@@ -0,0 +1,60 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from ..services.export import (
+    ANSWER_EXPORT_COLUMNS,
+    EXPORT_FORMATS,
+    SESSION_EXPORT_COLUMNS,
+    build_answer_query,
+    build_session_query,
+    stream_export,
+)
+
+router = APIRouter()
+
+_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8"
+}
+
+def _streaming_response(sql, params, columns, format: str, filename: str) -> StreamingResponse:
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"不支援的匯出格式：{format}（可用：{', '.join(EXPORT_FORMATS)}）")
+
+    return StreamingResponse(
+        stream_export(sql, params, columns, format),
+        media_type=_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'}
+    )
+
+@router.get("/export/answers")
+async def export_answers(
+    format: str = "ndjson",
+    user_id: Optional[str] = None,
+    test_type: Optional[str] = None,
+    session_id: Optional[int] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None
+):
+    """串流匯出答案（NDJSON / CSV），可依用戶、測驗類型、session 與日期範圍篩選"""
+    try:
+        sql, params = build_answer_query(user_id, test_type, session_id, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _streaming_response(sql, params, ANSWER_EXPORT_COLUMNS, format, "answers")
+
+@router.get("/export/sessions")
+async def export_sessions(
+    format: str = "ndjson",
+    user_id: Optional[str] = None,
+    test_type: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None
+):
+    """串流匯出測驗 session（NDJSON / CSV），可依用戶、測驗類型與日期範圍篩選"""
+    try:
+        sql, params = build_session_query(user_id, test_type, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _streaming_response(sql, params, SESSION_EXPORT_COLUMNS, format, "sessions")
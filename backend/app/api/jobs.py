@@ -0,0 +1,74 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Any
+import logging
+
+from ..core.responses import ORJSONResponse, raw_fragment
+from ..schemas.report import ReportJobBatchRequest, ReportJobRequest
+from ..services.report_batch import REPORT_BATCH_MAX_USERS
+from ..services.report_jobs import (
+    MAX_JOB_PRIORITY,
+    MIN_JOB_PRIORITY,
+    REPORT_JOB_BULK_PRIORITY,
+    REPORT_JOB_MAX_WAIT,
+    report_job_queue,
+)
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+def _check_priority(priority: int) -> int:
+    if not MIN_JOB_PRIORITY <= priority <= MAX_JOB_PRIORITY:
+        raise HTTPException(status_code=400, detail=f"priority 必須介於 {MIN_JOB_PRIORITY} 與 {MAX_JOB_PRIORITY} 之間")
+    return priority
+
+def _check_queue_running() -> None:
+    if not report_job_queue.running:
+        raise HTTPException(status_code=503, detail="報告工作佇列未啟動")
+
+@router.post("/jobs/reports", status_code=202)
+async def create_report_job(request: ReportJobRequest) -> Dict[str, Any]:
+    """提交報告生成工作，回傳工作 ID（同一用戶已有等待中的工作時回傳該工作）"""
+    priority = _check_priority(request.priority if request.priority is not None else MIN_JOB_PRIORITY)
+    _check_queue_running()
+    try:
+        job_id, deduplicated = await report_job_queue.enqueue(request.user_id, priority)
+        return {"job_id": job_id, "user_id": request.user_id, "deduplicated": deduplicated}
+    except Exception as e:
+        logger.error(f"提交報告工作時發生錯誤: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"提交報告工作失敗: {str(e)}")
+
+@router.post("/jobs/reports/batch", status_code=202)
+async def create_report_jobs(request: ReportJobBatchRequest) -> Dict[str, Any]:
+    """一次提交多位用戶的報告工作（預設為批量優先順序，不影響互動請求）"""
+    if not request.user_ids:
+        raise HTTPException(status_code=400, detail="user_ids 不可為空")
+    if len(request.user_ids) > REPORT_BATCH_MAX_USERS:
+        raise HTTPException(status_code=400, detail=f"單次最多 {REPORT_BATCH_MAX_USERS} 位用戶")
+    priority = _check_priority(request.priority if request.priority is not None else REPORT_JOB_BULK_PRIORITY)
+    _check_queue_running()
+    try:
+        jobs = []
+        for user_id in dict.fromkeys(request.user_ids):
+            job_id, deduplicated = await report_job_queue.enqueue(user_id, priority)
+            jobs.append({"job_id": job_id, "user_id": user_id, "deduplicated": deduplicated})
+        return {"jobs": jobs}
+    except Exception as e:
+        logger.error(f"提交批次報告工作時發生錯誤: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"提交報告工作失敗: {str(e)}")
+
+@router.get("/jobs/{job_id}")
+async def get_report_job(job_id: int, wait: float = Query(0, ge=0, le=REPORT_JOB_MAX_WAIT)) -> ORJSONResponse:
+    """查詢工作狀態；wait > 0 時工作結束前最多等待 wait 秒（長輪詢）。完成的工作附上報告"""
+    try:
+        job = await report_job_queue.wait(job_id, wait)
+    except Exception as e:
+        logger.error(f"查詢報告工作時發生錯誤: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"查詢報告工作失敗: {str(e)}")
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="找不到報告工作")
+    result = job.pop("result")
+    job = {"job_id": job.pop("id"), **job}
+    # 報告以已編碼的 JSON 保存，直接拼接不再解析
+    job["report"] = raw_fragment(result.encode("utf-8")) if result is not None else None
+    return ORJSONResponse(job)
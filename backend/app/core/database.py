@@ -1,22 +1,462 @@
-from sqlalchemy import create_engine
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
+
+import aiosqlite
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 # 資料庫 URL
 SQLALCHEMY_DATABASE_URL = "sqlite:///./personality_test.db"
 
+# 原生 SQLite 連線池設定（可由環境變數調整）
+SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", "personality_test.db")
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+SQLITE_POOL_TIMEOUT = float(os.getenv("SQLITE_POOL_TIMEOUT", "30"))
+SQLITE_STATEMENT_CACHE_SIZE = int(os.getenv("SQLITE_STATEMENT_CACHE_SIZE", "256"))
+SQLITE_PRAGMA_PROFILE = os.getenv("SQLITE_PRAGMA_PROFILE", "throughput")
+
+# SQLite PRAGMA 設定檔
+# - durable: WAL + FULL 同步，每次提交都落盤，適合正式環境重視資料安全
+# - throughput: WAL + NORMAL 同步，讀寫互不阻塞，斷電最多遺失最後幾筆交易（預設）
+# - bench: 關閉同步並加大快取，僅供壓力測試使用
+PRAGMA_PROFILES: Dict[str, Dict[str, Union[str, int]]] = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "mmap_size": 0,
+        "cache_size": -8000,
+        "temp_store": "MEMORY",
+    },
+    "throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 268435456,
+        "cache_size": -64000,
+        "temp_store": "MEMORY",
+    },
+    "bench": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "busy_timeout": 10000,
+        "mmap_size": 1073741824,
+        "cache_size": -256000,
+        "temp_store": "MEMORY",
+    },
+}
+
+# 必須在交易外設定、且對整個資料庫檔案生效的 PRAGMA
+_DATABASE_PRAGMAS = ("journal_mode",)
+
+
+def get_pragma_profile(name: Optional[str] = None) -> Dict[str, Union[str, int]]:
+    """取得指定名稱的 PRAGMA 設定檔（預設使用 SQLITE_PRAGMA_PROFILE）"""
+    profile_name = name or SQLITE_PRAGMA_PROFILE
+    if profile_name not in PRAGMA_PROFILES:
+        raise ValueError(f"未知的 PRAGMA 設定檔：{profile_name}（可用：{', '.join(PRAGMA_PROFILES)}）")
+    return PRAGMA_PROFILES[profile_name]
+
+
+def apply_pragmas(conn, profile: Optional[str] = None, include_database: bool = True) -> None:
+    """對連線套用 PRAGMA 設定檔
+
+    include_database=False 時略過 journal_mode 這類寫入資料庫檔案的設定，
+    一般連線只需套用連線層級的設定；資料庫層級的設定由 init_db() 負責。
+    """
+    for key, value in get_pragma_profile(profile).items():
+        if key in _DATABASE_PRAGMAS and not include_database:
+            continue
+        conn.execute(f"PRAGMA {key} = {value}")
+
+
+# 熱門查詢所需的索引：(索引名稱, 資料表, 欄位)
+# - test_answer(user_id, question_id, answer)：計分 JOIN 的覆蓋索引，不需回表
+# - test_answer(session_id)：get_latest_session 取得已回答題目
+# - test_session(user_id, test_type, started_at)：最新 session 查詢與 ORDER BY started_at
+# - test_question(test_type, category)：依類型與分類取題
+# - test_report(user_id, test_type)：讀取與取代實體化報告
+# - test_answer(user_id, created_at, id)、test_session(user_id, started_at, id)：答案與 session 列表的 keyset 分頁
+# - report_job(status, priority, id)：依優先順序取出等待中的工作；report_job(user_id, status)：合併重複的工作
+REQUIRED_INDEXES: Tuple[Tuple[str, str, Tuple[str, ...]], ...] = (
+    ("ix_test_answer_user_question", "test_answer", ("user_id", "question_id", "answer")),
+    ("ix_test_answer_session", "test_answer", ("session_id",)),
+    ("ix_test_session_user_type_started", "test_session", ("user_id", "test_type", "started_at")),
+    ("ix_test_question_type_category", "test_question", ("test_type", "category")),
+    ("ix_test_report_user_type", "test_report", ("user_id", "test_type")),
+    ("ix_test_answer_user_created", "test_answer", ("user_id", "created_at", "id")),
+    ("ix_test_session_user_started", "test_session", ("user_id", "started_at", "id")),
+    ("ix_session_question_question", "session_question", ("session_id", "question_id")),
+    ("ix_report_job_status_priority", "report_job", ("status", "priority", "id")),
+    ("ix_report_job_user_status", "report_job", ("user_id", "status")),
+)
+
+# 部分唯一索引：(索引名稱, 資料表, 欄位, 條件)
+# - test_answer(session_id, question_id)：同一 session 同一題只能有一筆答案（離線同步的無 session 答案不受限）
+REQUIRED_UNIQUE_INDEXES: Tuple[Tuple[str, str, Tuple[str, ...], str], ...] = (
+    ("ux_test_answer_session_question", "test_answer", ("session_id", "question_id"), "session_id IS NOT NULL"),
+)
+
+
+def _existing_tables(conn) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def find_missing_indexes(conn) -> List[str]:
+    """列出資料庫中缺少的索引名稱（資料表不存在時略過）"""
+    tables = _existing_tables(conn)
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    return [
+        name for name, table, *_ in REQUIRED_INDEXES + REQUIRED_UNIQUE_INDEXES
+        if table in tables and name not in existing
+    ]
+
+
+def remove_duplicate_session_answers(conn) -> int:
+    """刪除同一 session 同一題的重複答案（保留最後寫入的一筆），回傳刪除筆數
+
+    受影響用戶的累計分數一併刪除（讀取時重建），並遞增其答案版本讓實體化報告與報告快取失效。
+    """
+    tables = _existing_tables(conn)
+    duplicates = conn.execute("""
+        SELECT ta.id, ta.user_id, tq.test_type
+        FROM test_answer ta
+        LEFT JOIN test_question tq ON tq.id = ta.question_id
+        WHERE ta.session_id IS NOT NULL AND ta.id < (
+            SELECT MAX(latest.id) FROM test_answer latest
+            WHERE latest.session_id = ta.session_id AND latest.question_id = ta.question_id
+        )
+    """).fetchall()
+    if not duplicates:
+        return 0
+
+    conn.executemany("DELETE FROM test_answer WHERE id = ?", [(answer_id,) for answer_id, _, _ in duplicates])
+    affected = sorted({(user_id, test_type) for _, user_id, test_type in duplicates if test_type is not None})
+    if "user_dimension_score" in tables:
+        conn.executemany(
+            "DELETE FROM user_dimension_score WHERE user_id = ?",
+            [(user_id,) for user_id in sorted({user_id for _, user_id, _ in duplicates})]
+        )
+    if "user_answer_version" in tables:
+        updated_at = datetime.now().isoformat()
+        conn.executemany("""
+            INSERT INTO user_answer_version (user_id, test_type, version, updated_at) VALUES (?, ?, 1, ?)
+            ON CONFLICT(user_id, test_type) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+        """, [(user_id, test_type, updated_at) for user_id, test_type in affected])
+    return len(duplicates)
+
+
+def count_unmigrated_sessions(conn) -> Optional[int]:
+    """尚未建立 session_question 題目列的 session 數量
+
+    沒有 test_session 時回傳 0；有 test_session 但缺少 session_question 資料表時回傳 None。
+    """
+    tables = _existing_tables(conn)
+    if "test_session" not in tables:
+        return 0
+    if "session_question" not in tables:
+        return None
+    return conn.execute("""
+        SELECT COUNT(*) FROM test_session ts
+        WHERE NOT EXISTS (SELECT 1 FROM session_question sq WHERE sq.session_id = ts.id)
+    """).fetchone()[0]
+
+
+def create_indexes(conn) -> List[str]:
+    """建立所有缺少的索引，回傳新建立的索引名稱
+
+    建立唯一索引前先清除既有的重複答案（見 remove_duplicate_session_answers）。
+    """
+    missing = find_missing_indexes(conn)
+    for name, table, columns in REQUIRED_INDEXES:
+        if name in missing:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+    for name, table, columns, condition in REQUIRED_UNIQUE_INDEXES:
+        if name in missing:
+            if name == "ux_test_answer_session_question":
+                remove_duplicate_session_answers(conn)
+            conn.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)}) WHERE {condition}"
+            )
+    conn.commit()
+    return missing
+
+
 # 建立 engine
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False}  # SQLite 需要這個設定
 )
 
+
+@event.listens_for(engine, "connect")
+def _apply_engine_pragmas(dbapi_connection, connection_record):
+    """SQLAlchemy 建立新連線時套用相同的 PRAGMA 設定檔"""
+    apply_pragmas(dbapi_connection, include_database=False)
+
+
 # 建立 SessionLocal
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # 建立 Base
 Base = declarative_base()
 
+
+class SQLiteConnectionPool:
+    """長連線的 SQLite 連線池
+
+    - 連線數量有上限，用完時等待其他執行緒歸還
+    - 每個執行緒同一時間只借出一條連線，巢狀使用時共用同一條
+    - 每條連線保留 sqlite3 內建的預編譯語句快取（cached_statements）
+    - 每條新連線都會套用 PRAGMA 設定檔
+    """
+
+    def __init__(self, db_path: str, size: int = 8, timeout: float = 30.0,
+                 statement_cache_size: int = 256, pragma_profile: Optional[str] = None):
+        if size < 1:
+            raise ValueError("連線池大小至少為 1")
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.statement_cache_size = statement_cache_size
+        self.pragma_profile = pragma_profile
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=size)
+        self._created = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """建立新的長連線"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size,
+        )
+        apply_pragmas(conn, self.pragma_profile, include_database=False)
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        """從池中取得連線，必要時建立新連線或等待歸還"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"等待資料庫連線逾時（{self.timeout} 秒）")
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        """歸還連線，未提交的交易一律回滾"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # 連線已損壞，丟棄並釋放名額
+            conn.close()
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put_nowait(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """借出目前執行緒的連線，離開區塊時自動歸還"""
+        held: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if held is not None:
+            # 同一執行緒的巢狀呼叫（例如分析器內部互相呼叫）共用同一條連線
+            yield held
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    def close_all(self) -> None:
+        """關閉所有閒置連線（應用程式關閉時呼叫）"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+# 全域共用的連線池
+sqlite_pool = SQLiteConnectionPool(
+    SQLITE_DB_PATH,
+    size=SQLITE_POOL_SIZE,
+    timeout=SQLITE_POOL_TIMEOUT,
+    statement_cache_size=SQLITE_STATEMENT_CACHE_SIZE,
+    pragma_profile=SQLITE_PRAGMA_PROFILE,
+)
+
+
+def get_connection():
+    """取得連線池中的 SQLite 連線（with 區塊結束時自動歸還）"""
+    return sqlite_pool.connection()
+
+
+class AsyncSQLiteConnectionPool:
+    """非同步 SQLite 連線池（aiosqlite），供 FastAPI 路由使用
+
+    - 連線數量有上限，用完時在事件迴圈上等待歸還，不佔用執行緒池
+    - 同一個 asyncio task 內的巢狀呼叫共用同一條連線
+    - 每條新連線都會套用 PRAGMA 設定檔
+    """
+
+    def __init__(self, db_path: str, size: int = 8, timeout: float = 30.0,
+                 statement_cache_size: int = 256, pragma_profile: Optional[str] = None):
+        if size < 1:
+            raise ValueError("連線池大小至少為 1")
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.statement_cache_size = statement_cache_size
+        self.pragma_profile = pragma_profile
+        self._idle: "asyncio.LifoQueue[aiosqlite.Connection]" = asyncio.LifoQueue(maxsize=size)
+        self._created = 0
+        self._current: ContextVar[Optional[aiosqlite.Connection]] = ContextVar("async_sqlite_conn", default=None)
+
+    async def _connect(self) -> aiosqlite.Connection:
+        """建立新的長連線"""
+        conn = await aiosqlite.connect(
+            self.db_path,
+            timeout=self.timeout,
+            cached_statements=self.statement_cache_size,
+        )
+        for key, value in get_pragma_profile(self.pragma_profile).items():
+            if key not in _DATABASE_PRAGMAS:
+                await conn.execute(f"PRAGMA {key} = {value}")
+        return conn
+
+    async def _acquire(self) -> aiosqlite.Connection:
+        """從池中取得連線，必要時建立新連線或等待歸還"""
+        try:
+            return self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+
+        if self._created < self.size:
+            self._created += 1
+            try:
+                return await self._connect()
+            except Exception:
+                self._created -= 1
+                raise
+
+        try:
+            return await asyncio.wait_for(self._idle.get(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"等待資料庫連線逾時（{self.timeout} 秒）")
+
+    async def _release(self, conn: aiosqlite.Connection, rollback: bool = False) -> None:
+        """歸還連線，未提交的交易一律回滾
+
+        rollback=True（區塊因例外或取消而結束）時不依 in_transaction 判斷：被取消的 await
+        已送出的語句（例如 BEGIN IMMEDIATE）仍可能在連線執行緒中稍後執行，排在其後的回滾才能確保交易結束。
+        """
+        try:
+            if rollback or conn.in_transaction:
+                await conn.rollback()
+        except sqlite3.Error:
+            await conn.close()
+            self._created -= 1
+            return
+        self._idle.put_nowait(conn)
+
+    async def _finish(self, conn: aiosqlite.Connection, failed: bool) -> None:
+        if failed:
+            # 取消中的 task 再次 await 仍可能被取消，回滾與歸還在獨立的 task 中完成
+            await asyncio.shield(self._release(conn, rollback=True))
+        else:
+            await self._release(conn)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        """借出目前 task 的連線，離開區塊時自動歸還"""
+        held = self._current.get()
+        if held is not None:
+            yield held
+            return
+
+        conn = await self._acquire()
+        token = self._current.set(conn)
+        failed = True
+        try:
+            yield conn
+            failed = False
+        finally:
+            self._current.reset(token)
+            await self._finish(conn, failed)
+
+    @asynccontextmanager
+    async def dedicated_connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        """借出不綁定目前 task 的連線（串流回應會跨 task 迭代，不可共用巢狀連線）"""
+        conn = await self._acquire()
+        failed = True
+        try:
+            yield conn
+            failed = False
+        finally:
+            await self._finish(conn, failed)
+
+    async def close_all(self) -> None:
+        """關閉所有閒置連線（應用程式關閉時呼叫）"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            await conn.close()
+            self._created -= 1
+
+
+# 全域共用的非同步連線池
+async_sqlite_pool = AsyncSQLiteConnectionPool(
+    SQLITE_DB_PATH,
+    size=SQLITE_POOL_SIZE,
+    timeout=SQLITE_POOL_TIMEOUT,
+    statement_cache_size=SQLITE_STATEMENT_CACHE_SIZE,
+    pragma_profile=SQLITE_PRAGMA_PROFILE,
+)
+
+
+def get_async_connection():
+    """取得非同步連線池中的連線（async with 區塊結束時自動歸還）"""
+    return async_sqlite_pool.connection()
+
+
+def get_async_stream_connection():
+    """取得供串流回應使用的非同步連線（不與同一 task 的其他查詢共用）"""
+    return async_sqlite_pool.dedicated_connection()
+
+
 # 依賴注入函數
 def get_db():
     db = SessionLocal()
@@ -30,9 +470,30 @@ def init_db():
     """初始化資料庫，建立所有表格"""
     try:
         # 導入模型以確保表格被建立
-        from app.models import TestQuestion, TestAnswer, TestReport
+        from app.models import TestQuestion, QuestionBankRevision, TestAnswer, TestReport, UserDimensionScore, SessionQuestion, IdWorkerLease, ReportJob, UserAnswerVersion
         # 建立所有表格
         Base.metadata.create_all(bind=engine)
-        print("資料庫初始化成功")
+        # 套用資料庫層級的 PRAGMA（WAL 模式會寫入資料庫檔案，之後的連線都沿用）
+        with get_connection() as conn:
+            apply_pragmas(conn)
+            missing_indexes = find_missing_indexes(conn)
+            unmigrated_sessions = count_unmigrated_sessions(conn)
+        print(f"資料庫初始化成功（PRAGMA 設定檔：{SQLITE_PRAGMA_PROFILE}）")
+        if missing_indexes:
+            print(f"警告：缺少索引 {', '.join(missing_indexes)}，請執行 python scripts/migrate_indexes.py")
+        if unmigrated_sessions is None:
+            print("警告：缺少 session_question 資料表，session 相關 API 無法使用，請執行 python scripts/migrate_session_questions.py")
+        elif unmigrated_sessions:
+            print(f"警告：{unmigrated_sessions} 個 session 尚未建立題目列，請執行 python scripts/migrate_session_questions.py")
     except Exception as e:
-        print(f"資料庫初始化失敗: {e}") 
\ No newline at end of file
+        print(f"資料庫初始化失敗: {e}")
+
+
+def close_db():
+    """關閉連線池（應用程式關閉時呼叫）"""
+    sqlite_pool.close_all()
+
+
+async def close_async_db():
+    """關閉非同步連線池（應用程式關閉時呼叫）"""
+    await async_sqlite_pool.close_all()
@@ -0,0 +1,227 @@
+"""
+可排序的唯一 ID 產生器（snowflake 形式）
+ID = 毫秒時間戳（自 2024-01-01 起，41 位元）+ worker 編號（6 位元）+ 序號（6 位元），
+共 53 位元，不超過 JavaScript Number 可精確表示的整數範圍。
+同一 worker 內單調遞增，不同 worker 的 ID 不會重複。
+
+worker 編號：
+- 設定 ID_WORKER_ID 時直接使用（部署時需確保每個行程各不相同）
+- 未設定時於服務啟動時向資料庫（id_worker_lease）租用一個未被使用的編號，
+  背景執行緒定期續約，關閉時釋放；租約過期（例如行程當機）後其他行程才能接手。
+  取得租約前或租約過期後產生 ID 會拋出 RuntimeError，不會與其他行程重複。
+"""
+
+import math
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Optional, Sequence
+
+from app.core.database import get_connection
+
+# 2024-01-01 00:00:00 UTC（毫秒）
+ID_EPOCH_MS = 1704067200000
+
+TIMESTAMP_BITS = 41
+WORKER_ID_BITS = 6
+SEQUENCE_BITS = 6
+
+MAX_WORKER_ID = (1 << WORKER_ID_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+# worker 編號租約的有效秒數（每三分之一有效時間續約一次）
+ID_WORKER_LEASE_TTL = float(os.getenv("ID_WORKER_LEASE_TTL", "60"))
+
+
+def _configured_worker_id() -> Optional[int]:
+    """ID_WORKER_ID 環境變數指定的 worker 編號（未設定時為 None）"""
+    worker_id = os.getenv("ID_WORKER_ID")
+    if worker_id:
+        return int(worker_id)
+    return None
+
+
+def _check_worker_id(worker_id: int) -> int:
+    if not 0 <= worker_id <= MAX_WORKER_ID:
+        raise ValueError(f"worker 編號必須介於 0 與 {MAX_WORKER_ID} 之間")
+    return worker_id
+
+
+class SnowflakeGenerator:
+    """執行緒安全的 ID 產生器（需先指定 worker 編號）"""
+
+    def __init__(self, worker_id: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+        self.worker_id: Optional[int] = None
+        self._valid_until = 0.0
+        if worker_id is not None:
+            self.assign(worker_id)
+
+    def assign(self, worker_id: int, valid_until: float = math.inf) -> None:
+        """指定 worker 編號與可使用到的時間（Unix 秒，租用的編號為租約到期時間）"""
+        _check_worker_id(worker_id)
+        with self._lock:
+            self.worker_id = worker_id
+            self._valid_until = valid_until
+
+    def next_id(self) -> int:
+        with self._lock:
+            if self.worker_id is None:
+                raise RuntimeError("尚未取得 worker 編號，請設定 ID_WORKER_ID 或於服務啟動時租用")
+            if time.time() >= self._valid_until:
+                raise RuntimeError(f"worker 編號 {self.worker_id} 的租約已過期")
+
+            now_ms = int(time.time() * 1000) - ID_EPOCH_MS
+            # 時鐘回撥時沿用上一次的時間戳，確保單調遞增
+            if now_ms <= self._last_ms:
+                self._sequence += 1
+                if self._sequence > MAX_SEQUENCE:
+                    # 同一毫秒的序號用完，借用下一毫秒
+                    self._last_ms += 1
+                    self._sequence = 0
+            else:
+                self._last_ms = now_ms
+                self._sequence = 0
+
+            return (
+                (self._last_ms << (WORKER_ID_BITS + SEQUENCE_BITS))
+                | (self.worker_id << SEQUENCE_BITS)
+                | self._sequence
+            )
+
+
+class WorkerIdLease:
+    """向資料庫租用 worker 編號，並將編號指定給各產生器"""
+
+    def __init__(self, generators: Sequence[SnowflakeGenerator], ttl: float = ID_WORKER_LEASE_TTL):
+        self.generators = generators
+        self.ttl = ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.worker_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _assign(self, worker_id: int, expires_at: float) -> None:
+        self.worker_id = worker_id
+        for generator in self.generators:
+            generator.assign(worker_id, expires_at)
+
+    def acquire(self) -> int:
+        """租用一個未被使用（或租約已過期）的編號，回傳 worker 編號"""
+        with get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                taken = {
+                    worker_id
+                    for worker_id, owner, expires_at in conn.execute(
+                        "SELECT worker_id, owner, expires_at FROM id_worker_lease"
+                    )
+                    if expires_at > now and owner != self.owner
+                }
+                worker_id = next((candidate for candidate in range(MAX_WORKER_ID + 1) if candidate not in taken), None)
+                if worker_id is None:
+                    raise RuntimeError(f"所有 worker 編號（0-{MAX_WORKER_ID}）皆已被租用")
+                expires_at = now + self.ttl
+                conn.execute("DELETE FROM id_worker_lease WHERE owner = ?", (self.owner,))
+                conn.execute(
+                    """
+                    INSERT INTO id_worker_lease (worker_id, owner, expires_at) VALUES (?, ?, ?)
+                    ON CONFLICT(worker_id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                    """,
+                    (worker_id, self.owner, expires_at)
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        self._assign(worker_id, expires_at)
+        return worker_id
+
+    def renew(self) -> int:
+        """延長租約；租約已被其他行程接手時改租新的編號，回傳目前的 worker 編號"""
+        if self.worker_id is None:
+            return self.acquire()
+        expires_at = time.time() + self.ttl
+        with get_connection() as conn:
+            cursor = conn.execute(
+                "UPDATE id_worker_lease SET expires_at = ? WHERE worker_id = ? AND owner = ?",
+                (expires_at, self.worker_id, self.owner)
+            )
+            conn.commit()
+        if cursor.rowcount == 0:
+            return self.acquire()
+        self._assign(self.worker_id, expires_at)
+        return self.worker_id
+
+    def release(self) -> None:
+        """釋放租約（之後產生 ID 會拋出 RuntimeError）"""
+        if self.worker_id is None:
+            return
+        for generator in self.generators:
+            generator.assign(self.worker_id, 0.0)
+        with get_connection() as conn:
+            conn.execute("DELETE FROM id_worker_lease WHERE owner = ?", (self.owner,))
+            conn.commit()
+        self.worker_id = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                self.renew()
+            except Exception as e:
+                print(f"worker 編號續約失敗: {e}")
+
+    def start(self) -> int:
+        """租用編號並啟動背景續約，回傳 worker 編號"""
+        worker_id = self.acquire()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="worker-id-lease", daemon=True)
+            self._thread.start()
+        return worker_id
+
+    def stop(self) -> None:
+        """停止續約並釋放編號"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.release()
+
+
+# session ID 與報告工作 ID 產生器（每個 worker 行程一組，共用同一個 worker 編號）
+session_id_generator = SnowflakeGenerator(_configured_worker_id())
+job_id_generator = SnowflakeGenerator(_configured_worker_id())
+
+# 未設定 ID_WORKER_ID 時由服務啟動時租用 worker 編號
+worker_id_lease: Optional[WorkerIdLease] = (
+    WorkerIdLease((session_id_generator, job_id_generator)) if _configured_worker_id() is None else None
+)
+
+
+def start_worker_id_lease() -> None:
+    """服務啟動時呼叫：未設定 ID_WORKER_ID 時租用 worker 編號"""
+    if worker_id_lease is not None:
+        worker_id = worker_id_lease.start()
+        print(f"已租用 ID worker 編號 {worker_id}")
+
+
+def stop_worker_id_lease() -> None:
+    """服務關閉時呼叫：釋放租用的 worker 編號"""
+    if worker_id_lease is not None:
+        worker_id_lease.stop()
+
+
+def next_session_id() -> int:
+    """產生新的 session ID"""
+    return session_id_generator.next_id()
+
+
+def next_job_id() -> int:
+    """產生新的報告工作 ID"""
+    return job_id_generator.next_id()
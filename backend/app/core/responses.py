@@ -0,0 +1,45 @@
+"""
+orjson 回應與預先編碼的 JSON 片段
+所有 API 預設以 orjson 序列化（直接輸出 UTF-8，不逐字跳脫中文）。
+報告中的固定敘述文字（類型說明、恐懼 / 慾望等）以 fragment() 只編碼一次，
+序列化時以 orjson.Fragment 直接拼接已編碼的位元組，不再逐次編碼大量中文內容。
+"""
+
+from functools import lru_cache
+from typing import Any, Hashable
+
+import orjson
+from starlette.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+@lru_cache(maxsize=4096)
+def _encode_fragment(key: Hashable) -> orjson.Fragment:
+    return orjson.Fragment(orjson.dumps(list(key) if isinstance(key, tuple) else key, option=ORJSON_OPTIONS))
+
+
+def fragment(value: Any) -> Any:
+    """將固定的字串或字串列表編碼為 JSON 片段（相同內容只編碼一次）"""
+    if isinstance(value, (list, tuple)):
+        return _encode_fragment(tuple(value))
+    if isinstance(value, str):
+        return _encode_fragment(value)
+    return value
+
+
+def raw_fragment(raw: bytes) -> orjson.Fragment:
+    """將已編碼的 JSON（例如資料庫中保存的報告）包裝為片段，序列化時直接拼接"""
+    return orjson.Fragment(raw)
+
+
+def dumps(content: Any) -> bytes:
+    """以 orjson 序列化（內容中的 JSON 片段直接拼接）"""
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """以 orjson 序列化的 JSON 回應（支援 JSON 片段）"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
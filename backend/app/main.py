@@ -1,12 +1,20 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.database import init_db
+from app.core.database import init_db, close_db, close_async_db
+from app.core.ids import start_worker_id_lease, stop_worker_id_lease
+from app.core.responses import ORJSONResponse
 from app.api import router as api_router
+from app.services.question_bank import question_bank
+from app.services.report_batch import shutdown_pool
+from app.services.report_jobs import report_job_queue
+from app.services.session_timer import session_time_buffer
 
 app = FastAPI(
     title="綜合人格特質分析 API",
     description="提供 MBTI、DISC、Big5、Enneagram 四種人格測驗的 API 服務",
-    version="1.0.0"
+    version="1.0.0",
+    # 所有 API 預設以 orjson 序列化
+    default_response_class=ORJSONResponse
 )
 
 # 加入 CORS 設定，允許前端開發伺服器請求
@@ -19,8 +27,26 @@ app.add_middleware(
 )
 
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     init_db()
+    # 未設定 ID_WORKER_ID 時租用不與其他行程重複的 ID worker 編號
+    start_worker_id_lease()
+    # 載入記憶體題庫，題目相關 API 不再查詢資料庫
+    question_bank.load()
+    # 啟動 session 計時的背景批量寫入
+    session_time_buffer.start()
+    # 啟動報告背景工作的 worker
+    await report_job_queue.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    # 關閉連線池前寫入緩衝中的計時
+    await session_time_buffer.stop()
+    await report_job_queue.stop()
+    shutdown_pool()
+    stop_worker_id_lease()
+    close_db()
+    await close_async_db()
 
 app.include_router(api_router)
 
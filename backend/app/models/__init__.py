@@ -1,3 +1,6 @@
-from .question import TestQuestion
+from .question import TestQuestion, QuestionBankRevision
 from .answer import TestAnswer
-from .report import TestReport
+from .report import TestReport, ReportJob
+from .score import UserDimensionScore, UserAnswerVersion
+from .session import SessionQuestion
+from .lease import IdWorkerLease
@@ -0,0 +1,8 @@
+from sqlalchemy import Column, Integer, String, Float
+from app.core.database import Base
+
+class IdWorkerLease(Base):
+    __tablename__ = 'id_worker_lease'
+    worker_id = Column(Integer, primary_key=True, autoincrement=False)  # snowflake worker 編號（0-63）
+    owner = Column(String(64), nullable=False)    # 持有者（主機:行程:隨機值）
+    expires_at = Column(Float, nullable=False)    # 租約到期時間（Unix 秒）
@@ -8,4 +8,9 @@ class TestQuestion(Base):
     category = Column(String(32), nullable=False)
     test_type = Column(String(16), nullable=False)
     options = Column(Text, nullable=False)  # JSON 字串
-    weight = Column(Text, nullable=False)   # JSON 字串 
\ No newline at end of file
+    weight = Column(Text, nullable=False)   # JSON 字串 
+
+class QuestionBankRevision(Base):
+    __tablename__ = 'question_bank_revision'
+    id = Column(Integer, primary_key=True, autoincrement=False)  # 固定只有一列（id = 1）
+    revision = Column(Integer, nullable=False, default=0)  # 匯入或重新載入題庫時遞增
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -8,4 +8,23 @@ class TestReport(Base):
     user_id = Column(String(64), nullable=False)
     test_type = Column(String(16), nullable=False)
     result = Column(Text, nullable=False)  # JSON 字串
-    created_at = Column(DateTime(timezone=True), server_default=func.now()) 
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ReportJob(Base):
+    __tablename__ = 'report_job'
+    id = Column(Integer, primary_key=True, autoincrement=False)  # snowflake 工作 ID
+    user_id = Column(String(64), nullable=False)
+    priority = Column(Integer, nullable=False)       # 0～9，數值越小越優先
+    status = Column(String(16), nullable=False)      # pending / running / completed / failed
+    owner = Column(String(64), nullable=True)        # 執行中工作的持有行程
+    lease_expires_at = Column(Float, nullable=True)  # 執行租約到期時間（Unix 秒），過期才會被重新排入
+    result = Column(Text, nullable=True)             # 已編碼的報告 JSON
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_report_job_status_priority', 'status', 'priority', 'id'),
+        Index('ix_report_job_user_status', 'user_id', 'status'),
+    )
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class UserDimensionScore(Base):
+    __tablename__ = 'user_dimension_score'
+    user_id = Column(String(64), primary_key=True)
+    test_type = Column(String(16), primary_key=True)
+    dimension = Column(String(8), primary_key=True)
+    score_sum = Column(Float, nullable=False, default=0)       # 該維度累計分數
+    answer_count = Column(Integer, nullable=False, default=0)  # 該維度計分題數
+    bank_version = Column(String(32), nullable=False)          # 計算時的題庫版本
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class UserAnswerVersion(Base):
+    __tablename__ = 'user_answer_version'
+    user_id = Column(String(64), primary_key=True)
+    test_type = Column(String(16), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)  # 該測驗答案每次異動遞增（不會遞減或歸零）
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, DateTime, Index
+from app.core.database import Base
+
+class SessionQuestion(Base):
+    __tablename__ = 'session_question'
+    session_id = Column(Integer, primary_key=True, autoincrement=False)
+    position = Column(Integer, primary_key=True, autoincrement=False)  # 題目在 session 中的順序
+    question_id = Column(Integer, nullable=False)
+    answered_at = Column(DateTime, nullable=True)  # 未作答為 NULL
+
+    __table_args__ = (
+        Index('ix_session_question_question', 'session_id', 'question_id'),
+    )
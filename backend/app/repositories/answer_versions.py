@@ -0,0 +1,39 @@
+"""用戶答案版本（user_answer_version）
+
+每位用戶每種測驗一個計數器，答案新增、取代或刪除時在同一交易中遞增，
+實體化報告與報告快取以此判斷是否過期（讀取只需以主鍵查詢幾列，與答案筆數無關）。
+計數器只會遞增，刪除答案後重新作答也不會與先前的版本相同；沒有資料列視為版本 0。
+"""
+from datetime import datetime
+from typing import Dict, Iterable
+
+import aiosqlite
+
+from app.core.database import get_async_connection
+
+
+async def bump_answer_versions(conn: aiosqlite.Connection, user_id: str, test_types: Iterable[str]) -> None:
+    """遞增用戶指定測驗的答案版本（在呼叫端的交易中執行，不提交）"""
+    updated_at = datetime.now().isoformat()
+    await conn.executemany("""
+        INSERT INTO user_answer_version (user_id, test_type, version, updated_at) VALUES (?, ?, 1, ?)
+        ON CONFLICT(user_id, test_type) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+    """, [(user_id, test_type, updated_at) for test_type in sorted(set(test_types))])
+
+
+def load_answer_versions(conn, user_id: str) -> Dict[str, int]:
+    """（同步）用戶各測驗的答案版本"""
+    return dict(conn.execute(
+        "SELECT test_type, version FROM user_answer_version WHERE user_id = ?",
+        (user_id,)
+    ).fetchall())
+
+
+async def get_answer_versions(user_id: str) -> Dict[str, int]:
+    """用戶各測驗的答案版本"""
+    async with get_async_connection() as conn:
+        async with conn.execute(
+            "SELECT test_type, version FROM user_answer_version WHERE user_id = ?",
+            (user_id,)
+        ) as cursor:
+            return {test_type: version for test_type, version in await cursor.fetchall()}
@@ -0,0 +1,185 @@
+"""作答資料存取（非同步）"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.database import get_async_connection
+from app.repositories import answer_versions as answer_version_repo
+from app.repositories import dimension_scores as dimension_score_repo
+from app.services.question_bank import question_bank
+from app.services.scoring import get_scoring_table
+
+
+async def insert_answers(user_id: str, answers: Sequence[Tuple[int, str]], session_id: Optional[int]) -> int:
+    """以單一交易批量寫入多筆答案，回傳寫入筆數
+
+    整批使用一次 executemany 並只提交一次，數千筆的離線同步資料也只產生一次落盤。
+    同一個 session 內重新作答的題目直接更新原本的答案列（ux_test_answer_session_question 保證每題只有一列），
+    並在同一交易中以預先計算的分數變化更新 user_dimension_score、session_question 的作答時間，
+    並遞增涉及測驗的答案版本。
+    """
+    if not answers:
+        return 0
+    created_at = datetime.now()
+    table = get_scoring_table()
+    async with get_async_connection() as conn:
+        try:
+            # 先取得寫入鎖再讀取舊答案，同一題的並行重新作答會依序執行，分數變化不會重複計算
+            await conn.execute("BEGIN IMMEDIATE")
+            replaced: List[Tuple[int, str]] = []
+            if session_id is not None:
+                # 同一 session 同一題只保留最後一次作答
+                answers = list(dict(answers).items())
+                async with conn.execute(
+                    "SELECT id, question_id, answer FROM test_answer WHERE session_id = ? AND user_id = ?",
+                    (session_id, user_id)
+                ) as cursor:
+                    previous = {row[1]: (row[0], row[2]) for row in await cursor.fetchall()}
+                updates = []
+                for question_id, answer in answers:
+                    if question_id in previous:
+                        answer_id, previous_answer = previous[question_id]
+                        updates.append((answer, created_at, answer_id))
+                        replaced.append((question_id, previous_answer))
+                if updates:
+                    await conn.executemany("UPDATE test_answer SET answer = ?, created_at = ? WHERE id = ?", updates)
+
+            replaced_ids = {question_id for question_id, _ in replaced}
+            await conn.executemany("""
+                INSERT INTO test_answer (user_id, question_id, answer, session_id, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, [
+                (user_id, question_id, answer, session_id, created_at)
+                for question_id, answer in answers if question_id not in replaced_ids
+            ])
+
+            if session_id is not None:
+                # 標記 session 題目已作答（由主鍵與 ix_session_question_question 定位）
+                await conn.executemany(
+                    "UPDATE session_question SET answered_at = ? WHERE session_id = ? AND question_id = ?",
+                    [(created_at, session_id, question_id) for question_id, _ in answers]
+                )
+
+            await dimension_score_repo.apply_deltas(
+                conn, user_id, table.dimension_deltas(answers, replaced), table.version
+            )
+            await answer_version_repo.bump_answer_versions(conn, user_id, (
+                question.test_type
+                for question in (question_bank.get(question_id) for question_id, _ in answers)
+                if question is not None
+            ))
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
+    return len(answers)
+
+
+async def insert_answer(user_id: str, question_id: int, answer: str, session_id: Optional[int]) -> None:
+    """寫入單筆答案（同一 session 重新作答時取代先前的答案）"""
+    try:
+        question_id = int(question_id)
+    except (TypeError, ValueError):
+        pass
+    await insert_answers(user_id, [(question_id, answer)], session_id)
+
+
+async def list_user_answers(
+    user_id: str,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[Any, int]] = None
+) -> Tuple[List[Tuple[Any, ...]], Optional[Tuple[Any, int]]]:
+    """用戶的答案（新到舊），回傳 (資料列, 下一頁的 (created_at, id))
+
+    以 (created_at, id) keyset 分頁，由 ix_test_answer_user_created 索引直接定位，
+    每頁成本與歷史筆數無關；limit 為 None 時回傳全部。
+    """
+    conditions = "WHERE user_id = ?"
+    params: List[Any] = [user_id]
+    if after is not None:
+        conditions += " AND (created_at, id) < (?, ?)"
+        params.extend(after)
+    limit_clause = ""
+    if limit is not None:
+        limit_clause = "LIMIT ?"
+        params.append(limit + 1)
+
+    async with get_async_connection() as conn:
+        async with conn.execute(f"""
+            SELECT id, user_id, question_id, answer, created_at 
+            FROM test_answer 
+            {conditions}
+            ORDER BY created_at DESC, id DESC
+            {limit_clause}
+        """, params) as cursor:
+            rows = [tuple(row) for row in await cursor.fetchall()]
+
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        return rows, (rows[-1][4], rows[-1][0])
+    return rows, None
+
+
+async def list_user_answers_by_type(
+    user_id: str,
+    test_type: str,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[Any, int]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, int]]]:
+    """用戶特定測驗類型的答案（含題目內容，新到舊），回傳 (答案, 下一頁的 (created_at, id))"""
+    conditions = "WHERE ta.user_id = ? AND tq.test_type = ?"
+    params: List[Any] = [user_id, test_type]
+    if after is not None:
+        conditions += " AND (ta.created_at, ta.id) < (?, ?)"
+        params.extend(after)
+    limit_clause = ""
+    if limit is not None:
+        limit_clause = "LIMIT ?"
+        params.append(limit + 1)
+
+    async with get_async_connection() as conn:
+        async with conn.execute(f"""
+            SELECT ta.id, ta.user_id, ta.question_id, ta.answer, ta.created_at,
+                   tq.text, tq.category, tq.test_type
+            FROM test_answer ta
+            JOIN test_question tq ON ta.question_id = tq.id
+            {conditions}
+            ORDER BY ta.created_at DESC, ta.id DESC
+            {limit_clause}
+        """, params) as cursor:
+            rows = await cursor.fetchall()
+
+    next_key = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_key = (rows[-1][4], rows[-1][0])
+
+    return [
+        {
+            "id": a[0],
+            "user_id": a[1],
+            "question_id": a[2],
+            "answer": a[3],
+            "created_at": a[4],
+            "text": a[5],
+            "category": a[6],
+            "test_type": a[7]
+        }
+        for a in rows
+    ], next_key
+
+
+async def delete_user_answers(user_id: str) -> int:
+    """刪除用戶的所有答案，回傳刪除筆數"""
+    async with get_async_connection() as conn:
+        cursor = await conn.execute("DELETE FROM test_answer WHERE user_id = ?", (user_id,))
+        deleted_count = cursor.rowcount
+        await cursor.close()
+        await conn.execute("""
+            UPDATE session_question SET answered_at = NULL
+            WHERE session_id IN (SELECT id FROM test_session WHERE user_id = ?)
+        """, (user_id,))
+        await dimension_score_repo.delete_user_scores(conn, user_id)
+        # 逐一遞增題庫中所有測驗（尚未有版本列的舊資料也會建立），確保刪除後版本必定改變
+        await answer_version_repo.bump_answer_versions(conn, user_id, question_bank.test_types())
+        await conn.commit()
+    return deleted_count
@@ -0,0 +1,34 @@
+"""用戶維度累計分數（user_dimension_score）增量維護（非同步）
+
+只更新已建立且題庫版本相符的累計分數；尚未建立或版本不符時，
+由計分引擎在讀取時以完整答案重建。所有函式皆在呼叫端的交易中執行，不自行提交。
+"""
+from datetime import datetime
+from typing import Sequence, Tuple
+
+import aiosqlite
+
+
+async def apply_deltas(
+    conn: aiosqlite.Connection,
+    user_id: str,
+    deltas: Sequence[Tuple[str, str, float, int]],
+    bank_version: str
+) -> None:
+    """套用 (測驗類型, 維度, 分數變化, 題數變化)"""
+    if not deltas:
+        return
+    updated_at = datetime.now().isoformat()
+    await conn.executemany("""
+        UPDATE user_dimension_score
+        SET score_sum = score_sum + ?, answer_count = answer_count + ?, updated_at = ?
+        WHERE user_id = ? AND test_type = ? AND dimension = ? AND bank_version = ?
+    """, [
+        (score, count, updated_at, user_id, test_type, dimension, bank_version)
+        for test_type, dimension, score, count in deltas
+    ])
+
+
+async def delete_user_scores(conn: aiosqlite.Connection, user_id: str) -> None:
+    """刪除用戶的累計分數"""
+    await conn.execute("DELETE FROM user_dimension_score WHERE user_id = ?", (user_id,))
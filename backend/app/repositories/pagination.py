@@ -0,0 +1,25 @@
+"""keyset 分頁游標：以 (排序時間, id) 編碼為不透明字串"""
+import base64
+import json
+from typing import Any, Optional, Tuple
+
+# 單頁資料列數上限
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(key: Tuple[Any, int]) -> str:
+    """將最後一列的 (時間, id) 編碼為下一頁游標"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[Any, int]]:
+    """解析游標；格式錯誤時拋出 ValueError"""
+    if not cursor:
+        return None
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("無效的分頁游標")
+    if not isinstance(row_id, int):
+        raise ValueError("無效的分頁游標")
+    return value, row_id
@@ -0,0 +1,176 @@
+"""報告工作佇列資料存取（非同步）"""
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.database import get_async_connection
+
+REPORT_JOB_COLUMNS: Tuple[str, ...] = (
+    "id", "user_id", "priority", "status", "error", "created_at", "started_at", "finished_at"
+)
+
+# 工作狀態：等待中 → 執行中 → 完成 / 失敗
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+FINISHED_STATUSES = (JOB_COMPLETED, JOB_FAILED)
+
+
+async def enqueue_report_job(job_id: int, user_id: str, priority: int) -> Tuple[int, bool]:
+    """新增報告工作，回傳 (工作 ID, 是否與既有工作合併)
+
+    同一用戶已有等待中的工作時不重複建立，直接回傳該工作（優先順序取兩者中較高者）。
+    以 BEGIN IMMEDIATE 取得寫入鎖，多個 worker 行程同時提交也不會建立重複的工作。
+    """
+    async with get_async_connection() as conn:
+        try:
+            await conn.execute("BEGIN IMMEDIATE")
+            async with conn.execute(
+                "SELECT id, priority FROM report_job WHERE user_id = ? AND status = ? ORDER BY id LIMIT 1",
+                (user_id, JOB_PENDING)
+            ) as cursor:
+                existing = await cursor.fetchone()
+
+            if existing is not None:
+                existing_id, existing_priority = existing
+                if priority < existing_priority:
+                    await conn.execute("UPDATE report_job SET priority = ? WHERE id = ?", (priority, existing_id))
+                await conn.commit()
+                return existing_id, True
+
+            await conn.execute(
+                "INSERT INTO report_job (id, user_id, priority, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, user_id, priority, JOB_PENDING, datetime.now().isoformat())
+            )
+            await conn.commit()
+            return job_id, False
+        except Exception:
+            await conn.rollback()
+            raise
+
+
+async def claim_report_job(owner: str, lease_seconds: float, max_priority: Optional[int] = None) -> Optional[Tuple[int, str, int]]:
+    """取出優先順序最高（數值最小）、最早建立的等待中工作，標記為 owner 執行中並設定租約，回傳 (工作 ID, user_id, 優先順序)
+
+    max_priority 不為 None 時只取優先順序數值小於該值的工作。
+    """
+    conditions = "WHERE status = ?"
+    params: list = [JOB_PENDING]
+    if max_priority is not None:
+        conditions += " AND priority < ?"
+        params.append(max_priority)
+
+    async with get_async_connection() as conn:
+        try:
+            await conn.execute("BEGIN IMMEDIATE")
+            async with conn.execute(
+                f"SELECT id, user_id, priority FROM report_job {conditions} ORDER BY priority, id LIMIT 1",
+                params
+            ) as cursor:
+                row = await cursor.fetchone()
+
+            if row is None:
+                await conn.commit()
+                return None
+
+            await conn.execute(
+                "UPDATE report_job SET status = ?, owner = ?, lease_expires_at = ?, started_at = ? WHERE id = ?",
+                (JOB_RUNNING, owner, time.time() + lease_seconds, datetime.now().isoformat(), row[0])
+            )
+            await conn.commit()
+            return tuple(row)
+        except Exception:
+            await conn.rollback()
+            raise
+
+
+async def renew_report_job_lease(job_id: int, owner: str, lease_seconds: float) -> bool:
+    """延長執行中工作的租約；工作已不屬於 owner（租約過期被重新排入）時回傳 False"""
+    async with get_async_connection() as conn:
+        cursor = await conn.execute(
+            "UPDATE report_job SET lease_expires_at = ? WHERE id = ? AND owner = ? AND status = ?",
+            (time.time() + lease_seconds, job_id, owner, JOB_RUNNING)
+        )
+        await conn.commit()
+        return cursor.rowcount > 0
+
+
+async def finish_report_job(job_id: int, owner: str, result: Optional[str] = None, error: Optional[str] = None) -> bool:
+    """記錄工作結果（error 不為 None 時標記為失敗）；工作已不屬於 owner 時不寫入並回傳 False"""
+    async with get_async_connection() as conn:
+        cursor = await conn.execute(
+            """
+            UPDATE report_job
+            SET status = ?, result = ?, error = ?, finished_at = ?, owner = NULL, lease_expires_at = NULL
+            WHERE id = ? AND owner = ? AND status = ?
+            """,
+            (
+                JOB_FAILED if error is not None else JOB_COMPLETED,
+                result,
+                error,
+                datetime.now().isoformat(),
+                job_id,
+                owner,
+                JOB_RUNNING
+            )
+        )
+        await conn.commit()
+        return cursor.rowcount > 0
+
+
+async def get_report_job(job_id: int) -> Optional[Dict[str, Any]]:
+    """取得工作狀態與結果（result 為已編碼的報告 JSON，未完成時為 None）"""
+    async with get_async_connection() as conn:
+        async with conn.execute(
+            f"SELECT {', '.join(REPORT_JOB_COLUMNS)}, result FROM report_job WHERE id = ?",
+            (job_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+
+    if row is None:
+        return None
+    job = dict(zip(REPORT_JOB_COLUMNS, row))
+    job["result"] = row[-1]
+    return job
+
+
+async def requeue_expired_jobs() -> int:
+    """將租約已過期（持有的行程已停止或當機）的執行中工作改回等待中，回傳筆數"""
+    async with get_async_connection() as conn:
+        cursor = await conn.execute(
+            """
+            UPDATE report_job SET status = ?, owner = NULL, lease_expires_at = NULL, started_at = NULL
+            WHERE status = ? AND (lease_expires_at IS NULL OR lease_expires_at < ?)
+            """,
+            (JOB_PENDING, JOB_RUNNING, time.time())
+        )
+        await conn.commit()
+        return cursor.rowcount
+
+
+async def release_owned_jobs(owner: str) -> int:
+    """將 owner 執行中的工作改回等待中（行程關閉時呼叫，其他行程可立即接手），回傳筆數"""
+    async with get_async_connection() as conn:
+        cursor = await conn.execute(
+            """
+            UPDATE report_job SET status = ?, owner = NULL, lease_expires_at = NULL, started_at = NULL
+            WHERE status = ? AND owner = ?
+            """,
+            (JOB_PENDING, JOB_RUNNING, owner)
+        )
+        await conn.commit()
+        return cursor.rowcount
+
+
+async def purge_finished_jobs(retention_hours: float) -> int:
+    """刪除結束超過保留時間的工作，回傳筆數"""
+    cutoff = (datetime.now() - timedelta(hours=retention_hours)).isoformat()
+    async with get_async_connection() as conn:
+        cursor = await conn.execute(
+            f"DELETE FROM report_job WHERE status IN ({', '.join('?' for _ in FINISHED_STATUSES)}) AND finished_at < ?",
+            (*FINISHED_STATUSES, cutoff)
+        )
+        await conn.commit()
+        return cursor.rowcount
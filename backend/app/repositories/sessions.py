@@ -0,0 +1,228 @@
+"""測驗 session 資料存取（非同步）"""
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.database import get_async_connection
+
+
+async def create_session(session_id: int, user_id: str, test_type: str, question_ids: List[int], started_at: str) -> None:
+    """建立新的 session，題目依順序寫入 session_question"""
+    async with get_async_connection() as conn:
+        try:
+            # question_ids 欄位保留 JSON 以向後相容（匯出與舊版工具使用）
+            await conn.execute(
+                "INSERT INTO test_session (id, user_id, test_type, question_ids, started_at, status) VALUES (?, ?, ?, ?, ?, ?)",
+                (session_id, user_id, test_type, json.dumps(question_ids), started_at, "in_progress")
+            )
+            await conn.executemany(
+                "INSERT INTO session_question (session_id, position, question_id) VALUES (?, ?, ?)",
+                [(session_id, position, question_id) for position, question_id in enumerate(question_ids)]
+            )
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
+
+
+async def get_latest_session(user_id: str, test_type: str) -> Optional[Dict[str, Any]]:
+    """取得用戶最新的 session、作答進度與已回答題目
+
+    進度、下一題與剩餘題目皆由 session_question 以索引查詢取得，不再解析 JSON。
+    """
+    async with get_async_connection() as conn:
+        async with conn.execute(
+            "SELECT id, started_at, status, total_time_seconds FROM test_session WHERE user_id = ? AND test_type = ? ORDER BY started_at DESC LIMIT 1",
+            (user_id, test_type)
+        ) as cursor:
+            session_row = await cursor.fetchone()
+
+        if not session_row:
+            return None
+
+        session_id, started_at, status, total_time_seconds = session_row
+
+        async with conn.execute(
+            "SELECT question_id FROM session_question WHERE session_id = ? ORDER BY position",
+            (session_id,)
+        ) as cursor:
+            question_ids = [row[0] for row in await cursor.fetchall()]
+
+        async with conn.execute("""
+            SELECT COUNT(*), COUNT(answered_at), MIN(CASE WHEN answered_at IS NULL THEN position END)
+            FROM session_question
+            WHERE session_id = ?
+        """, (session_id,)) as cursor:
+            total_questions, answered_count, next_question_index = await cursor.fetchone()
+
+        async with conn.execute(
+            "SELECT question_id FROM session_question WHERE session_id = ? AND answered_at IS NULL ORDER BY position",
+            (session_id,)
+        ) as cursor:
+            remaining_questions = [row[0] for row in await cursor.fetchall()]
+
+        async with conn.execute(
+            "SELECT question_id, answer, created_at FROM test_answer WHERE session_id = ?",
+            (session_id,)
+        ) as cursor:
+            answered_rows = await cursor.fetchall()
+
+    return {
+        "session_id": session_id,
+        "question_ids": question_ids,
+        "started_at": started_at,
+        "status": status,
+        "total_time_seconds": total_time_seconds or 0,
+        "total_questions": total_questions,
+        "answered_count": answered_count,
+        "next_question_index": next_question_index,
+        "remaining_questions": remaining_questions,
+        "answered_rows": [tuple(row) for row in answered_rows]
+    }
+
+
+async def list_user_sessions(
+    user_id: str,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[Any, int]] = None
+) -> Tuple[List[Tuple[Any, ...]], Optional[Tuple[Any, int]]]:
+    """用戶的 session（新到舊，含題目數量），回傳 (資料列, 下一頁的 (started_at, id))；limit 為 None 時回傳全部"""
+    conditions = "WHERE user_id = ?"
+    params: List[Any] = [user_id]
+    if after is not None:
+        conditions += " AND (started_at, id) < (?, ?)"
+        params.extend(after)
+    limit_clause = ""
+    if limit is not None:
+        limit_clause = "LIMIT ?"
+        params.append(limit + 1)
+
+    async with get_async_connection() as conn:
+        async with conn.execute(
+            f"""
+            SELECT id, test_type,
+                   (SELECT COUNT(*) FROM session_question sq WHERE sq.session_id = test_session.id),
+                   started_at, status
+            FROM test_session
+            {conditions}
+            ORDER BY started_at DESC, id DESC
+            {limit_clause}
+            """,
+            params
+        ) as cursor:
+            rows = [tuple(row) for row in await cursor.fetchall()]
+
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        return rows, (rows[-1][3], rows[-1][0])
+    return rows, None
+
+
+async def pause_session(session_id: int, elapsed_seconds: Optional[int]) -> Optional[Dict[str, Any]]:
+    """暫停進行中的 session；session 不存在或非進行中時回傳 None"""
+    async with get_async_connection() as conn:
+        async with conn.execute(
+            "SELECT started_at, total_time_seconds FROM test_session WHERE id = ? AND status = 'in_progress'",
+            (session_id,)
+        ) as cursor:
+            session_row = await cursor.fetchone()
+
+        if not session_row:
+            return None
+
+        started_at, total_time_seconds = session_row
+        paused_at = datetime.now().isoformat()
+        if elapsed_seconds is None:
+            elapsed_seconds = total_time_seconds
+
+        await conn.execute(
+            "UPDATE test_session SET status = 'paused', paused_at = ?, total_time_seconds = ? WHERE id = ?",
+            (paused_at, elapsed_seconds, session_id)
+        )
+        await conn.commit()
+
+    return {"paused_at": paused_at, "total_time_seconds": elapsed_seconds}
+
+
+async def get_session_status(session_id: int) -> Optional[str]:
+    """session 的狀態（in_progress／paused／completed 等）；session 不存在時回傳 None"""
+    async with get_async_connection() as conn:
+        async with conn.execute("SELECT status FROM test_session WHERE id = ?", (session_id,)) as cursor:
+            row = await cursor.fetchone()
+    return row[0] if row is not None else None
+
+
+async def store_session_times(times: Sequence[Tuple[int, int]]) -> None:
+    """以單一交易批量寫入多個 session 的總計時 [(session_id, elapsed_seconds), ...]
+
+    只更新進行中的 session：已暫停或結束的 session 計時已由暫停／結束寫定，
+    其他 worker 緩衝中較舊的計時不會覆蓋。
+    """
+    if not times:
+        return
+    async with get_async_connection() as conn:
+        try:
+            await conn.executemany(
+                "UPDATE test_session SET total_time_seconds = ? WHERE id = ? AND status = 'in_progress'",
+                [(elapsed_seconds, session_id) for session_id, elapsed_seconds in times]
+            )
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
+
+
+async def resume_session(session_id: int) -> Optional[Dict[str, Any]]:
+    """恢復已暫停的 session；session 不存在或未暫停時回傳 None"""
+    async with get_async_connection() as conn:
+        async with conn.execute(
+            "SELECT total_time_seconds FROM test_session WHERE id = ? AND status = 'paused'",
+            (session_id,)
+        ) as cursor:
+            session_row = await cursor.fetchone()
+
+        if not session_row:
+            return None
+
+        total_time_seconds = session_row[0]
+        resumed_at = datetime.now().isoformat()
+
+        # 重置開始時間為當前時間，保持總時間不變
+        await conn.execute(
+            "UPDATE test_session SET status = 'in_progress', started_at = ?, paused_at = NULL, total_time_seconds = ? WHERE id = ?",
+            (resumed_at, total_time_seconds, session_id)
+        )
+        await conn.commit()
+
+    return {"resumed_at": resumed_at, "total_time_seconds": total_time_seconds}
+
+
+async def finish_session(session_id: int, elapsed_seconds: Optional[int]) -> Optional[Dict[str, Any]]:
+    """結束進行中或已暫停的 session；session 不存在或已結束時回傳 None"""
+    async with get_async_connection() as conn:
+        async with conn.execute(
+            "SELECT user_id, test_type, total_time_seconds FROM test_session WHERE id = ? AND status IN ('in_progress', 'paused')",
+            (session_id,)
+        ) as cursor:
+            session_row = await cursor.fetchone()
+
+        if not session_row:
+            return None
+
+        user_id, test_type, total_time_seconds = session_row
+        finished_at = datetime.now().isoformat()
+        if elapsed_seconds is None:
+            elapsed_seconds = total_time_seconds
+
+        await conn.execute(
+            "UPDATE test_session SET status = 'completed', finished_at = ?, paused_at = NULL, total_time_seconds = ? WHERE id = ?",
+            (finished_at, elapsed_seconds, session_id)
+        )
+        await conn.commit()
+
+    return {
+        "user_id": user_id,
+        "test_type": test_type,
+        "finished_at": finished_at,
+        "total_time_seconds": elapsed_seconds
+    }
@@ -18,6 +18,7 @@ class AnswerListResponse(BaseModel):
     answers: List[AnswerResponse]
     total: int
     user_id: str
+    next_cursor: Optional[str] = None  # 下一頁游標（分頁查詢時）
 
 class TestSubmission(BaseModel):
     user_id: str
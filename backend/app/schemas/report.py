@@ -74,4 +74,15 @@ class CompositeReport(BaseModel):
     overall_analysis: str
     career_recommendations: List[str]
     personal_development_suggestions: List[str]
-    compatibility_insights: Dict[str, Any] 
\ No newline at end of file
+    compatibility_insights: Dict[str, Any] 
+
+class ReportBatchRequest(BaseModel):
+    user_ids: List[str]
+
+class ReportJobRequest(BaseModel):
+    user_id: str
+    priority: Optional[int] = None  # 0～9，數值越小越優先；未指定時為互動工作（0）
+
+class ReportJobBatchRequest(BaseModel):
+    user_ids: List[str]
+    priority: Optional[int] = None  # 未指定時為批量工作（REPORT_JOB_BULK_PRIORITY）
@@ -0,0 +1,158 @@
+"""
+批次向量化計分
+一次載入多位用戶的答案，轉為 (用戶 × 題目·選項) 的作答次數矩陣，
+與預先建立的 (題目·選項 × 維度) 權重張量相乘，一次取得所有用戶四種測驗的分數。
+用於權重調整後重新計算整批用戶結果等大量計分情境。
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.database import get_connection
+from app.services.scoring import ScoreResult, ScoringTable, get_scoring_table, normalize_test_type
+
+# SQLite 單一查詢的參數數量上限為 999，分批查詢用戶答案
+_QUERY_CHUNK_SIZE = 500
+
+# 每次建立作答次數矩陣的用戶數
+_USER_BLOCK_SIZE = 1024
+
+
+class BatchScorer:
+    """由計分表建立權重張量的批次計分器"""
+
+    def __init__(self, table: ScoringTable):
+        self.table = table
+        self.num_questions = len(table.question_ids)
+        self.num_options = max((len(scores) for scores in table.option_scores), default=0)
+        self.num_columns = self.num_questions * self.num_options
+
+        # (題目, 選項, 維度) 權重張量與計分指示張量，攤平為 (題目·選項 × 維度)
+        weights = np.zeros((self.num_questions, self.num_options, table.size), dtype=np.float64)
+        scored = np.zeros((self.num_questions, self.num_options, table.size), dtype=np.float64)
+        for column, (slot, scores) in enumerate(zip(table.question_slots, table.option_scores)):
+            weights[column, :len(scores), slot] = scores
+            scored[column, :len(scores), slot] = 1.0
+        self.weight_matrix = weights.reshape(self.num_columns, table.size)
+        self.scored_matrix = scored.reshape(self.num_columns, table.size)
+
+        # (question_id, answer) → 攤平後的欄位索引
+        question_column = {question_id: column for column, question_id in enumerate(table.question_ids)}
+        self.column_index: Dict[Tuple[int, str], int] = {
+            (question_id, answer): question_column[question_id] * self.num_options + option
+            for (question_id, answer), option in table.option_index.items()
+            if question_id in question_column
+        }
+
+    def score_rows(self, user_ids: Sequence[str], rows: Iterable[Sequence]) -> "BatchScores":
+        """以 (user_id, question_id, answer) 資料列計算指定用戶的分數"""
+        user_index = {user_id: index for index, user_id in enumerate(user_ids)}
+        column_index = self.column_index
+
+        row_indices: List[int] = []
+        column_indices: List[int] = []
+        for user_id, question_id, answer in rows:
+            row = user_index.get(user_id)
+            column = column_index.get((question_id, answer))
+            if row is not None and column is not None:
+                row_indices.append(row)
+                column_indices.append(column)
+
+        row_array = np.asarray(row_indices, dtype=np.int64)
+        column_array = np.asarray(column_indices, dtype=np.int64)
+        order = np.argsort(row_array, kind="stable")
+        row_array = row_array[order]
+        column_array = column_array[order]
+
+        num_users = len(user_ids)
+        totals = np.zeros((num_users, self.table.size), dtype=np.float64)
+        counts = np.zeros((num_users, self.table.size), dtype=np.int64)
+
+        # 分段建立作答次數矩陣，避免大量用戶時一次配置過大的矩陣
+        for start in range(0, num_users, _USER_BLOCK_SIZE):
+            end = min(start + _USER_BLOCK_SIZE, num_users)
+            lo, hi = np.searchsorted(row_array, (start, end))
+            # 重複作答會累加次數，與逐筆計分相同
+            answer_counts = np.bincount(
+                (row_array[lo:hi] - start) * self.num_columns + column_array[lo:hi],
+                minlength=(end - start) * self.num_columns
+            ).reshape(end - start, self.num_columns).astype(np.float64)
+            totals[start:end] = answer_counts @ self.weight_matrix
+            counts[start:end] = (answer_counts @ self.scored_matrix).astype(np.int64)
+
+        return BatchScores(user_ids=list(user_ids), totals=totals, counts=counts, table=self.table)
+
+
+@dataclass
+class BatchScores:
+    """批次計分結果：totals / counts 皆為 (用戶 × slot) 矩陣"""
+    user_ids: List[str]
+    totals: np.ndarray
+    counts: np.ndarray
+    table: ScoringTable
+
+    def dimensions(self, test_type: str) -> Tuple[str, ...]:
+        """指定測驗類型的維度名稱（對應 scores() 的欄位順序）"""
+        start, end = self.table.offsets[normalize_test_type(test_type)]
+        return tuple(dimension for _, dimension in self.table.slots[start:end])
+
+    def scores(self, test_type: str) -> np.ndarray:
+        """指定測驗類型的 (用戶 × 維度) 分數矩陣"""
+        start, end = self.table.offsets[normalize_test_type(test_type)]
+        return self.totals[:, start:end]
+
+    def result(self, user_id: str) -> ScoreResult:
+        """取出單一用戶的 ScoreResult（可直接交給各分析器）"""
+        row = self.user_ids.index(user_id)
+        return ScoreResult(
+            user_id=user_id,
+            totals=tuple(self.totals[row].tolist()),
+            counts=tuple(self.counts[row].tolist()),
+            table=self.table
+        )
+
+    def results(self) -> Iterator[ScoreResult]:
+        """依序產生每位用戶的 ScoreResult"""
+        for row, user_id in enumerate(self.user_ids):
+            yield ScoreResult(
+                user_id=user_id,
+                totals=tuple(self.totals[row].tolist()),
+                counts=tuple(self.counts[row].tolist()),
+                table=self.table
+            )
+
+
+_scorer: Optional[BatchScorer] = None
+
+
+def get_batch_scorer() -> BatchScorer:
+    """取得目前計分表版本的批次計分器"""
+    global _scorer
+    table = get_scoring_table()
+    if _scorer is None or _scorer.table is not table:
+        _scorer = BatchScorer(table)
+    return _scorer
+
+
+def score_users(user_ids: Optional[Sequence[str]] = None) -> BatchScores:
+    """批次計算多位用戶的分數（未指定用戶時計算所有有作答的用戶）"""
+    scorer = get_batch_scorer()
+
+    with get_connection() as conn:
+        if user_ids is None:
+            user_ids = [row[0] for row in conn.execute("SELECT DISTINCT user_id FROM test_answer ORDER BY user_id")]
+            rows = conn.execute("SELECT user_id, question_id, answer FROM test_answer").fetchall()
+        else:
+            user_ids = list(dict.fromkeys(user_ids))
+            rows = []
+            for start in range(0, len(user_ids), _QUERY_CHUNK_SIZE):
+                chunk = user_ids[start:start + _QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows.extend(conn.execute(
+                    f"SELECT user_id, question_id, answer FROM test_answer WHERE user_id IN ({placeholders})",
+                    chunk
+                ).fetchall())
+
+    return scorer.score_rows(user_ids, rows)
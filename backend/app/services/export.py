@@ -0,0 +1,180 @@
+"""
+答案與 session 匯出
+以游標分批讀取（fetchmany），逐批編碼為 NDJSON 或 CSV，
+記憶體用量只與批次大小有關，與資料表大小無關。API 與 CLI 共用相同的查詢與編碼。
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.database import get_async_stream_connection
+
+# 每批讀取的資料列數
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+ANSWER_EXPORT_COLUMNS: Tuple[str, ...] = (
+    "id", "user_id", "question_id", "test_type", "category", "answer", "session_id", "created_at"
+)
+
+SESSION_EXPORT_COLUMNS: Tuple[str, ...] = (
+    "id", "user_id", "test_type", "question_ids", "started_at", "finished_at",
+    "paused_at", "total_time_seconds", "status"
+)
+
+
+def parse_export_bound(value: str) -> datetime:
+    """解析 ISO 8601 日期或時間；含時區時轉為本地時間（資料庫以不含時區的本地時間保存）"""
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"無效的日期時間：{value}（需為 ISO 8601，例如 2024-01-31 或 2024-01-31T08:00:00）")
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return moment
+
+
+def build_answer_query(
+    user_id: Optional[str] = None,
+    test_type: Optional[str] = None,
+    session_id: Optional[int] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None
+) -> Tuple[str, List[Any]]:
+    """答案匯出查詢（start / end 為 ISO 8601 日期或時間，end 不含；格式錯誤時拋出 ValueError）
+
+    created_at 以空白分隔日期與時間保存（2024-01-31 08:00:00.000000），範圍轉為相同格式後比較。
+    """
+    conditions = []
+    params: List[Any] = []
+    if user_id is not None:
+        conditions.append("ta.user_id = ?")
+        params.append(user_id)
+    if test_type is not None:
+        conditions.append("tq.test_type = ?")
+        params.append(test_type)
+    if session_id is not None:
+        conditions.append("ta.session_id = ?")
+        params.append(session_id)
+    if start is not None:
+        conditions.append("ta.created_at >= ?")
+        params.append(parse_export_bound(start).isoformat(sep=" "))
+    if end is not None:
+        conditions.append("ta.created_at < ?")
+        params.append(parse_export_bound(end).isoformat(sep=" "))
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"""
+        SELECT ta.id, ta.user_id, ta.question_id, tq.test_type, tq.category, ta.answer, ta.session_id, ta.created_at
+        FROM test_answer ta
+        LEFT JOIN test_question tq ON ta.question_id = tq.id
+        {where}
+        ORDER BY ta.id
+    """
+    return sql, params
+
+
+def build_session_query(
+    user_id: Optional[str] = None,
+    test_type: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None
+) -> Tuple[str, List[Any]]:
+    """session 匯出查詢（依 started_at 篩選日期範圍，end 不含；格式錯誤時拋出 ValueError）
+
+    started_at 以 ISO 8601（2024-01-31T08:00:00.000000）保存，範圍轉為相同格式後比較。
+    """
+    conditions = []
+    params: List[Any] = []
+    if user_id is not None:
+        conditions.append("user_id = ?")
+        params.append(user_id)
+    if test_type is not None:
+        conditions.append("test_type = ?")
+        params.append(test_type)
+    if start is not None:
+        conditions.append("started_at >= ?")
+        params.append(parse_export_bound(start).isoformat())
+    if end is not None:
+        conditions.append("started_at < ?")
+        params.append(parse_export_bound(end).isoformat())
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"""
+        SELECT {', '.join(SESSION_EXPORT_COLUMNS)}
+        FROM test_session
+        {where}
+        ORDER BY id
+    """
+    return sql, params
+
+
+def encode_ndjson(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    """一列一個 JSON 物件"""
+    return "".join(
+        json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) + "\n"
+        for row in rows
+    )
+
+
+def encode_csv(columns: Sequence[str], rows: Sequence[Sequence[Any]], header: bool = False) -> str:
+    """CSV 內容（header=True 時先輸出欄位名稱）"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+async def stream_export(
+    sql: str,
+    params: Sequence[Any],
+    columns: Sequence[str],
+    export_format: str,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> AsyncIterator[str]:
+    """以非同步游標分批讀取並編碼，供 StreamingResponse 使用"""
+    if export_format == "csv":
+        yield encode_csv(columns, [], header=True)
+
+    async with get_async_stream_connection() as conn:
+        async with conn.execute(sql, params) as cursor:
+            while True:
+                rows = await cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                if export_format == "csv":
+                    yield encode_csv(columns, rows)
+                else:
+                    yield encode_ndjson(columns, rows)
+
+
+def iter_export(
+    conn,
+    sql: str,
+    params: Sequence[Any],
+    columns: Sequence[str],
+    export_format: str,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[str]:
+    """同步版本的分批匯出（供 CLI 使用）"""
+    if export_format == "csv":
+        yield encode_csv(columns, [], header=True)
+
+    cursor = conn.execute(sql, params)
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            if export_format == "csv":
+                yield encode_csv(columns, rows)
+            else:
+                yield encode_ndjson(columns, rows)
+    finally:
+        cursor.close()
@@ -0,0 +1,307 @@
+"""
+整合洞察
+領導風格、溝通偏好與工作環境洞察只取決於離散的輸入：
+MBTI 類型、DISC 主要風格、九型主要類型，以及 Big5 人際 / 工作風格（由分數門檻決定的少數幾種文字）。
+匯入時以下方的規則函式列舉所有組合，預先建立查詢表，
+產生報告時只需一次查表，不再逐次對中文字串做子字串比對。
+查無組合（例如舊版報告中的文字）時退回規則函式即時計算，結果相同。
+"""
+
+from itertools import product
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.comprehensive_analysis import ComprehensivePersonalityAnalyzer
+from app.services.narratives import narratives
+
+def _get_integrated_leadership_style(mbti_result: Dict, disc_result: Dict, big5_result: Dict, enneagram_result: Dict) -> Dict[str, Any]:
+    """整合領導風格分析"""
+    mbti_type = mbti_result.get("personality_type", "")
+    disc_primary = disc_result.get("primary_style", "")
+    big5_type = big5_result.get("combination_analysis", {}).get("personality_type", "")
+    enneagram_type = enneagram_result.get("primary_type", "")
+    
+    # 分析領導傾向
+    leadership_traits = []
+    
+    # MBTI 領導分析
+    if mbti_type.startswith("E"):
+        leadership_traits.append("外向領導：善於激勵和影響他人")
+    if mbti_type.endswith("J"):
+        leadership_traits.append("結構化領導：重視組織和規劃")
+    if "T" in mbti_type:
+        leadership_traits.append("邏輯領導：基於分析和理性決策")
+    
+    # DISC 領導分析
+    if disc_primary == "D":
+        leadership_traits.append("直接領導：快速決策和行動導向")
+    elif disc_primary == "I":
+        leadership_traits.append("激勵領導：善於鼓舞和團隊建設")
+    elif disc_primary == "S":
+        leadership_traits.append("支持領導：重視和諧和團隊合作")
+    elif disc_primary == "C":
+        leadership_traits.append("專業領導：重視品質和系統化")
+    
+    # Enneagram 領導分析
+    if enneagram_type in ["3", "8"]:
+        leadership_traits.append("成就導向：目標明確和結果驅動")
+    elif enneagram_type in ["2", "9"]:
+        leadership_traits.append("服務導向：重視他人需求和團隊和諧")
+    
+    return {
+        "primary_style": _determine_primary_leadership_style(leadership_traits),
+        "strengths": leadership_traits,
+        "development_areas": _get_leadership_development_areas(leadership_traits)
+    }
+
+def _get_integrated_communication_style(mbti_result: Dict, disc_result: Dict, big5_result: Dict, enneagram_result: Dict) -> Dict[str, Any]:
+    """整合溝通風格分析"""
+    communication_traits = []
+    
+    # 整合各測驗的溝通特徵
+    communication_traits.append(mbti_result.get("communication_style", ""))
+    communication_traits.append(disc_result.get("communication_style", ""))
+    communication_traits.append(big5_result.get("interpersonal_style", ""))
+    
+    return {
+        "primary_approach": _determine_primary_communication_approach(communication_traits),
+        "strengths": [trait for trait in communication_traits if trait],
+        "adaptation_suggestions": _get_communication_adaptation_suggestions(communication_traits)
+    }
+
+def _get_integrated_work_environment(mbti_result: Dict, disc_result: Dict, big5_result: Dict, enneagram_result: Dict) -> Dict[str, Any]:
+    """整合工作環境適應性分析"""
+    work_preferences = []
+    
+    # 整合工作風格偏好
+    work_preferences.append(mbti_result.get("work_style", ""))
+    work_preferences.append(disc_result.get("work_style", ""))
+    work_preferences.append(big5_result.get("combination_analysis", {}).get("work_style", ""))
+    
+    return {
+        "ideal_environment": _determine_ideal_work_environment(work_preferences),
+        "team_dynamics": _get_team_dynamics_preferences(work_preferences),
+        "stress_factors": _get_work_stress_factors(mbti_result, disc_result, big5_result, enneagram_result)
+    }
+
+def _get_integrated_development_priorities(mbti_result: Dict, disc_result: Dict, big5_result: Dict, enneagram_result: Dict) -> Dict[str, Any]:
+    """整合個人發展優先級"""
+    all_suggestions = []
+    
+    # 收集所有發展建議
+    all_suggestions.extend(mbti_result.get("development_suggestions", []))
+    all_suggestions.extend(disc_result.get("development_suggestions", []))
+    all_suggestions.extend(big5_result.get("development_suggestions", []))
+    all_suggestions.extend(enneagram_result.get("development_suggestions", []))
+    
+    return {
+        "high_priority": _get_high_priority_development_areas(all_suggestions),
+        "medium_priority": _get_medium_priority_development_areas(all_suggestions),
+        "long_term_goals": _get_long_term_development_goals(all_suggestions)
+    }
+
+# 輔助函數
+def _determine_primary_leadership_style(traits: List[str]) -> str:
+    """確定主要領導風格"""
+    if any("直接" in trait for trait in traits):
+        return "直接領導型"
+    elif any("激勵" in trait for trait in traits):
+        return "激勵領導型"
+    elif any("支持" in trait for trait in traits):
+        return "支持領導型"
+    elif any("專業" in trait for trait in traits):
+        return "專業領導型"
+    else:
+        return "平衡領導型"
+
+def _get_leadership_development_areas(traits: List[str]) -> List[str]:
+    """獲取領導發展領域"""
+    development_areas = []
+    if not any("外向" in trait for trait in traits):
+        development_areas.append("提升外向溝通和激勵能力")
+    if not any("結構" in trait for trait in traits):
+        development_areas.append("發展組織和規劃能力")
+    if not any("邏輯" in trait for trait in traits):
+        development_areas.append("增強分析和決策能力")
+    return development_areas
+
+def _determine_primary_communication_approach(traits: List[str]) -> str:
+    """確定主要溝通方式"""
+    if any("直接" in trait for trait in traits):
+        return "直接簡潔型"
+    elif any("熱情" in trait for trait in traits):
+        return "熱情生動型"
+    elif any("溫和" in trait for trait in traits):
+        return "溫和支持型"
+    elif any("精確" in trait for trait in traits):
+        return "精確邏輯型"
+    else:
+        return "平衡適應型"
+
+def _get_communication_adaptation_suggestions(traits: List[str]) -> List[str]:
+    """獲取溝通適應建議"""
+    suggestions = []
+    if any("直接" in trait for trait in traits):
+        suggestions.append("在需要和諧的場合，增加同理心和耐心")
+    if any("熱情" in trait for trait in traits):
+        suggestions.append("在正式場合，增加結構化和準確性")
+    if any("溫和" in trait for trait in traits):
+        suggestions.append("在需要決策的場合，增加直接性和果斷性")
+    if any("精確" in trait for trait in traits):
+        suggestions.append("在社交場合，增加熱情和靈活性")
+    return suggestions
+
+def _determine_ideal_work_environment(traits: List[str]) -> str:
+    """確定理想工作環境"""
+    if any("創新" in trait for trait in traits):
+        return "創意導向環境"
+    elif any("系統" in trait for trait in traits):
+        return "結構化環境"
+    elif any("合作" in trait for trait in traits):
+        return "團隊合作環境"
+    elif any("獨立" in trait for trait in traits):
+        return "自主工作環境"
+    else:
+        return "平衡多元環境"
+
+def _get_team_dynamics_preferences(traits: List[str]) -> List[str]:
+    """獲取團隊動態偏好"""
+    preferences = []
+    if any("合作" in trait for trait in traits):
+        preferences.append("重視團隊合作和和諧")
+    if any("領導" in trait for trait in traits):
+        preferences.append("傾向擔任領導角色")
+    if any("支持" in trait for trait in traits):
+        preferences.append("善於支持他人和調解")
+    if any("專業" in trait for trait in traits):
+        preferences.append("重視專業能力和品質")
+    return preferences
+
+def _get_work_stress_factors(mbti_result: Dict, disc_result: Dict, big5_result: Dict, enneagram_result: Dict) -> List[str]:
+    """獲取工作壓力因素"""
+    stress_factors = []
+    
+    # 基於各測驗結果分析壓力因素
+    if mbti_result.get("personality_type", "").endswith("J"):
+        stress_factors.append("缺乏結構和計劃")
+    if disc_result.get("primary_style") == "D":
+        stress_factors.append("缺乏控制權和決策權")
+    if big5_result.get("scores", {}).get("N", 0) > 3.5:
+        stress_factors.append("高壓力和不確定性環境")
+    if enneagram_result.get("primary_type") == "6":
+        stress_factors.append("缺乏安全感和支持")
+    
+    return stress_factors
+
+def _get_high_priority_development_areas(suggestions: List[str]) -> List[str]:
+    """獲取高優先級發展領域"""
+    # 這裡可以根據建議的內容和頻率來確定優先級
+    return suggestions[:3] if suggestions else ["持續自我反思和學習"]
+
+def _get_medium_priority_development_areas(suggestions: List[str]) -> List[str]:
+    """獲取中等優先級發展領域"""
+    return suggestions[3:6] if len(suggestions) > 3 else []
+
+def _get_long_term_development_goals(suggestions: List[str]) -> List[str]:
+    """獲取長期發展目標"""
+    return [
+        "建立持續學習和成長的習慣",
+        "發展跨文化溝通能力",
+        "提升領導力和影響力",
+        "建立專業網絡和關係"
+    ]
+
+
+# 查詢表的輸入範圍
+MBTI_TYPES: Tuple[str, ...] = tuple(narratives.table("mbti", "description"))
+DISC_STYLES: Tuple[Optional[str], ...] = tuple(narratives.table("disc", "description")) + (None, "")
+ENNEAGRAM_TYPES: Tuple[Optional[str], ...] = tuple(narratives.table("enneagram", "description")) + (None, "")
+
+
+def _big5_styles() -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Big5 各維度取門檻兩側的分數，列舉所有可能的人際風格與工作風格文字"""
+    analyzer = ComprehensivePersonalityAnalyzer()
+    interpersonal, work = {}, {}
+    for values in product((0.0, 5.0), repeat=5):
+        scores = dict(zip(("O", "C", "E", "A", "N"), values))
+        interpersonal[analyzer._get_big5_interpersonal(scores)] = None
+        work[analyzer._get_big5_work_style(scores)] = None
+    return tuple(interpersonal), tuple(work)
+
+
+def _build_tables() -> Tuple[Dict[Tuple, Dict[str, Any]], Dict[Tuple, Dict[str, Any]], Dict[Tuple, Dict[str, Any]]]:
+    """以規則函式列舉所有組合，建立領導、溝通、工作環境查詢表"""
+    big5_interpersonal, big5_work = _big5_styles()
+
+    leadership = {}
+    for mbti_type, disc_primary, enneagram_type in product(MBTI_TYPES, DISC_STYLES, ENNEAGRAM_TYPES):
+        leadership[(mbti_type, disc_primary, enneagram_type)] = _get_integrated_leadership_style(
+            {"personality_type": mbti_type}, {"primary_style": disc_primary}, {}, {"primary_type": enneagram_type}
+        )
+
+    communication = {}
+    work_environment = {}
+    for mbti_type, disc_primary in product(MBTI_TYPES, DISC_STYLES):
+        mbti_communication = narratives.get("mbti", "communication", mbti_type)
+        disc_communication = narratives.get("disc", "communication", disc_primary or "")
+        for interpersonal in big5_interpersonal:
+            communication[(mbti_communication, disc_communication, interpersonal)] = _get_integrated_communication_style(
+                {"communication_style": mbti_communication},
+                {"communication_style": disc_communication},
+                {"interpersonal_style": interpersonal},
+                {}
+            )
+
+        mbti_work = narratives.get("mbti", "work_style", mbti_type)
+        disc_work = narratives.get("disc", "work_style", disc_primary or "")
+        for work_style in big5_work:
+            preferences = [mbti_work, disc_work, work_style]
+            work_environment[(mbti_work, disc_work, work_style)] = {
+                "ideal_environment": _determine_ideal_work_environment(preferences),
+                "team_dynamics": _get_team_dynamics_preferences(preferences)
+            }
+
+    return leadership, communication, work_environment
+
+
+# 預先計算的查詢表（報告共用，請勿修改取得的物件）
+_LEADERSHIP_TABLE, _COMMUNICATION_TABLE, _WORK_ENVIRONMENT_TABLE = _build_tables()
+
+
+def build_integrated_insights(mbti_result: Dict, disc_result: Dict, big5_result: Dict, enneagram_result: Dict) -> Dict[str, Any]:
+    """整合四種測驗的洞察（查表取得，查無組合時即時計算）"""
+    leadership = _LEADERSHIP_TABLE.get((
+        mbti_result.get("personality_type", ""),
+        disc_result.get("primary_style", ""),
+        enneagram_result.get("primary_type", "")
+    ))
+    if leadership is None:
+        leadership = _get_integrated_leadership_style(mbti_result, disc_result, big5_result, enneagram_result)
+
+    communication = _COMMUNICATION_TABLE.get((
+        mbti_result.get("communication_style", ""),
+        disc_result.get("communication_style", ""),
+        big5_result.get("interpersonal_style", "")
+    ))
+    if communication is None:
+        communication = _get_integrated_communication_style(mbti_result, disc_result, big5_result, enneagram_result)
+
+    work_environment = _WORK_ENVIRONMENT_TABLE.get((
+        mbti_result.get("work_style", ""),
+        disc_result.get("work_style", ""),
+        big5_result.get("combination_analysis", {}).get("work_style", "")
+    ))
+    if work_environment is None:
+        work_environment = _get_integrated_work_environment(mbti_result, disc_result, big5_result, enneagram_result)
+    else:
+        # 壓力因素取決於 Big5 神經質分數，只需幾個比較，不列入查詢表
+        work_environment = {
+            **work_environment,
+            "stress_factors": _get_work_stress_factors(mbti_result, disc_result, big5_result, enneagram_result)
+        }
+
+    return {
+        "leadership_style": leadership,
+        "communication_preferences": communication,
+        "work_environment_fit": work_environment,
+        "personal_development_priorities": _get_integrated_development_priorities(mbti_result, disc_result, big5_result, enneagram_result)
+    }
@@ -0,0 +1,86 @@
+"""
+人格敘述文字目錄
+各分析器共用的類型說明、優缺點、職業建議、九型恐懼 / 慾望等固定文字，
+於匯入時由 data/narrative_catalog.json 載入一次，轉為唯讀結構（字串皆 intern），
+分析時依類型代碼直接查表，不再每次建立大量 dict 與字串。
+
+目錄內容：
+- tables / defaults：綜合分析器（報告）使用的文字與查無類型時的預設值
+- variants：修正版與舊版分析器與預設內容不同的部分（其餘沿用預設）
+"""
+
+import json
+import os
+import sys
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+NARRATIVE_CATALOG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "data",
+    "narrative_catalog.json"
+)
+
+
+def _freeze(value: Any) -> Any:
+    """轉為唯讀結構：dict → MappingProxyType、list → tuple、字串 intern"""
+    if isinstance(value, dict):
+        return MappingProxyType({sys.intern(key): _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def _merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """以 override 的區段取代 base 中相同測驗的區段"""
+    merged = {test_type: dict(sections) for test_type, sections in base.items()}
+    for test_type, sections in override.items():
+        merged.setdefault(test_type, {}).update(sections)
+    return merged
+
+
+class NarrativeCatalog:
+    """依 (測驗, 區段, 類型代碼) 查詢敘述文字"""
+
+    def __init__(self, tables: Mapping[str, Mapping[str, Mapping[str, Any]]], defaults: Mapping[str, Mapping[str, Any]]):
+        self.tables = tables
+        self.defaults = defaults
+
+    def table(self, test_type: str, section: str) -> Mapping[str, Any]:
+        """取得整個區段（類型代碼 → 文字）"""
+        return self.tables[test_type][section]
+
+    def get(self, test_type: str, section: str, code: Optional[str], default: Any = None) -> Any:
+        """取得類型代碼對應的文字；查無時回傳目錄中的預設值"""
+        value = self.tables[test_type][section].get(code)
+        if value is not None:
+            return value
+        if default is not None:
+            return default
+        return self.defaults.get(test_type, {}).get(section)
+
+
+def load_narrative_catalogs(path: str = NARRATIVE_CATALOG_PATH) -> Dict[str, NarrativeCatalog]:
+    """載入目錄，回傳 {"default": ..., 各版本名稱: ...}"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    catalogs = {"default": NarrativeCatalog(_freeze(data["tables"]), _freeze(data["defaults"]))}
+    for name, variant in data.get("variants", {}).items():
+        catalogs[name] = NarrativeCatalog(
+            _freeze(_merge(data["tables"], variant.get("tables", {}))),
+            _freeze(_merge(data["defaults"], variant.get("defaults", {})))
+        )
+    return catalogs
+
+
+_catalogs = load_narrative_catalogs()
+
+# 綜合分析器（報告）使用的目錄
+narratives = _catalogs["default"]
+# 修正版分析器（corrected_analysis）使用的目錄
+corrected_narratives = _catalogs["corrected"]
+# 舊版分析器（analysis）使用的目錄
+legacy_narratives = _catalogs["legacy"]
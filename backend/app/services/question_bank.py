@@ -0,0 +1,257 @@
+"""
+記憶體題庫服務
+題庫為靜態資料，啟動時載入一次並預先解析 options / weight，
+所有題目相關 API 直接由記憶體提供，不再查詢資料庫。
+
+匯入題庫時遞增資料庫中的題庫修訂號（question_bank_revision）；每個 worker 處理 API 請求前
+最多每 QUESTION_BANK_CHECK_INTERVAL 秒查詢一次修訂號（單列主鍵查詢），
+修訂號改變時於執行緒池重新載入，所有 worker 都會更新，且不阻塞事件迴圈。
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import get_connection
+
+# 檢查資料庫題庫修訂號的間隔秒數
+QUESTION_BANK_CHECK_INTERVAL = float(os.getenv("QUESTION_BANK_CHECK_INTERVAL", "5"))
+
+# 固定分類順序的測驗（MBTI 強制八大類平均出題）
+FORM_CATEGORIES: Dict[str, Tuple[str, ...]] = {
+    "MBTI": ("E", "I", "S", "N", "T", "F", "J", "P"),
+}
+
+
+@dataclass(frozen=True)
+class Question:
+    """已解析的題目"""
+    id: int
+    text: str
+    category: str
+    test_type: str
+    options: Tuple[str, ...]
+    weight: Any
+    is_reverse: bool = False
+    payload: Dict[str, Any] = field(default=None, compare=False, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """API response 格式（預先建立，請勿修改回傳的 dict）"""
+        return self.payload
+
+
+class QuestionBank:
+    """記憶體題庫：依 ID、測驗類型、分類建立索引"""
+
+    def __init__(self, check_interval: float = QUESTION_BANK_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._revision: Optional[int] = None
+        self._checked_at = 0.0
+        self._by_id: Dict[int, Question] = {}
+        self._by_type: Dict[str, Tuple[Question, ...]] = {}
+        self._by_category: Dict[Tuple[str, str], Tuple[Question, ...]] = {}
+        self._version = ""
+
+    def load(self) -> None:
+        """從資料庫載入並解析整個題庫"""
+        with get_connection() as conn:
+            # 先讀取修訂號：載入期間有新的匯入時，下次檢查會再重新載入
+            revision = read_question_bank_revision(conn)
+            rows = conn.execute(
+                "SELECT id, text, category, test_type, options, weight, is_reverse FROM test_question ORDER BY id"
+            ).fetchall()
+
+        by_id: Dict[int, Question] = {}
+        by_type: Dict[str, List[Question]] = {}
+        by_category: Dict[Tuple[str, str], List[Question]] = {}
+        digest = hashlib.sha1()
+
+        for question_id, text, category, test_type, options_json, weight_json, is_reverse in rows:
+            options = json.loads(options_json)
+            weight = json.loads(weight_json)
+            question = Question(
+                id=question_id,
+                text=text,
+                category=category,
+                test_type=test_type,
+                options=tuple(options),
+                weight=weight,
+                is_reverse=bool(is_reverse),
+                payload={
+                    "id": question_id,
+                    "text": text,
+                    "category": category,
+                    "test_type": test_type,
+                    "options": options,
+                    "weight": weight
+                }
+            )
+            by_id[question_id] = question
+            by_type.setdefault(test_type, []).append(question)
+            by_category.setdefault((test_type, category), []).append(question)
+            digest.update(f"{question_id}|{text}|{category}|{test_type}|{options_json}|{weight_json}|{is_reverse}\n".encode("utf-8"))
+
+        with self._lock:
+            self._by_id = by_id
+            self._by_type = {key: tuple(value) for key, value in by_type.items()}
+            self._by_category = {key: tuple(value) for key, value in by_category.items()}
+            self._version = digest.hexdigest()[:12]
+            self._revision = revision
+            self._checked_at = time.monotonic()
+            self._loaded = True
+
+    def refresh(self) -> bool:
+        """（同步）資料庫的題庫修訂號與已載入的不同時重新載入，回傳是否重新載入"""
+        if self._loaded:
+            with get_connection() as conn:
+                revision = read_question_bank_revision(conn)
+            self._checked_at = time.monotonic()
+            if revision == self._revision:
+                return False
+        self.load()
+        return True
+
+    async def ensure_current(self) -> None:
+        """距上次檢查超過 check_interval 秒（或尚未載入）時，於執行緒池檢查修訂號並視需要重新載入"""
+        if self._loaded:
+            if time.monotonic() - self._checked_at < self.check_interval:
+                return
+            # 先更新檢查時間，同時到達的其他請求不重複檢查
+            self._checked_at = time.monotonic()
+        await run_in_threadpool(self.refresh)
+
+    def reload(self) -> None:
+        """遞增資料庫的題庫修訂號並重新載入（其他 worker 於下次檢查時重新載入）"""
+        with get_connection() as conn:
+            bump_question_bank_revision(conn)
+            conn.commit()
+        self.load()
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.load()
+
+    @property
+    def version(self) -> str:
+        """題庫內容指紋，題庫內容改變時隨之改變"""
+        self._ensure_loaded()
+        return self._version
+
+    def get(self, question_id: int) -> Optional[Question]:
+        """依 ID 取得題目"""
+        self._ensure_loaded()
+        return self._by_id.get(question_id)
+
+    def get_many(self, question_ids: Sequence[int]) -> List[Question]:
+        """依傳入順序取得多個題目（不存在的 ID 略過）"""
+        self._ensure_loaded()
+        return [self._by_id[qid] for qid in question_ids if qid in self._by_id]
+
+    def contains(self, question_id: int) -> bool:
+        self._ensure_loaded()
+        return question_id in self._by_id
+
+    def test_types(self) -> List[str]:
+        """所有測驗類型（依名稱排序）"""
+        self._ensure_loaded()
+        return sorted(self._by_type)
+
+    def by_type(self, test_type: str) -> Tuple[Question, ...]:
+        """指定測驗類型的題目（依 ID 排序）"""
+        self._ensure_loaded()
+        return self._by_type.get(test_type, ())
+
+    def count(self, test_type: str) -> int:
+        """指定測驗類型的題目數量"""
+        return len(self.by_type(test_type))
+
+    def question_ids(self, test_type: str) -> List[int]:
+        """指定測驗類型的所有題目 ID"""
+        return [question.id for question in self.by_type(test_type)]
+
+    def categories(self, test_type: str) -> List[str]:
+        """指定測驗類型的所有分類（依名稱排序）"""
+        self._ensure_loaded()
+        return sorted(category for (qtype, category) in self._by_category if qtype == test_type)
+
+    def by_category(self, test_type: str, category: str) -> Tuple[Question, ...]:
+        """指定測驗類型與分類的題目"""
+        self._ensure_loaded()
+        return self._by_category.get((test_type, category), ())
+
+    def form_categories(self, test_type: str) -> List[str]:
+        """分層抽題使用的分類順序"""
+        categories = FORM_CATEGORIES.get(test_type.upper())
+        if categories is not None:
+            return list(categories)
+        return self.categories(test_type)
+
+    def sample_category(self, test_type: str, category: str, k: int, rng: Optional[random.Random] = None) -> List[Question]:
+        """從指定分類隨機選取最多 k 題（不重複）"""
+        questions = self.by_category(test_type, category)
+        return (rng or random).sample(questions, min(k, len(questions)))
+
+    def sample_type(self, test_type: str, k: int, seed: Optional[int] = None) -> List[Question]:
+        """從指定測驗類型隨機選取最多 k 題（不重複；指定 seed 時結果可重現）"""
+        questions = self.by_type(test_type)
+        rng = random.Random(seed) if seed is not None else random
+        return rng.sample(questions, min(k, len(questions)))
+
+    def sample_form(
+        self,
+        test_type: str,
+        k: int,
+        seed: Optional[int] = None,
+        categories: Optional[Sequence[str]] = None
+    ) -> List[Question]:
+        """
+        分層隨機抽題：k 題平均分配到各分類（餘數由前面的分類各多取一題），
+        各分類內不重複抽樣；題目不足的分類全數選取。
+        指定 seed 時相同題庫版本會產生相同的題目組合。
+        """
+        if categories is None:
+            categories = self.form_categories(test_type)
+        if not categories:
+            return []
+
+        rng = random.Random(seed) if seed is not None else None
+        per_category, remainder = divmod(k, len(categories))
+
+        questions: List[Question] = []
+        for index, category in enumerate(categories):
+            count = per_category + (1 if index < remainder else 0)
+            questions.extend(self.sample_category(test_type, category, count, rng))
+        return questions
+
+
+def read_question_bank_revision(conn) -> int:
+    """資料庫中的題庫修訂號（尚未匯入過題庫時為 0）"""
+    row = conn.execute("SELECT revision FROM question_bank_revision WHERE id = 1").fetchone()
+    return row[0] if row is not None else 0
+
+
+def bump_question_bank_revision(conn) -> None:
+    """遞增題庫修訂號（於匯入題庫的交易中呼叫，不提交），執行中的服務會在下次檢查時重新載入"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS question_bank_revision (
+            id INTEGER PRIMARY KEY,
+            revision INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("""
+        INSERT INTO question_bank_revision (id, revision) VALUES (1, 1)
+        ON CONFLICT(id) DO UPDATE SET revision = revision + 1
+    """)
+
+
+# 全域共用的題庫
+question_bank = QuestionBank()
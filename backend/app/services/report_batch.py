@@ -0,0 +1,122 @@
+"""
+批次報告
+一次取得多位用戶（例如整個部門）的綜合報告：
+以少數幾次查詢載入所有用戶的答案並向量化計分，
+再將各用戶的分析與報告組裝分批交給行程池（預設與 CPU 核心數相同）平行處理，
+每批完成即以 NDJSON 逐行輸出，單一用戶失敗只會在該行回報錯誤。
+
+行程池中的工作只使用傳入的分數，不存取資料庫。
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.responses import dumps
+from app.services.batch_scoring import score_users
+from app.services.report_builder import analyze_scores, assemble_report
+from app.services.scoring import ScoreResult, ScoringTable
+
+# 行程池大小、單次請求的用戶數上限、每批用戶數與同時處理的批數上限
+REPORT_BATCH_WORKERS = int(os.getenv("REPORT_BATCH_WORKERS", str(os.cpu_count() or 1)))
+REPORT_BATCH_MAX_USERS = int(os.getenv("REPORT_BATCH_MAX_USERS", "1000"))
+REPORT_BATCH_CHUNK_SIZE = int(os.getenv("REPORT_BATCH_CHUNK_SIZE", "25"))
+REPORT_BATCH_CONCURRENCY = int(os.getenv("REPORT_BATCH_CONCURRENCY", str(REPORT_BATCH_WORKERS * 2)))
+
+# (user_id, 各 slot 總分, 各 slot 計分題數)
+UserScores = Tuple[str, Tuple[float, ...], Tuple[int, ...]]
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+# 工作行程中依題庫版本快取的計分表（只用於切分各測驗的維度，不需要題目）
+_worker_tables: Dict[str, ScoringTable] = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """取得批次報告行程池（以 spawn 建立，不繼承父行程的資料庫連線）"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=REPORT_BATCH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    """關閉行程池（應用程式關閉時呼叫）"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _report_line(user_id: str, **fields) -> bytes:
+    return dumps({"user_id": user_id, **fields}) + b"\n"
+
+
+def build_report_lines(bank_version: str, users: Sequence[UserScores]) -> List[bytes]:
+    """（工作行程）產生一批用戶的報告，每位用戶一行 NDJSON"""
+    table = _worker_tables.get(bank_version)
+    if table is None:
+        table = _worker_tables[bank_version] = ScoringTable((), bank_version)
+
+    lines = []
+    for user_id, totals, counts in users:
+        try:
+            result = ScoreResult(user_id=user_id, totals=totals, counts=counts, table=table)
+            report = assemble_report(user_id, analyze_scores(user_id, result))
+            lines.append(_report_line(user_id, report=report))
+        except Exception as e:
+            lines.append(_report_line(user_id, error=f"生成報告失敗：{str(e)}"))
+    return lines
+
+
+async def stream_batch_reports(user_ids: Sequence[str]) -> AsyncIterator[bytes]:
+    """以 NDJSON 串流多位用戶的報告（依完成順序輸出）"""
+    user_ids = list(dict.fromkeys(user_ids))
+    batch = await run_in_threadpool(score_users, user_ids)
+    bank_version = batch.table.version
+    scores: List[UserScores] = [
+        (result.user_id, result.totals, result.counts) for result in batch.results()
+    ]
+    chunks = [
+        scores[start:start + REPORT_BATCH_CHUNK_SIZE]
+        for start in range(0, len(scores), REPORT_BATCH_CHUNK_SIZE)
+    ]
+
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    pending: Dict[asyncio.Future, List[UserScores]] = {}
+    try:
+        for chunk in chunks:
+            # 同時處理的批數達上限時，先輸出已完成的批次
+            while len(pending) >= REPORT_BATCH_CONCURRENCY:
+                for line in await _next_completed(pending):
+                    yield line
+            pending[loop.run_in_executor(pool, build_report_lines, bank_version, chunk)] = chunk
+
+        while pending:
+            for line in await _next_completed(pending):
+                yield line
+    finally:
+        # 用戶端中斷時取消尚未開始的批次
+        for future in pending:
+            future.cancel()
+
+
+async def _next_completed(pending: Dict[asyncio.Future, List[UserScores]]) -> List[bytes]:
+    """等待任一批次完成並取出其輸出；行程池失敗時該批每位用戶各回報一行錯誤"""
+    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    lines: List[bytes] = []
+    for future in done:
+        chunk = pending.pop(future)
+        try:
+            lines.extend(future.result())
+        except Exception as e:
+            lines.extend(_report_line(user_id, error=f"生成報告失敗：{str(e)}") for user_id, _, _ in chunk)
+    return lines
@@ -0,0 +1,182 @@
+"""
+綜合人格報告
+將四種測驗的分析結果整合為完整報告，供單一用戶報告、批次報告與串流報告共用。
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.responses import fragment
+from app.services.comprehensive_analysis import ComprehensivePersonalityAnalyzer
+from app.services.integrated_insights import build_integrated_insights
+from app.services.report_store import REPORT_ANALYSES, analysis_failed, get_test_analyses
+from app.services.scoring import ScoreResult
+
+
+def build_personality_report(user_id: str) -> Dict[str, Any]:
+    """執行所有測驗的綜合分析並整合為報告"""
+    # 優先使用已實體化於 test_report 的分析結果，版本過期的測驗才即時計算（各測驗同時執行）
+    return assemble_report(user_id, get_test_analyses(user_id))
+
+
+def analyze_scores(user_id: str, result: ScoreResult) -> Dict[str, Dict[str, Any]]:
+    """以計分結果依序執行四種測驗分析（不寫入 test_report）；失敗的測驗為 {"error": ...}"""
+    analyzer = ComprehensivePersonalityAnalyzer()
+    analyses = {}
+    for test_type, method in REPORT_ANALYSES.items():
+        try:
+            analyses[test_type] = getattr(analyzer, method)(user_id, result)
+        except Exception as e:
+            analyses[test_type] = {"error": f"{test_type} 分析失敗：{str(e)}"}
+    return analyses
+
+
+def assemble_report(user_id: str, analyses: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """將四種測驗的分析結果整合為報告（固定敘述文字以預先編碼的 JSON 片段嵌入）
+
+    單一測驗分析失敗或逾時時，該測驗的區段只包含錯誤訊息，並列於 errors，其餘區段照常產生。
+    """
+    errors = {}
+    detailed_analysis = {}
+    for test_type in _REPORT_SECTIONS:
+        key, section, error = report_section(test_type, analyses[test_type])
+        detailed_analysis[key] = section
+        if error is not None:
+            errors[test_type] = error
+
+    succeeded = {test_type: analyses[test_type] for test_type in _REPORT_SECTIONS if test_type not in errors}
+
+    # 整合所有結果
+    report = {
+        "user_id": user_id,
+        "report_generated_at": "2024-01-01T00:00:00Z",  # 可以改為實際時間
+        "summary": report_summary(succeeded),
+        "detailed_analysis": detailed_analysis,
+        "integrated_insights": report_insights(succeeded)
+    }
+    if errors:
+        report["errors"] = errors
+    return report
+
+
+def report_section(test_type: str, analysis: Dict[str, Any]) -> Tuple[str, Dict[str, Any], Optional[str]]:
+    """產生單一測驗的報告區段，回傳 (區段名稱, 區段內容, 錯誤訊息)；失敗時區段只包含錯誤訊息"""
+    key, label, build_section = _REPORT_SECTIONS[test_type]
+    if analysis_failed(analysis):
+        error = analysis["error"]
+    else:
+        try:
+            return key, build_section(analysis), None
+        except Exception as e:
+            error = f"{test_type} 報告區段產生失敗：{str(e)}"
+    return key, {"test_type": label, "error": error}, error
+
+
+def report_summary(analyses: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """由成功的分析結果產生摘要（缺少的測驗為 None）"""
+    mbti_result = analyses.get("MBTI", {})
+    disc_result = analyses.get("DISC", {})
+    big5_result = analyses.get("BIG5", {})
+    enneagram_result = analyses.get("enneagram", {})
+    return {
+        "mbti_type": mbti_result.get("personality_type"),
+        "disc_primary": disc_result.get("primary_style"),
+        "big5_type": big5_result.get("combination_analysis", {}).get("personality_type"),
+        "enneagram_type": enneagram_result.get("primary_type")
+    }
+
+
+def summary_from_scores(user_id: str, result: ScoreResult) -> Dict[str, Any]:
+    """直接由分數產生摘要（與 report_summary 結果相同，不需等待完整分析）"""
+    analyzer = ComprehensivePersonalityAnalyzer()
+    return {
+        "mbti_type": analyzer.determine_mbti_type(analyzer.calculate_mbti_score(user_id, result)),
+        "disc_primary": analyzer.determine_disc_styles(analyzer.calculate_disc_score(user_id, result))[0],
+        "big5_type": analyzer.determine_big5_type(analyzer.calculate_big5_score(user_id, result)),
+        "enneagram_type": analyzer.determine_enneagram_type(analyzer.calculate_enneagram_score(user_id, result))
+    }
+
+
+def report_insights(analyses: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """由成功的分析結果產生整合洞察（失敗的測驗以空結果參與）"""
+    return build_integrated_insights(
+        analyses.get("MBTI", {}),
+        analyses.get("DISC", {}),
+        analyses.get("BIG5", {}),
+        analyses.get("enneagram", {})
+    )
+
+
+def _mbti_section(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "test_type": "MBTI",
+        "personality_type": result["personality_type"],
+        "description": fragment(result["description"]),
+        "scores": result["scores"],
+        "preference_strengths": result["preference_strengths"],
+        "combination_analysis": result["combination_analysis"],
+        "strengths": fragment(result["strengths"]),
+        "weaknesses": fragment(result["weaknesses"]),
+        "career_suggestions": fragment(result["career_suggestions"]),
+        "communication_style": fragment(result["communication_style"]),
+        "work_style": fragment(result["work_style"]),
+        "development_suggestions": fragment(result["development_suggestions"])
+    }
+
+
+def _disc_section(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "test_type": "DISC",
+        "primary_style": result["primary_style"],
+        "secondary_style": result["secondary_style"],
+        "description": fragment(result["description"]),
+        "scores": result["scores"],
+        "style_intensities": result["style_intensities"],
+        "combination_analysis": result["combination_analysis"],
+        "strengths": fragment(result["strengths"]),
+        "weaknesses": fragment(result["weaknesses"]),
+        "communication_style": fragment(result["communication_style"]),
+        "work_style": fragment(result["work_style"]),
+        "development_suggestions": fragment(result["development_suggestions"])
+    }
+
+
+def _big5_section(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "test_type": "BIG5",
+        "personality_profile": result["personality_profile"],
+        "scores": result["scores"],
+        "combination_analysis": result["combination_analysis"],
+        "strengths": result["strengths"],
+        "weaknesses": result["weaknesses"],
+        "career_matches": result["career_matches"],
+        "interpersonal_style": result["interpersonal_style"],
+        "development_suggestions": result["development_suggestions"]
+    }
+
+
+def _enneagram_section(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "test_type": "ENNEAGRAM",
+        "primary_type": result["primary_type"],
+        "description": fragment(result["description"]),
+        "scores": result["scores"],
+        "wing_analysis": result["wing_analysis"],
+        "tritype": result["tritype"],
+        "health_level": result["health_level"],
+        "fear": fragment(result["fear"]),
+        "desire": fragment(result["desire"]),
+        "growth": fragment(result["growth"]),
+        "stress": fragment(result["stress"]),
+        "strengths": fragment(result["strengths"]),
+        "weaknesses": fragment(result["weaknesses"]),
+        "development_suggestions": fragment(result["development_suggestions"])
+    }
+
+
+# 測驗類型 → (報告區段名稱, 區段的 test_type, 區段產生函式)
+_REPORT_SECTIONS = {
+    "MBTI": ("mbti", "MBTI", _mbti_section),
+    "DISC": ("disc", "DISC", _disc_section),
+    "BIG5": ("big5", "BIG5", _big5_section),
+    "enneagram": ("enneagram", "ENNEAGRAM", _enneagram_section),
+}
@@ -0,0 +1,72 @@
+"""
+報告快取
+以 (user_id, 題庫版本, 答案版本) 為鍵快取完整報告（已編碼的 JSON）。
+答案版本由資料庫的 user_answer_version 讀取（答案寫入時在同一交易中遞增），
+任一 worker 寫入答案後，所有 worker 的舊版本報告都不再命中，並由 LRU 淘汰。
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# 快取的報告數量上限
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "1024"))
+
+
+class ReportCache:
+    """有上限的 LRU 報告快取（執行緒安全）"""
+
+    def __init__(self, max_size: int = REPORT_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(user_id: str, bank_version: str, answer_versions: Dict[str, int]) -> Tuple[str, str, Tuple[Tuple[str, int], ...]]:
+        """answer_versions 為 answer_versions.get_answer_versions() 的結果（需在生成報告前讀取）"""
+        return (user_id, bank_version, tuple(sorted(answer_versions.items())))
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """取得快取的報告（未命中回傳 None）"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """寫入報告（生成期間答案有異動時，報告寫入的是舊版本的鍵，不會被之後的請求讀到）"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """快取命中統計"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0
+            }
+
+
+# 全域共用的報告快取
+report_cache = ReportCache()
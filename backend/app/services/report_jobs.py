@@ -0,0 +1,227 @@
+"""
+報告背景工作佇列
+報告生成改由背景工作執行：用戶端提交後取得工作 ID，再輪詢（或長輪詢）工作狀態取得報告。
+
+- 工作狀態保存於 report_job 資料表，服務重新啟動後繼續執行未完成的工作
+- 取出工作時記錄持有的行程與租約到期時間，執行期間定期續約；只有租約過期（持有的行程已停止或當機）
+  的工作才會重新排入，多個 uvicorn worker 或滾動重啟時不會重複執行仍在進行中的工作
+- 優先順序 0～9（數值越小越優先）；數值達 REPORT_JOB_BULK_PRIORITY 者為批量工作
+- 同一用戶已有等待中的工作時不重複建立（沿用既有工作，優先順序取較高者）
+- 每個行程以 REPORT_JOB_WORKERS 個 worker 執行，其中最多 REPORT_JOB_BULK_WORKERS 個同時執行批量工作，
+  其餘 worker 只處理互動工作，批量工作再多也不會讓互動請求等待
+
+提交工作時放入行程內的喚醒佇列，閒置的 worker 立即由資料庫取出最優先的工作；
+其他行程提交的工作由 worker 每隔 REPORT_JOB_POLL_INTERVAL 秒檢查一次。
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.ids import next_job_id
+from app.core.responses import dumps
+from app.repositories.answer_versions import get_answer_versions
+from app.repositories import report_jobs as job_repo
+from app.services.question_bank import question_bank
+from app.services.report_builder import build_personality_report
+from app.services.report_cache import report_cache
+
+# worker 數量、可同時執行批量工作的 worker 數量、批量工作的優先順序門檻
+REPORT_JOB_WORKERS = int(os.getenv("REPORT_JOB_WORKERS", "4"))
+REPORT_JOB_BULK_WORKERS = int(os.getenv("REPORT_JOB_BULK_WORKERS", "1"))
+REPORT_JOB_BULK_PRIORITY = int(os.getenv("REPORT_JOB_BULK_PRIORITY", "5"))
+# 閒置 worker 檢查資料庫的間隔、長輪詢的最長等待秒數、已結束工作的保留時數
+REPORT_JOB_POLL_INTERVAL = float(os.getenv("REPORT_JOB_POLL_INTERVAL", "2"))
+REPORT_JOB_MAX_WAIT = float(os.getenv("REPORT_JOB_MAX_WAIT", "30"))
+REPORT_JOB_RETENTION_HOURS = float(os.getenv("REPORT_JOB_RETENTION_HOURS", "24"))
+# 執行租約秒數（每三分之一租約時間續約一次，並檢查其他行程過期的工作）
+REPORT_JOB_LEASE_SECONDS = float(os.getenv("REPORT_JOB_LEASE_SECONDS", "60"))
+
+MIN_JOB_PRIORITY = 0
+MAX_JOB_PRIORITY = 9
+
+logger = logging.getLogger(__name__)
+
+
+class ReportJobQueue:
+    """報告工作的 worker 池"""
+
+    def __init__(
+        self,
+        workers: int = REPORT_JOB_WORKERS,
+        bulk_workers: int = REPORT_JOB_BULK_WORKERS,
+        bulk_priority: int = REPORT_JOB_BULK_PRIORITY,
+        poll_interval: float = REPORT_JOB_POLL_INTERVAL,
+        lease_seconds: float = REPORT_JOB_LEASE_SECONDS
+    ):
+        self.workers = max(workers, 1)
+        # 至少保留一個 worker 給互動工作（只有一個 worker 時仍允許執行批量工作）
+        self.bulk_workers = max(min(bulk_workers, self.workers - 1), 1)
+        self.bulk_priority = bulk_priority
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._bulk_running = 0
+        self._ready: Optional[asyncio.Queue] = None
+        self._claim_lock: Optional[asyncio.Lock] = None
+        self._finished: Optional[asyncio.Condition] = None
+        self._tasks = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def _is_bulk(self, priority: int) -> bool:
+        return priority >= self.bulk_priority
+
+    async def enqueue(self, user_id: str, priority: int) -> Tuple[int, bool]:
+        """提交報告工作，回傳 (工作 ID, 是否與既有的等待中工作合併)"""
+        job_id, deduplicated = await job_repo.enqueue_report_job(next_job_id(), user_id, priority)
+        if self._ready is not None and not deduplicated:
+            self._ready.put_nowait(job_id)
+        return job_id, deduplicated
+
+    async def _claim(self) -> Optional[Tuple[int, str, int]]:
+        # 依序取出工作，批量工作的執行數量才能正確計算
+        async with self._claim_lock:
+            max_priority = self.bulk_priority if self._bulk_running >= self.bulk_workers else None
+            job = await job_repo.claim_report_job(self.owner, self.lease_seconds, max_priority)
+            if job is not None and self._is_bulk(job[2]):
+                self._bulk_running += 1
+            return job
+
+    async def _build_report(self, job_id: int, user_id: str) -> Dict[str, Any]:
+        """生成報告，執行期間定期續約"""
+        build = asyncio.ensure_future(run_in_threadpool(build_personality_report, user_id))
+        try:
+            while True:
+                done, _ = await asyncio.wait({build}, timeout=self.lease_seconds / 3)
+                if done:
+                    return build.result()
+                if not await job_repo.renew_report_job_lease(job_id, self.owner, self.lease_seconds):
+                    logger.warning(f"報告工作 {job_id} 的租約已失效，結果將不會寫入")
+        finally:
+            build.cancel()
+
+    async def _execute(self, job_id: int, user_id: str) -> None:
+        try:
+            cache_key = report_cache.make_key(user_id, question_bank.version, await get_answer_versions(user_id))
+            report = await self._build_report(job_id, user_id)
+            encoded_report = dumps(report)
+            if "errors" not in report:
+                report_cache.set(cache_key, encoded_report)
+            finished = await job_repo.finish_report_job(job_id, self.owner, result=encoded_report.decode("utf-8"))
+        except Exception as e:
+            logger.exception(f"報告工作 {job_id} 失敗")
+            finished = await job_repo.finish_report_job(job_id, self.owner, error=f"生成報告失敗：{str(e)}")
+        if not finished:
+            logger.warning(f"報告工作 {job_id} 已由其他行程接手，略過結果")
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.exception("取出報告工作失敗")
+                job = None
+
+            if job is None:
+                # 等待新工作的通知；逾時仍檢查一次資料庫（其他行程提交的工作、批量名額釋出）
+                try:
+                    await asyncio.wait_for(self._ready.get(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id, user_id, priority = job
+            try:
+                await self._execute(job_id, user_id)
+            except Exception:
+                logger.exception(f"記錄報告工作 {job_id} 結果失敗")
+            finally:
+                if self._is_bulk(priority):
+                    self._bulk_running -= 1
+                    # 釋出批量名額，喚醒閒置的 worker 接手等待中的批量工作
+                    self._ready.put_nowait(job_id)
+                async with self._finished:
+                    self._finished.notify_all()
+
+    async def _requeue_expired(self) -> None:
+        requeued = await job_repo.requeue_expired_jobs()
+        if requeued:
+            logger.info(f"重新排入 {requeued} 個租約過期的報告工作")
+            for _ in range(requeued):
+                self._ready.put_nowait(None)
+
+    async def _maintain(self) -> None:
+        """定期重新排入租約過期的工作，並每小時清除已結束的工作"""
+        loop = asyncio.get_running_loop()
+        next_purge = loop.time()
+        while True:
+            try:
+                await self._requeue_expired()
+                if loop.time() >= next_purge:
+                    await job_repo.purge_finished_jobs(REPORT_JOB_RETENTION_HOURS)
+                    next_purge = loop.time() + 3600
+            except Exception:
+                logger.exception("維護報告工作佇列失敗")
+            await asyncio.sleep(self.lease_seconds / 3)
+
+    async def wait(self, job_id: int, timeout: float) -> Optional[Dict[str, Any]]:
+        """取得工作狀態；工作未結束時最多等待 timeout 秒（長輪詢）"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + min(timeout, REPORT_JOB_MAX_WAIT)
+        while True:
+            job = await job_repo.get_report_job(job_id)
+            remaining = deadline - loop.time()
+            if job is None or job["status"] in job_repo.FINISHED_STATUSES or remaining <= 0:
+                return job
+            if self._finished is None:
+                await asyncio.sleep(min(self.poll_interval, remaining))
+                continue
+            # 本行程有工作結束時重新檢查；其他行程執行的工作則定期檢查
+            try:
+                async with self._finished:
+                    await asyncio.wait_for(self._finished.wait(), timeout=min(self.poll_interval, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self) -> None:
+        """啟動 worker（需在事件迴圈中呼叫）；租約過期的中斷工作由維護工作重新排入"""
+        if self.running:
+            return
+
+        self._ready = asyncio.Queue()
+        self._claim_lock = asyncio.Lock()
+        self._finished = asyncio.Condition()
+        self._bulk_running = 0
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(loop.create_task(self._maintain()))
+
+    async def stop(self) -> None:
+        """停止 worker，並將本行程執行中的工作改回等待中，由其他行程或下次啟動時重新執行"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._tasks:
+            released = await job_repo.release_owned_jobs(self.owner)
+            if released:
+                logger.info(f"已釋出 {released} 個執行中的報告工作")
+        self._tasks = []
+        self._ready = None
+        self._claim_lock = None
+        self._finished = None
+
+
+# 全域共用的報告工作佇列
+report_job_queue = ReportJobQueue()
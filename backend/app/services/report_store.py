@@ -0,0 +1,236 @@
+"""
+報告實體化
+測驗完成（session 結束或整批提交完成一種測驗）時計算該測驗的分析結果，
+連同版本戳記寫入 test_report；讀取時版本相符即直接使用，過期才即時重新計算。
+
+版本戳記：題庫版本 + 該測驗的答案版本（user_answer_version，答案寫入時在同一交易中遞增），
+讀取時只需以主鍵查詢，不掃描用戶的答案歷史。
+
+各測驗的分析在有上限的共用執行緒池中執行，每個請求最多同時執行 REPORT_ANALYSIS_CONCURRENCY 項
+（分析主要是 Python 運算，多開執行緒幾乎不會更快，限制數量避免單一請求佔滿執行緒池）；
+每項分析自實際開始執行起計時，在執行緒池中排隊的時間不計入逾時。
+單一測驗失敗或逾時只會讓該測驗回傳 {"error": ...}（不寫入），其他測驗照常完成。
+"""
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.database import get_connection
+from app.repositories.answer_versions import load_answer_versions
+from app.services.comprehensive_analysis import ComprehensivePersonalityAnalyzer
+from app.services.question_bank import question_bank
+from app.services.scoring import ScoreResult, get_scoring_table, load_dimension_scores, normalize_test_type, score_user
+
+# 分析執行緒池大小、每項分析的逾時秒數（自開始執行起計算）、每個請求同時執行的分析數量上限
+REPORT_ANALYSIS_WORKERS = int(os.getenv("REPORT_ANALYSIS_WORKERS", "4"))
+REPORT_ANALYSIS_TIMEOUT = float(os.getenv("REPORT_ANALYSIS_TIMEOUT", "10"))
+REPORT_ANALYSIS_CONCURRENCY = int(os.getenv("REPORT_ANALYSIS_CONCURRENCY", "2"))
+
+logger = logging.getLogger(__name__)
+
+# 所有請求共用的分析執行緒池（逾時的分析仍會執行完畢，但不再等待其結果）
+_analysis_pool = ThreadPoolExecutor(max_workers=REPORT_ANALYSIS_WORKERS, thread_name_prefix="report-analysis")
+
+# 報告涵蓋的測驗類型與對應的分析方法
+REPORT_ANALYSES: Dict[str, str] = {
+    "MBTI": "analyze_mbti_comprehensive",
+    "DISC": "analyze_disc_comprehensive",
+    "BIG5": "analyze_big5_comprehensive",
+    "enneagram": "analyze_enneagram_comprehensive",
+}
+
+
+def _answer_versions(conn, user_id: str) -> Dict[str, str]:
+    """用戶各測驗類型目前的版本戳記"""
+    bank_version = question_bank.version
+    answer_versions = load_answer_versions(conn, user_id)
+    return {
+        test_type: f"{bank_version}:{answer_versions.get(test_type, 0)}"
+        for test_type in REPORT_ANALYSES
+    }
+
+
+def _load_stored(conn, user_id: str) -> Dict[str, Dict[str, Any]]:
+    """讀取已實體化的報告（{"version": ..., "analysis": ...}）"""
+    stored = {}
+    for test_type, result_json in conn.execute(
+        "SELECT test_type, result FROM test_report WHERE user_id = ? ORDER BY id",
+        (user_id,)
+    ):
+        try:
+            envelope = json.loads(result_json)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(envelope, dict) and "version" in envelope and "analysis" in envelope:
+            stored[test_type] = envelope
+    return stored
+
+
+def _store(conn, user_id: str, test_type: str, version: str, analysis: Dict[str, Any]) -> None:
+    """寫入（取代）用戶該測驗的實體化報告"""
+    conn.execute("DELETE FROM test_report WHERE user_id = ? AND test_type = ?", (user_id, test_type))
+    conn.execute(
+        "INSERT INTO test_report (user_id, test_type, result, created_at) VALUES (?, ?, ?, ?)",
+        (
+            user_id,
+            test_type,
+            json.dumps({"version": version, "analysis": analysis}, ensure_ascii=False),
+            datetime.now().isoformat()
+        )
+    )
+
+
+def _analyze(user_id: str, test_type: str, result: ScoreResult, started: Dict[str, float]) -> Dict[str, Any]:
+    # 記錄實際開始執行的時間，逾時由此起算
+    started[test_type] = time.monotonic()
+    analyzer = ComprehensivePersonalityAnalyzer()
+    return getattr(analyzer, REPORT_ANALYSES[test_type])(user_id, result)
+
+
+def analysis_failed(analysis: Dict[str, Any]) -> bool:
+    """分析結果是否為失敗（{"error": ...}）"""
+    return "error" in analysis
+
+
+def analysis_outcome(user_id: str, test_type: str, future: Future) -> Dict[str, Any]:
+    """取出已結束分析的結果；未完成（逾時）或失敗時回傳 {"error": ...}"""
+    if not future.done():
+        future.cancel()
+        logger.warning(f"用戶 {user_id} 的 {test_type} 分析逾時")
+        return {"error": f"{test_type} 分析逾時"}
+    try:
+        return future.result()
+    except Exception as e:
+        logger.error(f"用戶 {user_id} 的 {test_type} 分析失敗: {str(e)}")
+        return {"error": f"{test_type} 分析失敗：{str(e)}"}
+
+
+def iter_analyses(
+    user_id: str,
+    test_types: Iterable[str],
+    result: ScoreResult,
+    timeout: float = REPORT_ANALYSIS_TIMEOUT,
+    max_in_flight: int = REPORT_ANALYSIS_CONCURRENCY
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """執行多項測驗分析，依完成順序產生 (測驗類型, 分析結果)；失敗或逾時的測驗為 {"error": ...}
+
+    最多同時提交 max_in_flight 項，一項結束（或逾時）才提交下一項；
+    提前關閉產生器時取消尚未開始的分析。
+    """
+    queued = list(test_types)
+    in_flight: Dict[Future, str] = {}
+    started: Dict[str, float] = {}
+    try:
+        while queued or in_flight:
+            while queued and len(in_flight) < max(max_in_flight, 1):
+                test_type = queued.pop(0)
+                in_flight[_analysis_pool.submit(_analyze, user_id, test_type, result, started)] = test_type
+
+            # 等到任一項完成或最早開始的一項逾時；都還在排隊時最多等待一個逾時長度後重新檢查
+            deadlines = [started[test_type] + timeout for test_type in in_flight.values() if test_type in started]
+            remaining = max(min(deadlines) - time.monotonic(), 0) if deadlines else timeout
+            done, _ = wait(in_flight, timeout=remaining, return_when=FIRST_COMPLETED)
+
+            now = time.monotonic()
+            for future, test_type in list(in_flight.items()):
+                if future in done or (test_type in started and now - started[test_type] >= timeout):
+                    del in_flight[future]
+                    yield test_type, analysis_outcome(user_id, test_type, future)
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def _run_analyses(user_id: str, test_types: List[str], result: ScoreResult, timeout: float) -> Dict[str, Dict[str, Any]]:
+    """執行多項測驗分析；失敗或逾時的測驗回傳 {"error": ...}"""
+    outcomes = dict(iter_analyses(user_id, test_types, result, timeout))
+    return {test_type: outcomes[test_type] for test_type in test_types}
+
+
+def _normalize_report_types(test_types: Optional[Iterable[str]]) -> List[str]:
+    if test_types is None:
+        return list(REPORT_ANALYSES)
+    test_types = [normalize_test_type(test_type) for test_type in test_types]
+    return [test_type for test_type in test_types if test_type in REPORT_ANALYSES]
+
+
+def score_for_reports(user_id: str) -> Tuple[Dict[str, str], ScoreResult]:
+    """在同一個交易中取得答案版本與分數，確保版本戳記與分數一致
+
+    一般情況只在讀取交易中讀取版本與累計分數，不與答案寫入互相阻塞；
+    累計分數尚未建立或題庫已變更而需要重建時，才在寫入交易中重建。
+    """
+    table = get_scoring_table()
+    with get_connection() as conn:
+        conn.execute("BEGIN")
+        try:
+            versions = _answer_versions(conn, user_id)
+            result = load_dimension_scores(conn, user_id, table)
+        finally:
+            conn.commit()
+        if result is not None:
+            return versions, result
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            versions = _answer_versions(conn, user_id)
+            result = score_user(user_id)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return versions, result
+
+
+def store_analyses(user_id: str, versions: Dict[str, str], analyses: Dict[str, Dict[str, Any]]) -> None:
+    """寫入成功的分析結果（失敗者略過）"""
+    with get_connection() as conn:
+        for test_type, analysis in analyses.items():
+            if not analysis_failed(analysis):
+                _store(conn, user_id, test_type, versions[test_type], analysis)
+        conn.commit()
+
+
+def materialize_reports(
+    user_id: str,
+    test_types: Optional[Iterable[str]] = None,
+    timeout: float = REPORT_ANALYSIS_TIMEOUT
+) -> Dict[str, Dict[str, Any]]:
+    """計算並寫入指定測驗（預設全部）的報告，回傳各測驗的分析結果（失敗者為 {"error": ...}，不寫入）"""
+    test_types = _normalize_report_types(test_types)
+    versions, result = score_for_reports(user_id)
+
+    # 分析只使用已取得的分數，執行期間不佔用連線
+    analyses = _run_analyses(user_id, test_types, result, timeout)
+    store_analyses(user_id, versions, analyses)
+    return analyses
+
+
+def load_current_analyses(user_id: str) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """讀取版本相符的實體化報告，回傳 (分析結果, 需要重新計算的測驗類型)"""
+    with get_connection() as conn:
+        conn.execute("BEGIN")
+        versions = _answer_versions(conn, user_id)
+        stored = _load_stored(conn, user_id)
+        conn.commit()
+
+    analyses = {
+        test_type: stored[test_type]["analysis"]
+        for test_type in REPORT_ANALYSES
+        if test_type in stored and stored[test_type]["version"] == versions[test_type]
+    }
+    stale = [test_type for test_type in REPORT_ANALYSES if test_type not in analyses]
+    return analyses, stale
+
+
+def get_test_analyses(user_id: str) -> Dict[str, Dict[str, Any]]:
+    """取得四種測驗的分析結果：版本相符的實體化報告直接使用，其餘即時計算並回寫（失敗者為 {"error": ...}）"""
+    analyses, stale = load_current_analyses(user_id)
+    if stale:
+        analyses.update(materialize_reports(user_id, stale))
+    return analyses
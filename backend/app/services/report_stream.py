@@ -0,0 +1,79 @@
+"""
+串流報告（Server-Sent Events）
+將綜合報告拆成數個 SSE 事件，各區段一完成就送出，前端可先顯示摘要：
+summary → mbti / disc / big5 / enneagram（依完成順序）→ integrated_insights → done
+
+已實體化且版本相符的測驗區段立即送出；需要重新計算時，摘要直接由分數產生，
+各測驗分析於分析執行緒池執行（每個請求的同時執行數量有上限），完成即送出並回寫 test_report。
+"""
+
+import logging
+from typing import Any, AsyncIterator, Dict
+
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from app.core.responses import dumps
+from app.services.report_builder import (
+    report_insights,
+    report_section,
+    report_summary,
+    summary_from_scores,
+)
+from app.services.report_store import (
+    REPORT_ANALYSIS_TIMEOUT,
+    analysis_failed,
+    iter_analyses,
+    load_current_analyses,
+    score_for_reports,
+    store_analyses,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """編碼一個 SSE 事件"""
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+async def stream_personality_report(user_id: str) -> AsyncIterator[bytes]:
+    """以 SSE 事件逐段輸出用戶的綜合報告"""
+    try:
+        analyses, stale = await run_in_threadpool(load_current_analyses, user_id)
+
+        if not stale:
+            yield sse_event("summary", {"user_id": user_id, **report_summary(analyses)})
+        else:
+            versions, result = await run_in_threadpool(score_for_reports, user_id)
+            yield sse_event("summary", {"user_id": user_id, **summary_from_scores(user_id, result)})
+
+        succeeded: Dict[str, Dict[str, Any]] = {}
+        for test_type, analysis in analyses.items():
+            key, section, error = report_section(test_type, analysis)
+            if error is None:
+                succeeded[test_type] = analysis
+            yield sse_event(key, section)
+
+        if stale:
+            computed = {}
+            outcomes = iter_analyses(user_id, stale, result, REPORT_ANALYSIS_TIMEOUT)
+            try:
+                # 等待分析結果會阻塞，交由執行緒池逐項取出
+                async for test_type, analysis in iterate_in_threadpool(outcomes):
+                    computed[test_type] = analysis
+                    key, section, error = report_section(test_type, analysis)
+                    if error is None:
+                        succeeded[test_type] = analysis
+                    yield sse_event(key, section)
+            finally:
+                # 用戶端中斷時取消尚未開始的分析
+                outcomes.close()
+
+            if any(not analysis_failed(analysis) for analysis in computed.values()):
+                await run_in_threadpool(store_analyses, user_id, versions, computed)
+
+        yield sse_event("integrated_insights", report_insights(succeeded))
+        yield sse_event("done", {"user_id": user_id})
+    except Exception as e:
+        logger.error(f"串流用戶 {user_id} 的報告失敗: {str(e)}")
+        yield sse_event("error", {"detail": f"生成報告失敗：{str(e)}"})
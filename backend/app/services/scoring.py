@@ -0,0 +1,292 @@
+"""
+計分引擎
+由記憶體題庫一次編譯 (question_id, answer) → (維度索引, 分數) 對照表，
+反向計分於編譯時套用，計分時只需查表累加，不再做 JSON 解析與字串搜尋。
+每位用戶只查詢一次答案，一次算出四種測驗的分數（ScoreResult），
+供所有分析器與報告共用。
+"""
+
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.database import get_connection
+from app.services.question_bank import Question, QuestionBank, question_bank
+
+# 各測驗類型的計分維度（順序即回傳分數的順序）
+SCORING_DIMENSIONS: Dict[str, Tuple[str, ...]] = {
+    "MBTI": ("E", "I", "S", "N", "T", "F", "J", "P"),
+    "DISC": ("D", "I", "S", "C"),
+    "BIG5": ("O", "C", "E", "A", "N"),
+    "enneagram": ("1", "2", "3", "4", "5", "6", "7", "8", "9"),
+}
+
+# 各種大小寫寫法對應到題庫中的測驗類型
+TEST_TYPE_ALIASES: Dict[str, str] = {
+    "mbti": "MBTI",
+    "disc": "DISC",
+    "big5": "BIG5",
+    "enneagram": "enneagram",
+}
+
+# MBTI 只計 E/S/T/J 四類題目：正向題計入本身，反向題計入對立面
+MBTI_TARGETS: Dict[str, Tuple[str, str]] = {
+    "E": ("E", "I"),
+    "S": ("S", "N"),
+    "T": ("T", "F"),
+    "J": ("J", "P"),
+}
+
+
+def normalize_test_type(test_type: str) -> str:
+    """將 'Big5'、'Enneagram' 等寫法統一為題庫中的測驗類型"""
+    return TEST_TYPE_ALIASES.get(test_type.lower(), test_type)
+
+
+def _target_dimension(question: Question) -> Optional[str]:
+    """題目分數應計入的維度（不計分的題目回傳 None）"""
+    if question.test_type == "MBTI":
+        targets = MBTI_TARGETS.get(question.category)
+        if targets is None:
+            return None
+        return targets[1] if question.is_reverse else targets[0]
+
+    if question.category in SCORING_DIMENSIONS[question.test_type]:
+        return question.category
+    return None
+
+
+class ScoringTable:
+    """
+    陣列式計分表
+    所有測驗的維度攤平成一個 slot 陣列，每題記錄其 slot 與各選項分數。
+    """
+
+    def __init__(self, questions: Iterable[Question], version: str = ""):
+        self.version = version
+
+        # slot 配置：(測驗類型, 維度)
+        self.slots: List[Tuple[str, str]] = []
+        self.offsets: Dict[str, Tuple[int, int]] = {}
+        slot_index: Dict[Tuple[str, str], int] = {}
+        for test_type, dimensions in SCORING_DIMENSIONS.items():
+            start = len(self.slots)
+            for dimension in dimensions:
+                slot_index[(test_type, dimension)] = len(self.slots)
+                self.slots.append((test_type, dimension))
+            self.offsets[test_type] = (start, len(self.slots))
+
+        # 每題的 slot 與選項分數（依選項順序）
+        self.question_ids: List[int] = []
+        self.question_slots: List[int] = []
+        self.option_scores: List[Tuple[float, ...]] = []
+        self.option_index: Dict[Tuple[int, str], int] = {}
+        self._lookup: Dict[Tuple[int, str], Tuple[int, float]] = {}
+
+        for question in questions:
+            if question.test_type not in SCORING_DIMENSIONS or not isinstance(question.weight, list):
+                continue
+            dimension = _target_dimension(question)
+            if dimension is None:
+                continue
+
+            slot = slot_index[(question.test_type, dimension)]
+            scores = tuple(float(score) for score in question.weight[:len(question.options)])
+
+            self.question_ids.append(question.id)
+            self.question_slots.append(slot)
+            self.option_scores.append(scores)
+
+            for index, option in enumerate(question.options):
+                # 重複選項以第一個為準（與 list.index 相同）
+                key = (question.id, option)
+                if key in self.option_index:
+                    continue
+                self.option_index[key] = index
+                if index < len(scores):
+                    self._lookup[key] = (slot, scores[index])
+
+    @property
+    def size(self) -> int:
+        """slot 總數"""
+        return len(self.slots)
+
+    def accumulate(
+        self,
+        rows: Iterable[Sequence],
+        totals: Optional[List[float]] = None,
+        counts: Optional[List[int]] = None
+    ) -> List[float]:
+        """累加 (question_id, answer) 資料列的分數，回傳所有 slot 的總分（可選擇同時計算題數）"""
+        if totals is None:
+            totals = [0.0] * len(self.slots)
+        lookup = self._lookup.get
+        if counts is None:
+            for question_id, answer in rows:
+                entry = lookup((question_id, answer))
+                if entry is not None:
+                    totals[entry[0]] += entry[1]
+        else:
+            for question_id, answer in rows:
+                entry = lookup((question_id, answer))
+                if entry is not None:
+                    totals[entry[0]] += entry[1]
+                    counts[entry[0]] += 1
+        return totals
+
+    def dimension_deltas(
+        self,
+        added: Iterable[Sequence],
+        removed: Iterable[Sequence] = ()
+    ) -> List[Tuple[str, str, float, int]]:
+        """新增 / 移除 (question_id, answer) 對各維度造成的 (測驗類型, 維度, 分數變化, 題數變化)"""
+        deltas: Dict[int, List] = {}
+        for rows, sign in ((added, 1), (removed, -1)):
+            for question_id, answer in rows:
+                entry = self._lookup.get((question_id, answer))
+                if entry is None:
+                    continue
+                delta = deltas.setdefault(entry[0], [0.0, 0])
+                delta[0] += sign * entry[1]
+                delta[1] += sign
+        return [
+            (self.slots[slot][0], self.slots[slot][1], score, count)
+            for slot, (score, count) in sorted(deltas.items())
+            if score or count
+        ]
+
+    def split(self, totals: Sequence, test_type: str) -> Dict[str, float]:
+        """取出指定測驗類型的維度分數"""
+        start, end = self.offsets[normalize_test_type(test_type)]
+        return {self.slots[slot][1]: totals[slot] for slot in range(start, end)}
+
+    def score(self, rows: Iterable[Sequence], test_type: str) -> Dict[str, float]:
+        """計算單一測驗類型的維度分數"""
+        return self.split(self.accumulate(rows), test_type)
+
+
+_table_lock = threading.Lock()
+_table: Optional[ScoringTable] = None
+
+
+def get_scoring_table(bank: QuestionBank = question_bank) -> ScoringTable:
+    """取得目前題庫版本的計分表（題庫重新載入後自動重新編譯）"""
+    global _table
+    version = bank.version
+    table = _table
+    if table is None or table.version != version:
+        with _table_lock:
+            if _table is None or _table.version != version:
+                questions = [question for test_type in bank.test_types() for question in bank.by_type(test_type)]
+                _table = ScoringTable(questions, version)
+            table = _table
+    return table
+
+
+@dataclass(frozen=True)
+class ScoreResult:
+    """單一用戶四種測驗的計分結果（各維度總分與計分題數）"""
+    user_id: str
+    totals: Tuple[float, ...]
+    counts: Tuple[int, ...]
+    table: ScoringTable = field(compare=False, repr=False)
+
+    def scores(self, test_type: str) -> Dict[str, float]:
+        """指定測驗類型的維度總分（每次回傳新的 dict）"""
+        return self.table.split(self.totals, test_type)
+
+    def answer_counts(self, test_type: str) -> Dict[str, int]:
+        """指定測驗類型各維度的計分題數"""
+        return self.table.split(self.counts, test_type)
+
+    @property
+    def mbti(self) -> Dict[str, float]:
+        return self.scores("MBTI")
+
+    @property
+    def disc(self) -> Dict[str, float]:
+        return self.scores("DISC")
+
+    @property
+    def big5(self) -> Dict[str, float]:
+        return self.scores("BIG5")
+
+    @property
+    def enneagram(self) -> Dict[str, float]:
+        return self.scores("enneagram")
+
+
+# 計分只需要 (question_id, answer)，由 ix_test_answer_user_question 覆蓋索引直接取得
+USER_ANSWERS_QUERY = "SELECT question_id, answer FROM test_answer WHERE user_id = ?"
+
+
+def score_rows(user_id: str, rows: Iterable[Sequence], table: Optional[ScoringTable] = None) -> ScoreResult:
+    """以 (question_id, answer) 資料列計算用戶的所有測驗分數"""
+    table = table or get_scoring_table()
+    counts = [0] * table.size
+    totals = table.accumulate(rows, counts=counts)
+    return ScoreResult(user_id=user_id, totals=tuple(totals), counts=tuple(counts), table=table)
+
+
+def load_dimension_scores(conn, user_id: str, table: ScoringTable) -> Optional[ScoreResult]:
+    """讀取用戶的維度累計分數；尚未建立或題庫版本不符時回傳 None"""
+    rows = conn.execute(
+        "SELECT test_type, dimension, score_sum, answer_count, bank_version FROM user_dimension_score WHERE user_id = ?",
+        (user_id,)
+    ).fetchall()
+    if len(rows) != table.size:
+        return None
+
+    slot_index = {slot: index for index, slot in enumerate(table.slots)}
+    totals = [0.0] * table.size
+    counts = [0] * table.size
+    for test_type, dimension, score_sum, answer_count, bank_version in rows:
+        index = slot_index.get((test_type, dimension))
+        if index is None or bank_version != table.version:
+            return None
+        totals[index] = score_sum
+        counts[index] = answer_count
+    return ScoreResult(user_id=user_id, totals=tuple(totals), counts=tuple(counts), table=table)
+
+
+def store_dimension_scores(conn, result: ScoreResult) -> None:
+    """以完整計分結果重建用戶的維度累計分數（每個維度一列，不提交）"""
+    updated_at = datetime.now().isoformat()
+    conn.execute("DELETE FROM user_dimension_score WHERE user_id = ?", (result.user_id,))
+    conn.executemany(
+        "INSERT INTO user_dimension_score (user_id, test_type, dimension, score_sum, answer_count, bank_version, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (result.user_id, test_type, dimension, result.totals[index], result.counts[index], result.table.version, updated_at)
+            for index, (test_type, dimension) in enumerate(result.table.slots)
+        ]
+    )
+
+
+def score_user(user_id: str) -> ScoreResult:
+    """
+    取得用戶四種測驗的分數
+    優先讀取寫入時增量維護的 user_dimension_score（與維度數量成正比），
+    尚未建立或題庫版本已變更時，單次查詢所有答案重新計分並重建累計分數。
+    """
+    table = get_scoring_table()
+    with get_connection() as conn:
+        result = load_dimension_scores(conn, user_id, table)
+        if result is not None:
+            return result
+
+        # 以寫入交易重建，避免與同時寫入的答案互相遺漏
+        own_transaction = not conn.in_transaction
+        if own_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(USER_ANSWERS_QUERY, (user_id,)).fetchall()
+            result = score_rows(user_id, rows, table)
+            store_dimension_scores(conn, result)
+            if own_transaction:
+                conn.commit()
+        except Exception:
+            if own_transaction:
+                conn.rollback()
+            raise
+    return result
@@ -0,0 +1,93 @@
+"""
+session 計時寫入緩衝
+前端定期呼叫 update-time 回報已作答時間，每次都提交會造成一次落盤。
+計時先寫入記憶體緩衝（同一 session 只保留最後一次的值），
+由背景工作每隔 SESSION_TIME_FLUSH_INTERVAL 秒以單一交易批量寫入；
+暫停、恢復、結束 session 與服務關閉時也會先寫入緩衝。
+緩衝保存在行程記憶體中，多個 worker 部署時各自維護；
+只記錄進行中 session 的計時，批量寫入也只更新進行中的 session，
+其他 worker 在 session 暫停或結束後才寫入的舊計時不會覆蓋結果。
+"""
+
+import asyncio
+import logging
+import os
+from typing import Dict, Optional
+
+from app.repositories import sessions as session_repo
+
+# 背景寫入的間隔（秒）
+SESSION_TIME_FLUSH_INTERVAL = float(os.getenv("SESSION_TIME_FLUSH_INTERVAL", "5"))
+
+logger = logging.getLogger(__name__)
+
+
+class SessionTimeBuffer:
+    """以 session_id 為鍵、後寫覆蓋前寫的計時緩衝"""
+
+    def __init__(self, interval: float = SESSION_TIME_FLUSH_INTERVAL):
+        self.interval = interval
+        self._pending: Dict[int, int] = {}
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def record(self, session_id: int, elapsed_seconds: int) -> Optional[str]:
+        """記錄進行中 session 的計時，回傳 session 狀態（不存在時為 None）
+
+        只有狀態為 in_progress 時寫入緩衝；已暫停或結束的 session 計時由暫停／結束寫定，不記錄。
+        每次都以主鍵查詢狀態（只讀、不落盤），session 在其他 worker 暫停後不會再被記錄。
+        """
+        status = await session_repo.get_session_status(session_id)
+        if status == "in_progress":
+            self._pending[session_id] = elapsed_seconds
+        return status
+
+    async def flush(self) -> int:
+        """將緩衝中的計時以單一交易寫入，回傳寫入的 session 數量"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        # 同時只有一個寫入進行，暫停等操作會等待進行中的寫入完成後才讀取計時
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            try:
+                await session_repo.store_session_times(list(pending.items()))
+            except Exception:
+                # 寫入失敗時放回緩衝（期間收到的新值優先）
+                for session_id, elapsed_seconds in pending.items():
+                    self._pending.setdefault(session_id, elapsed_seconds)
+                raise
+            return len(pending)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("寫入 session 計時失敗")
+
+    def start(self) -> None:
+        """啟動背景寫入（需在事件迴圈中呼叫）"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止背景寫入並寫入剩餘的計時"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+# 全域共用的計時緩衝
+session_time_buffer = SessionTimeBuffer()
@@ -0,0 +1,33 @@
+"""add lookup indexes
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 計分 JOIN 的覆蓋索引（user_id + question_id，附帶 answer 免回表）
+    op.create_index('ix_test_answer_user_question', 'test_answer', ['user_id', 'question_id', 'answer'])
+    # get_latest_session 依 session_id 取得已回答題目
+    op.create_index('ix_test_answer_session', 'test_answer', ['session_id'])
+    # 最新 session 查詢與 ORDER BY started_at
+    op.create_index('ix_test_session_user_type_started', 'test_session', ['user_id', 'test_type', 'started_at'])
+    # 依類型與分類取題
+    op.create_index('ix_test_question_type_category', 'test_question', ['test_type', 'category'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_test_question_type_category', table_name='test_question')
+    op.drop_index('ix_test_session_user_type_started', table_name='test_session')
+    op.drop_index('ix_test_answer_session', table_name='test_answer')
+    op.drop_index('ix_test_answer_user_question', table_name='test_answer')
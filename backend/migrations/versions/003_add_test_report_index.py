@@ -0,0 +1,24 @@
+"""add test_report index
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 讀取與取代實體化報告
+    op.create_index('ix_test_report_user_type', 'test_report', ['user_id', 'test_type'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_test_report_user_type', table_name='test_report')
@@ -0,0 +1,34 @@
+"""add user_dimension_score
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 用戶各維度累計分數，答案寫入時增量更新
+    op.create_table('user_dimension_score',
+    sa.Column('user_id', sa.String(length=64), nullable=False),
+    sa.Column('test_type', sa.String(length=16), nullable=False),
+    sa.Column('dimension', sa.String(length=8), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('answer_count', sa.Integer(), nullable=False),
+    sa.Column('bank_version', sa.String(length=32), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('user_id', 'test_type', 'dimension')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_dimension_score')
@@ -0,0 +1,27 @@
+"""add keyset pagination indexes
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 答案列表依 (created_at, id) 分頁
+    op.create_index('ix_test_answer_user_created', 'test_answer', ['user_id', 'created_at', 'id'])
+    # session 列表依 (started_at, id) 分頁
+    op.create_index('ix_test_session_user_started', 'test_session', ['user_id', 'started_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_test_session_user_started', table_name='test_session')
+    op.drop_index('ix_test_answer_user_created', table_name='test_answer')
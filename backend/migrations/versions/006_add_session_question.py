@@ -0,0 +1,42 @@
+"""add session_question
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # session 的題目順序與作答時間，取代解析 test_session.question_ids JSON
+    op.create_table('session_question',
+    sa.Column('session_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('answered_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('session_id', 'position')
+    )
+    op.create_index('ix_session_question_question', 'session_question', ['session_id', 'question_id'])
+
+    # 由既有的 question_ids JSON 回填，作答時間取該題在 session 內最後一次作答
+    op.execute("""
+        INSERT INTO session_question (session_id, position, question_id, answered_at)
+        SELECT ts.id, CAST(qs.key AS INTEGER), qs.value,
+               (SELECT MAX(ta.created_at) FROM test_answer ta
+                WHERE ta.session_id = ts.id AND ta.question_id = qs.value)
+        FROM test_session ts, json_each(ts.question_ids) qs
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_session_question_question', table_name='session_question')
+    op.drop_table('session_question')
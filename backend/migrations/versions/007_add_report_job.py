@@ -0,0 +1,42 @@
+"""add report_job
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 報告背景工作（狀態、優先順序與已編碼的報告）
+    op.create_table('report_job',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.String(length=64), nullable=False),
+    sa.Column('priority', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('owner', sa.String(length=64), nullable=True),
+    sa.Column('lease_expires_at', sa.Float(), nullable=True),
+    sa.Column('result', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_report_job_status_priority', 'report_job', ['status', 'priority', 'id'])
+    op.create_index('ix_report_job_user_status', 'report_job', ['user_id', 'status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_report_job_user_status', table_name='report_job')
+    op.drop_index('ix_report_job_status_priority', table_name='report_job')
+    op.drop_table('report_job')
@@ -0,0 +1,31 @@
+"""add unique index on test_answer(session_id, question_id)
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.database import remove_duplicate_session_answers
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 先刪除並行重新作答留下的重複答案（保留最後寫入的一筆），受影響用戶的累計分數於讀取時重建、答案版本遞增
+    remove_duplicate_session_answers(op.get_bind().connection)
+    op.create_index(
+        'ux_test_answer_session_question', 'test_answer', ['session_id', 'question_id'],
+        unique=True, sqlite_where=sa.text('session_id IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ux_test_answer_session_question', table_name='test_answer')
@@ -0,0 +1,53 @@
+import argparse
+import sqlite3
+import sys
+import os
+
+# 確保可以匯入 app 模組
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.services.export import (
+    ANSWER_EXPORT_COLUMNS,
+    EXPORT_FORMATS,
+    SESSION_EXPORT_COLUMNS,
+    build_answer_query,
+    build_session_query,
+    iter_export,
+)
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'personality_test.db')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="分批匯出答案或測驗 session（NDJSON / CSV）")
+    parser.add_argument("table", choices=["answers", "sessions"], help="匯出的資料")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson", help="輸出格式")
+    parser.add_argument("--output", "-o", help="輸出檔案（預設輸出到 stdout）")
+    parser.add_argument("--user-id", help="只匯出指定用戶")
+    parser.add_argument("--test-type", help="只匯出指定測驗類型")
+    parser.add_argument("--session-id", type=int, help="只匯出指定 session 的答案")
+    parser.add_argument("--start", help="起始日期（含），ISO 8601")
+    parser.add_argument("--end", help="結束日期（不含），ISO 8601")
+    parser.add_argument("--db", default=DB_PATH, help="資料庫路徑")
+    return parser.parse_args()
+
+def export_data():
+    args = parse_args()
+
+    if args.table == "answers":
+        sql, params = build_answer_query(args.user_id, args.test_type, args.session_id, args.start, args.end)
+        columns = ANSWER_EXPORT_COLUMNS
+    else:
+        sql, params = build_session_query(args.user_id, args.test_type, args.start, args.end)
+        columns = SESSION_EXPORT_COLUMNS
+
+    conn = sqlite3.connect(args.db)
+    output = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        for chunk in iter_export(conn, sql, params, columns, args.format):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+        conn.close()
+
+if __name__ == "__main__":
+    export_data()
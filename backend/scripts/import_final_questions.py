@@ -6,6 +6,7 @@ import json
 # 確保可以匯入 personality_questions.py
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from data.personality_questions import get_all_questions
+from app.services.question_bank import QUESTION_BANK_CHECK_INTERVAL, bump_question_bank_revision
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'personality_test.db')
 
@@ -45,9 +46,13 @@ def import_final_questions():
                 int(q.is_reverse)
             )
         )
+    # 遞增題庫修訂號，執行中的服務會重新載入題庫
+    bump_question_bank_revision(conn)
     conn.commit()
     print(f"已匯入 {len(questions)} 題 final 題庫！")
     conn.close()
 
+    print(f"執行中的服務將於 {QUESTION_BANK_CHECK_INTERVAL:g} 秒內重新載入題庫。")
+
 if __name__ == "__main__":
     import_final_questions() 
\ No newline at end of file
@@ -5,6 +5,12 @@ import os
 
 # 添加專案根目錄到 Python 路徑
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.core.database import apply_pragmas, create_indexes
+from app.services.question_bank import (
+    QUESTION_BANK_CHECK_INTERVAL,
+    bump_question_bank_revision,
+    read_question_bank_revision,
+)
 
 def load_questions_from_json(file_path):
     """從 JSON 檔案載入題目"""
@@ -14,13 +20,25 @@ def load_questions_from_json(file_path):
 def init_database():
     # 建立資料庫連線
     conn = sqlite3.connect('personality_test.db')
+    # 套用 PRAGMA 設定檔（WAL 等資料庫層級設定會寫入資料庫檔案）
+    apply_pragmas(conn)
     cursor = conn.cursor()
 
+    # 保留題庫修訂號：重建後仍須大於執行中服務已載入的修訂號，服務才會重新載入題庫
+    existing_tables = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    revision = read_question_bank_revision(conn) if 'question_bank_revision' in existing_tables else 0
+
     # 刪除舊表（如果存在）
+    cursor.execute("DROP TABLE IF EXISTS session_question")
     cursor.execute("DROP TABLE IF EXISTS test_session")
     cursor.execute("DROP TABLE IF EXISTS test_answer")
     cursor.execute("DROP TABLE IF EXISTS test_question")
     cursor.execute("DROP TABLE IF EXISTS test_report")
+    cursor.execute("DROP TABLE IF EXISTS user_dimension_score")
+    cursor.execute("DROP TABLE IF EXISTS report_job")
+    cursor.execute("DROP TABLE IF EXISTS user_answer_version")
+    cursor.execute("DROP TABLE IF EXISTS id_worker_lease")
+    cursor.execute("DROP TABLE IF EXISTS question_bank_revision")
 
     # 建立 test_question 資料表
     cursor.execute('''
@@ -63,6 +81,17 @@ def init_database():
         )
     ''')
 
+    # 建立 session_question 資料表（session 的題目順序與作答時間）
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS session_question (
+            session_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            answered_at DATETIME,
+            PRIMARY KEY (session_id, position)
+        )
+    ''')
+
     # 建立 test_report 資料表
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS test_report (
@@ -74,6 +103,69 @@ def init_database():
         )
     ''')
 
+    # 建立 user_dimension_score 資料表（用戶各維度累計分數）
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_dimension_score (
+            user_id VARCHAR(64) NOT NULL,
+            test_type VARCHAR(16) NOT NULL,
+            dimension VARCHAR(8) NOT NULL,
+            score_sum FLOAT NOT NULL DEFAULT 0,
+            answer_count INTEGER NOT NULL DEFAULT 0,
+            bank_version VARCHAR(32) NOT NULL,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, test_type, dimension)
+        )
+    ''')
+
+    # 建立 report_job 資料表（報告背景工作）
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS report_job (
+            id INTEGER PRIMARY KEY,
+            user_id VARCHAR(64) NOT NULL,
+            priority INTEGER NOT NULL,
+            status VARCHAR(16) NOT NULL,
+            owner VARCHAR(64),
+            lease_expires_at FLOAT,
+            result TEXT,
+            error TEXT,
+            created_at DATETIME NOT NULL,
+            started_at DATETIME,
+            finished_at DATETIME
+        )
+    ''')
+
+    # 建立 user_answer_version 資料表（用戶各測驗的答案版本）
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_answer_version (
+            user_id VARCHAR(64) NOT NULL,
+            test_type VARCHAR(16) NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, test_type)
+        )
+    ''')
+
+    # 建立 id_worker_lease 資料表（snowflake worker 編號租約）
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS id_worker_lease (
+            worker_id INTEGER PRIMARY KEY,
+            owner VARCHAR(64) NOT NULL,
+            expires_at FLOAT NOT NULL
+        )
+    ''')
+
+    # 建立 question_bank_revision 資料表（題庫修訂號，沿用重建前的值）
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS question_bank_revision (
+            id INTEGER PRIMARY KEY,
+            revision INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute("INSERT INTO question_bank_revision (id, revision) VALUES (1, ?)", (revision,))
+
+    # 建立熱門查詢所需的索引
+    create_indexes(conn)
+
     # 先清空現有數據
     cursor.execute("DELETE FROM test_question")
     
@@ -112,11 +204,17 @@ def init_database():
         except Exception as e:
             print(f"載入 {json_file} 時發生錯誤: {e}")
 
+    # 遞增題庫修訂號，執行中的服務會重新載入題庫
+    bump_question_bank_revision(conn)
+
     # 提交變更並關閉連線
     conn.commit()
     conn.close()
     
     print(f"資料庫初始化完成！已匯入 {total_questions} 題題庫資料。")
 
+    print(f"執行中的服務將於 {QUESTION_BANK_CHECK_INTERVAL:g} 秒內重新載入題庫。")
+    print("答案版本已重設，請重新啟動執行中的服務以清除記憶體中的報告快取。")
+
 if __name__ == "__main__":
     init_database() 
\ No newline at end of file
@@ -0,0 +1,36 @@
+import sqlite3
+import sys
+import os
+
+# 確保可以匯入 app 模組
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.core.database import REQUIRED_INDEXES, REQUIRED_UNIQUE_INDEXES, create_indexes, find_missing_indexes
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'personality_test.db')
+
+def migrate_indexes():
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        missing = find_missing_indexes(conn)
+        if not missing:
+            print("所有索引皆已存在，無需遷移。")
+            return
+
+        print("建立缺少的索引：")
+        for name, table, columns in REQUIRED_INDEXES:
+            if name in missing:
+                print(f"- {name} ON {table} ({', '.join(columns)})")
+        for name, table, columns, condition in REQUIRED_UNIQUE_INDEXES:
+            if name in missing:
+                print(f"- {name} ON {table} ({', '.join(columns)}) WHERE {condition}（唯一，會先刪除重複的答案）")
+        create_indexes(conn)
+
+        # 更新查詢規劃器統計資訊，讓新索引立即被採用
+        conn.execute("ANALYZE")
+        conn.commit()
+        print(f"已建立 {len(missing)} 個索引！")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    migrate_indexes()
@@ -0,0 +1,41 @@
+import sys
+import os
+
+# 確保可以匯入 app 模組
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.core.database import create_indexes, get_connection
+
+def migrate_session_questions():
+    """建立 session_question 並由 test_session.question_ids JSON 回填（可重複執行）"""
+    with get_connection() as conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS session_question (
+                session_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                question_id INTEGER NOT NULL,
+                answered_at DATETIME,
+                PRIMARY KEY (session_id, position)
+            )
+        ''')
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 只回填尚未建立題目列的 session，作答時間取該題在 session 內最後一次作答
+            cursor = conn.execute('''
+                INSERT INTO session_question (session_id, position, question_id, answered_at)
+                SELECT ts.id, CAST(qs.key AS INTEGER), qs.value,
+                       (SELECT MAX(ta.created_at) FROM test_answer ta
+                        WHERE ta.session_id = ts.id AND ta.question_id = qs.value)
+                FROM test_session ts, json_each(ts.question_ids) qs
+                WHERE NOT EXISTS (SELECT 1 FROM session_question sq WHERE sq.session_id = ts.id)
+            ''')
+            inserted = cursor.rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        create_indexes(conn)
+
+    print(f"已回填 {inserted} 筆 session 題目！")
+
+if __name__ == "__main__":
+    migrate_session_questions()
@@ -0,0 +1,28 @@
+import sys
+import os
+
+# 確保可以匯入 app 模組
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.core.database import get_connection
+from app.services.batch_scoring import score_users
+from app.services.scoring import store_dimension_scores
+
+def rebuild_dimension_scores():
+    """以批次計分重建所有用戶的 user_dimension_score（權重調整或題庫重新匯入後執行）"""
+    with get_connection() as conn:
+        # 取得寫入鎖後再讀取答案，避免與同時寫入的答案互相遺漏
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            batch = score_users()
+            conn.execute("DELETE FROM user_dimension_score")
+            for result in batch.results():
+                store_dimension_scores(conn, result)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    print(f"已重建 {len(batch.user_ids)} 位用戶的維度累計分數！")
+
+if __name__ == "__main__":
+    rebuild_dimension_scores()
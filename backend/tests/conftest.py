@@ -0,0 +1,81 @@
+"""
+測試共用設定
+每次執行在暫存目錄中建立新的資料庫（init_db.py 建立資料表、import_final_questions.py 匯入題庫），
+不會動到 backend/personality_test.db。環境變數需在匯入 app 之前設定。
+"""
+
+import importlib.util
+import os
+import sys
+import tempfile
+import uuid
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DB_DIR = tempfile.mkdtemp(prefix="personality-test-")
+
+os.environ["SQLITE_DB_PATH"] = os.path.join(TEST_DB_DIR, "personality_test.db")
+os.environ.setdefault("REPORT_BATCH_WORKERS", "2")
+os.environ.pop("ID_WORKER_ID", None)
+# SQLAlchemy 與 init_db.py 以相對路徑開啟資料庫，切換到暫存目錄讓所有連線指向同一個檔案
+os.chdir(TEST_DB_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+import pytest
+
+
+def _load_script(name: str):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BACKEND_DIR, "scripts", f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def client():
+    """已啟動（含題庫、ID 租約與報告工作佇列）的測試用 API client"""
+    init_script = _load_script("init_db")
+    import_script = _load_script("import_final_questions")
+    import_script.DB_PATH = os.environ["SQLITE_DB_PATH"]
+    init_script.init_database()
+    import_script.import_final_questions()
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def run(client):
+    """在 app 的事件迴圈中執行非同步函式（非同步連線池綁定該事件迴圈）"""
+    return client.portal.call
+
+
+@pytest.fixture
+def user_id():
+    return f"test-{uuid.uuid4().hex[:12]}"
+
+
+@pytest.fixture
+def questions(client):
+    """取得指定測驗類型的固定 30 題"""
+    def get(test_type: str):
+        return client.get(f"/api/v1/questions/{test_type}").json()["questions"]
+    return get
+
+
+@pytest.fixture
+def submit(client):
+    """以 /answers/submit 整批作答，option 為每題選擇的選項索引（可為依題目決定的函式）"""
+    def post(user_id: str, test_type: str, questions, option=0, session_id=None):
+        answers = [
+            {"question_id": q["id"], "answer": q["options"][option(q) if callable(option) else option]}
+            for q in questions
+        ]
+        response = client.post("/api/v1/answers/submit", json={
+            "user_id": user_id, "test_type": test_type, "session_id": session_id, "answers": answers
+        })
+        assert response.status_code == 200, response.text
+        return response.json()
+    return post
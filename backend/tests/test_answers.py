@@ -0,0 +1,45 @@
+from app.core.database import get_connection
+
+
+def _stored_answers(user_id):
+    with get_connection() as conn:
+        return conn.execute("SELECT question_id, answer FROM test_answer WHERE user_id = ?", (user_id,)).fetchall()
+
+
+def test_submit_writes_the_whole_batch(client, user_id, questions, submit):
+    disc = questions("DISC")
+    result = submit(user_id, "DISC", disc, option=1)
+
+    assert result["answered_questions"] == len(disc) == 30
+    assert sorted(_stored_answers(user_id)) == sorted((q["id"], q["options"][1]) for q in disc)
+
+
+def test_submit_skips_incomplete_entries(client, user_id, questions):
+    disc = questions("DISC")
+    response = client.post("/api/v1/answers/submit", json={"user_id": user_id, "test_type": "disc", "answers": [
+        {"question_id": disc[0]["id"], "answer": disc[0]["options"][0]},
+        {"question_id": disc[1]["id"]},
+        {"answer": "A"},
+    ]})
+    assert response.status_code == 200 and response.json()["answered_questions"] == 1
+    assert len(_stored_answers(user_id)) == 1
+
+
+def test_unknown_question_rejects_the_batch(client, user_id, questions):
+    disc = questions("DISC")
+    answers = [{"question_id": q["id"], "answer": q["options"][0]} for q in disc[:3]]
+    answers.append({"question_id": 999999, "answer": "A"})
+    response = client.post("/api/v1/answers/submit", json={"user_id": user_id, "test_type": "DISC", "answers": answers})
+
+    assert response.status_code == 400
+    assert _stored_answers(user_id) == []
+
+
+def test_questions_from_another_test_reject_the_batch(client, user_id, questions):
+    disc, mbti = questions("DISC"), questions("MBTI")
+    answers = [{"question_id": q["id"], "answer": q["options"][0]} for q in disc[:3] + mbti[:1]]
+    response = client.post("/api/v1/answers/submit", json={"user_id": user_id, "test_type": "disc", "answers": answers})
+
+    assert response.status_code == 400
+    assert str(mbti[0]["id"]) in response.json()["detail"]
+    assert _stored_answers(user_id) == []
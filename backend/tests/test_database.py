@@ -0,0 +1,151 @@
+import asyncio
+import contextlib
+import os
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.core.database import (
+    PRAGMA_PROFILES,
+    Base,
+    _existing_tables,
+    count_unmigrated_sessions,
+    find_missing_indexes,
+    get_async_connection,
+    get_connection,
+    get_pragma_profile,
+)
+
+
+def test_nested_connections_reuse_the_thread_connection(client):
+    with get_connection() as outer:
+        with get_connection() as inner:
+            assert inner is outer
+
+
+def test_connections_are_not_shared_across_threads(client):
+    seen = []
+
+    def worker():
+        with get_connection() as conn:
+            seen.append(conn)
+
+    with get_connection() as conn:
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        assert seen and seen[0] is not conn
+
+
+def test_nested_async_connections_reuse_the_task_connection(run):
+    async def nested():
+        async with get_async_connection() as outer:
+            async with get_async_connection() as inner:
+                return inner is outer
+
+    assert run(nested) is True
+
+
+def test_uncommitted_async_writes_are_rolled_back_on_release(run):
+    with get_connection() as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS pool_probe (value INTEGER)")
+        conn.commit()
+
+    async def write_without_commit():
+        async with get_async_connection() as conn:
+            await conn.execute("INSERT INTO pool_probe (value) VALUES (1)")
+
+    run(write_without_commit)
+    with get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM pool_probe").fetchone()[0] == 0
+
+
+def test_cancelled_async_block_releases_the_write_lock(run):
+    async def cancel_mid_begin():
+        async def begin():
+            async with get_async_connection() as conn:
+                await conn.execute("BEGIN IMMEDIATE")
+                await asyncio.sleep(10)
+
+        # 在 BEGIN IMMEDIATE 送出後、完成前取消：語句仍會在連線執行緒中執行
+        task = asyncio.create_task(begin())
+        await asyncio.sleep(0)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.1)
+
+    for _ in range(5):
+        run(cancel_mid_begin)
+        conn = sqlite3.connect(os.environ["SQLITE_DB_PATH"], timeout=0.5)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.rollback()
+        finally:
+            conn.close()
+
+
+def test_pragma_profile_applied(client):
+    with get_connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == get_pragma_profile()["busy_timeout"]
+
+
+def test_pragma_profiles_leave_foreign_keys_alone():
+    assert all("foreign_keys" not in profile for profile in PRAGMA_PROFILES.values())
+
+
+def test_unknown_pragma_profile():
+    with pytest.raises(ValueError):
+        get_pragma_profile("nope")
+
+
+def test_schema_complete_after_startup(client):
+    with get_connection() as conn:
+        tables = _existing_tables(conn)
+        assert find_missing_indexes(conn) == []
+        assert count_unmigrated_sessions(conn) == 0
+    assert {
+        "session_question", "report_job", "id_worker_lease", "user_answer_version", "question_bank_revision"
+    } <= tables
+
+
+def test_models_create_session_question_on_existing_databases(tmp_path):
+    import app.models  # noqa: F401  註冊所有模型
+
+    path = tmp_path / "existing.db"
+    with contextlib.closing(sqlite3.connect(path)) as conn:
+        conn.execute("CREATE TABLE test_session (id INTEGER PRIMARY KEY, user_id TEXT)")
+        conn.execute("INSERT INTO test_session (id, user_id) VALUES (1, 'legacy')")
+        conn.commit()
+        # 缺少 session_question 時不視為已完成遷移
+        assert count_unmigrated_sessions(conn) is None
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    with contextlib.closing(sqlite3.connect(path)) as conn:
+        assert "session_question" in _existing_tables(conn)
+        assert count_unmigrated_sessions(conn) == 1
+
+
+def test_init_db_resets_bookkeeping_tables(tmp_path, monkeypatch):
+    from conftest import _load_script
+
+    monkeypatch.chdir(tmp_path)
+    init_script = _load_script("init_db")
+    init_script.init_database()
+    with contextlib.closing(sqlite3.connect("personality_test.db")) as conn:
+        conn.execute("INSERT INTO user_answer_version (user_id, test_type, version) VALUES ('stale', 'DISC', 3)")
+        conn.execute("INSERT INTO id_worker_lease (worker_id, owner, expires_at) VALUES (0, 'stale', 1e12)")
+        revision = conn.execute("SELECT revision FROM question_bank_revision").fetchone()[0]
+        conn.commit()
+
+    init_script.init_database()
+    with contextlib.closing(sqlite3.connect("personality_test.db")) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM user_answer_version").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM id_worker_lease").fetchone()[0] == 0
+        # 修訂號沿用並遞增，執行中的服務會重新載入題庫
+        assert conn.execute("SELECT revision FROM question_bank_revision").fetchall() == [(revision + 1,)]
@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.export import ANSWER_EXPORT_COLUMNS, SESSION_EXPORT_COLUMNS, parse_export_bound
+
+
+def test_parse_export_bound():
+    assert parse_export_bound("2024-01-31") == datetime(2024, 1, 31)
+    assert parse_export_bound("2024-01-31T08:30:00") == datetime(2024, 1, 31, 8, 30)
+    aware = parse_export_bound("2024-01-31T08:30:00+00:00")
+    assert aware.tzinfo is None
+    assert aware == datetime(2024, 1, 31, 8, 30, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    with pytest.raises(ValueError):
+        parse_export_bound("yesterday")
+
+
+@pytest.fixture
+def exported_user(client, user_id, questions, submit):
+    session_id = client.post("/api/v1/sessions/create", json={"user_id": user_id, "test_type": "BIG5"}).json()["session_id"]
+    submit(user_id, "BIG5", questions("BIG5")[:4], session_id=session_id)
+    return user_id
+
+
+@pytest.mark.parametrize("path", ["answers", "sessions"])
+def test_export_bounds_accept_iso_times(client, exported_user, path):
+    before = (datetime.now() - timedelta(minutes=5)).isoformat(timespec="seconds")
+    after = (datetime.now() + timedelta(minutes=5)).isoformat(timespec="seconds")
+    expected = 4 if path == "answers" else 1
+
+    def count(**bounds):
+        response = client.get(f"/api/v1/export/{path}", params={"user_id": exported_user, **bounds})
+        assert response.status_code == 200
+        return len(response.text.splitlines())
+
+    # 含時間的 ISO 範圍（T 分隔）與資料庫的保存格式一致比較
+    assert count(start=before) == expected
+    assert count(start=before, end=after) == expected
+    assert count(start=after) == 0
+    assert count(end=before) == 0
+    assert count(start=datetime.now().date().isoformat()) == expected
+
+
+@pytest.mark.parametrize("path", ["answers", "sessions"])
+def test_export_rejects_invalid_bounds(client, path):
+    response = client.get(f"/api/v1/export/{path}", params={"start": "not-a-date"})
+    assert response.status_code == 400
+
+
+def test_export_formats(client, exported_user):
+    ndjson = client.get("/api/v1/export/answers", params={"user_id": exported_user})
+    rows = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [tuple(row) for row in rows] == [ANSWER_EXPORT_COLUMNS] * 4
+    assert all(row["test_type"] == "BIG5" for row in rows)
+
+    exported = client.get("/api/v1/export/answers", params={"user_id": exported_user, "format": "csv"})
+    assert exported.headers["content-type"].startswith("text/csv")
+    table = list(csv.reader(io.StringIO(exported.text)))
+    assert tuple(table[0]) == ANSWER_EXPORT_COLUMNS and len(table) == 5
+
+    assert client.get("/api/v1/export/answers", params={"format": "xml"}).status_code == 400
+
+
+def test_session_export_filters(client, exported_user):
+    exported = client.get("/api/v1/export/sessions", params={"user_id": exported_user, "test_type": "BIG5"})
+    rows = [json.loads(line) for line in exported.text.splitlines()]
+    assert len(rows) == 1 and tuple(rows[0]) == SESSION_EXPORT_COLUMNS
+    assert rows[0]["user_id"] == exported_user
+
+    assert client.get("/api/v1/export/sessions", params={"user_id": exported_user, "test_type": "DISC"}).text == ""
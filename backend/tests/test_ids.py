@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from app.core.database import get_connection
+from app.core.ids import (
+    SEQUENCE_BITS,
+    WORKER_ID_BITS,
+    SnowflakeGenerator,
+    WorkerIdLease,
+    next_job_id,
+    next_session_id,
+    worker_id_lease,
+)
+
+
+def _worker_id(value: int) -> int:
+    return (value >> SEQUENCE_BITS) & ((1 << WORKER_ID_BITS) - 1)
+
+
+def test_ids_unique_and_increasing_across_threads():
+    generator = SnowflakeGenerator(3)
+    results = [[] for _ in range(8)]
+
+    def worker(out):
+        for _ in range(2000):
+            out.append(generator.next_id())
+
+    threads = [threading.Thread(target=worker, args=(out,)) for out in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ids = [value for out in results for value in out]
+    assert len(set(ids)) == len(ids)
+    assert all(out == sorted(out) for out in results)
+    assert all(_worker_id(value) == 3 for value in ids)
+    assert max(ids) < 2 ** 53
+
+
+def test_generators_with_different_worker_ids_never_collide():
+    first, second = SnowflakeGenerator(1), SnowflakeGenerator(2)
+    ids = [generator.next_id() for _ in range(5000) for generator in (first, second)]
+    assert len(set(ids)) == len(ids)
+
+
+def test_generator_requires_a_valid_worker_id():
+    with pytest.raises(RuntimeError):
+        SnowflakeGenerator().next_id()
+    with pytest.raises(ValueError):
+        SnowflakeGenerator(64)
+
+    generator = SnowflakeGenerator()
+    generator.assign(5, valid_until=time.time() - 1)
+    with pytest.raises(RuntimeError):
+        generator.next_id()
+
+
+def test_service_ids_use_the_leased_worker_id(client):
+    assert worker_id_lease is not None and worker_id_lease.worker_id is not None
+    assert _worker_id(next_session_id()) == worker_id_lease.worker_id
+    assert _worker_id(next_job_id()) == worker_id_lease.worker_id
+
+
+def test_leases_hand_out_distinct_worker_ids(client):
+    leases = [WorkerIdLease([SnowflakeGenerator()], ttl=30) for _ in range(3)]
+    try:
+        worker_ids = [lease.acquire() for lease in leases]
+        assert len(set(worker_ids + [worker_id_lease.worker_id])) == 4
+        ids = [lease.generators[0].next_id() for lease in leases]
+        assert [_worker_id(value) for value in ids] == worker_ids
+    finally:
+        for lease in leases:
+            lease.release()
+
+
+def test_expired_lease_is_taken_over(client):
+    stale = WorkerIdLease([SnowflakeGenerator()], ttl=30)
+    fresh = WorkerIdLease([SnowflakeGenerator()], ttl=30)
+    try:
+        worker_id = stale.acquire()
+        # 模擬行程當機：租約過期但未釋放
+        with get_connection() as conn:
+            conn.execute("UPDATE id_worker_lease SET expires_at = ? WHERE worker_id = ?", (time.time() - 1, worker_id))
+            conn.commit()
+        assert fresh.acquire() == worker_id
+
+        # 原本的持有者續約時改租其他編號，不會與接手者重複
+        assert stale.renew() != worker_id
+    finally:
+        stale.release()
+        fresh.release()
+
+
+def test_release_frees_the_worker_id(client):
+    lease = WorkerIdLease([SnowflakeGenerator()], ttl=30)
+    worker_id = lease.acquire()
+    lease.release()
+    with pytest.raises(RuntimeError):
+        lease.generators[0].next_id()
+
+    other = WorkerIdLease([SnowflakeGenerator()], ttl=30)
+    try:
+        assert other.acquire() == worker_id
+    finally:
+        other.release()
@@ -0,0 +1,51 @@
+from itertools import product
+
+from app.services import integrated_insights as insights
+from app.services.narratives import narratives
+
+
+def _by_rules(mbti, disc, big5, enneagram):
+    """逐次以規則函式計算（查詢表取代的原始做法）"""
+    return {
+        "leadership_style": insights._get_integrated_leadership_style(mbti, disc, big5, enneagram),
+        "communication_preferences": insights._get_integrated_communication_style(mbti, disc, big5, enneagram),
+        "work_environment_fit": insights._get_integrated_work_environment(mbti, disc, big5, enneagram),
+        "personal_development_priorities": insights._get_integrated_development_priorities(mbti, disc, big5, enneagram),
+    }
+
+
+def _results(mbti_type, disc_style, enneagram_type, interpersonal, work_style, neuroticism, catalog_text=True):
+    mbti = {
+        "personality_type": mbti_type,
+        "communication_style": narratives.get("mbti", "communication", mbti_type) if catalog_text else "舊版報告的溝通敘述",
+        "work_style": narratives.get("mbti", "work_style", mbti_type),
+        "development_suggestions": ["練習傾聽", "建立規劃習慣"],
+    }
+    disc = {
+        "primary_style": disc_style,
+        "communication_style": narratives.get("disc", "communication", disc_style or ""),
+        "work_style": narratives.get("disc", "work_style", disc_style or ""),
+    }
+    big5 = {
+        "interpersonal_style": interpersonal,
+        "scores": {"N": neuroticism},
+        "combination_analysis": {"work_style": work_style},
+        "development_suggestions": ["管理壓力"],
+    }
+    return mbti, disc, big5, {"primary_type": enneagram_type}
+
+
+def test_tables_match_the_rules():
+    big5_interpersonal, big5_work = insights._big5_styles()
+    combinations = product(
+        insights.MBTI_TYPES[::5], insights.DISC_STYLES, ("1", "6", None), big5_interpersonal[:2], big5_work[:2], (2.0, 4.0)
+    )
+    for combination in combinations:
+        results = _results(*combination)
+        assert insights.build_integrated_insights(*results) == _by_rules(*results)
+
+
+def test_unknown_inputs_fall_back_to_the_rules():
+    big5_interpersonal, big5_work = insights._big5_styles()
+    results = _results("INTJ", "D", "6", big5_interpersonal[0], big5_work[0], 4.0, catalog_text=False)
+    assert insights.build_integrated_insights(*results) == _by_rules(*results)
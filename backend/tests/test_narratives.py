@@ -0,0 +1,21 @@
+import pytest
+
+from app.services.narratives import corrected_narratives, legacy_narratives, narratives
+
+
+def test_catalog_is_read_only():
+    with pytest.raises(TypeError):
+        narratives.table("mbti", "description")["INTJ"] = "changed"
+    assert isinstance(narratives.get("mbti", "strengths", "INTJ"), tuple)
+
+
+def test_unknown_codes_fall_back_to_defaults():
+    assert narratives.get("mbti", "description", "XXXX") == narratives.defaults["mbti"]["description"]
+    assert narratives.get("big5", "trait_names", "Z", "Z") == "Z"
+
+
+def test_variants_share_unchanged_sections():
+    # 修正版只覆寫 MBTI 的溝通、工作風格與發展建議，其餘文字與報告相同
+    assert corrected_narratives.get("mbti", "description", "INTJ") is narratives.get("mbti", "description", "INTJ")
+    assert legacy_narratives.get("mbti", "description", "INTJ") is narratives.get("mbti", "description", "INTJ")
+    assert corrected_narratives.table("mbti", "communication") != narratives.table("mbti", "communication")
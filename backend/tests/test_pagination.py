@@ -0,0 +1,70 @@
+import pytest
+
+from app.repositories.pagination import decode_cursor, encode_cursor
+
+
+def _pages(client, path, limit, key):
+    items, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(path, params=params)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert len(body[key]) <= limit
+        items.extend(body[key])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return items, pages
+
+
+@pytest.fixture
+def answered_user(client, user_id, questions, submit):
+    # 同一批寫入的答案 created_at 相同，分頁需以 id 區分
+    submit(user_id, "MBTI", questions("MBTI")[:7])
+    submit(user_id, "DISC", questions("DISC")[:5])
+    return user_id
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(("2024-01-01 00:00:00", 42))) == ("2024-01-01 00:00:00", 42)
+    assert decode_cursor(None) is None
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_invalid_cursor_is_rejected(client, answered_user):
+    assert client.get(f"/api/v1/answers/{answered_user}", params={"limit": 5, "cursor": "xx"}).status_code == 400
+
+
+@pytest.mark.parametrize("limit", [1, 4, 5, 11, 12, 13])
+def test_answer_pages_cover_every_answer_once(client, answered_user, limit):
+    everything = client.get(f"/api/v1/answers/{answered_user}").json()
+    assert everything["next_cursor"] is None and everything["total"] == 12
+
+    items, pages = _pages(client, f"/api/v1/answers/{answered_user}", limit, "answers")
+    assert [answer["id"] for answer in items] == [answer["id"] for answer in everything["answers"]]
+    # 剛好整除時最後一頁不會多出空白頁
+    assert pages == -(-12 // limit)
+
+
+def test_answer_pages_by_type(client, answered_user):
+    items, pages = _pages(client, f"/api/v1/answers/{answered_user}/MBTI", 7, "answers")
+    assert len(items) == 7 and pages == 1
+    items, pages = _pages(client, f"/api/v1/answers/{answered_user}/MBTI", 3, "answers")
+    assert len({answer["id"] for answer in items}) == 7 and pages == 3
+    assert all(answer["test_type"] == "MBTI" for answer in items)
+
+
+def test_session_pages(client, user_id):
+    for _ in range(5):
+        assert client.post("/api/v1/sessions/create", json={"user_id": user_id, "test_type": "DISC"}).status_code == 200
+
+    everything = client.get(f"/api/v1/sessions/{user_id}/all").json()
+    assert everything["total"] == 5
+    for limit in (1, 2, 5):
+        items, pages = _pages(client, f"/api/v1/sessions/{user_id}/all", limit, "sessions")
+        assert [s["session_id"] for s in items] == [s["session_id"] for s in everything["sessions"]]
+        assert pages == -(-5 // limit)
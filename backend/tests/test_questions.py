@@ -0,0 +1,55 @@
+from collections import Counter
+
+from app.core.database import get_connection
+from app.services.question_bank import FORM_CATEGORIES, QuestionBank, bump_question_bank_revision, question_bank
+
+
+def test_stratified_sample_balances_mbti_categories(client):
+    questions = question_bank.sample_form("MBTI", 30)
+    counts = Counter(question.category for question in questions)
+
+    assert len(questions) == len({question.id for question in questions}) == 30
+    assert set(counts) == set(FORM_CATEGORIES["MBTI"])
+    # 30 題分到 8 類：前 6 類各 4 題，其餘各 3 題
+    assert [counts[category] for category in FORM_CATEGORIES["MBTI"]] == [4] * 6 + [3] * 2
+
+
+def test_sample_with_seed_is_reproducible(client):
+    first = [question.id for question in question_bank.sample_form("DISC", 30, seed=7)]
+    assert first == [question.id for question in question_bank.sample_form("DISC", 30, seed=7)]
+
+    response = client.get("/api/v1/questions/DISC", params={"random": True, "seed": 7}).json()
+    assert [question["id"] for question in response["questions"]] == first
+
+
+def test_unknown_test_type_samples_nothing(client):
+    assert question_bank.sample_form("XX", 30) == []
+
+
+def test_questions_are_parsed_once(client):
+    question = question_bank.by_type("BIG5")[0]
+    assert question_bank.get(question.id) is question
+    assert isinstance(question.options, tuple) and question.to_dict()["options"] == list(question.options)
+
+
+def test_other_workers_reload_after_revision_bump(client):
+    # 另一個 worker 的題庫：載入後檢查間隔為 0，每次存取都比對修訂號
+    other = QuestionBank(check_interval=0)
+    other.load()
+    assert other.refresh() is False
+
+    with get_connection() as conn:
+        bump_question_bank_revision(conn)
+        conn.commit()
+    assert other.refresh() is True
+    assert other.version == question_bank.version
+    assert other.refresh() is False
+
+
+def test_reload_endpoint_bumps_revision(client):
+    with get_connection() as conn:
+        before = conn.execute("SELECT revision FROM question_bank_revision").fetchone()[0]
+    response = client.post("/api/v1/questions/reload")
+    assert response.status_code == 200 and response.json()["version"] == question_bank.version
+    with get_connection() as conn:
+        assert conn.execute("SELECT revision FROM question_bank_revision").fetchone()[0] == before + 1
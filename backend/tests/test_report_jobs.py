@@ -0,0 +1,110 @@
+import time
+
+import pytest
+
+from app.core.database import get_connection
+from app.repositories import report_jobs as job_repo
+from app.services.report_jobs import report_job_queue
+
+
+@pytest.fixture
+def stopped_queue(client, run):
+    """暫停本行程的 worker，測試直接操作佇列資料表時不會被搶先取出"""
+    run(report_job_queue.stop)
+    with get_connection() as conn:
+        conn.execute("DELETE FROM report_job")
+        conn.commit()
+    yield
+    with get_connection() as conn:
+        conn.execute("DELETE FROM report_job")
+        conn.commit()
+    run(report_job_queue.start)
+
+
+def _expire(job_id):
+    with get_connection() as conn:
+        conn.execute("UPDATE report_job SET lease_expires_at = ? WHERE id = ?", (time.time() - 1, job_id))
+        conn.commit()
+
+
+def test_enqueue_deduplicates_pending_jobs(stopped_queue, run):
+    job_id, deduplicated = run(job_repo.enqueue_report_job, 1001, "dedupe-user", 5)
+    assert (job_id, deduplicated) == (1001, False)
+
+    job_id, deduplicated = run(job_repo.enqueue_report_job, 1002, "dedupe-user", 2)
+    assert (job_id, deduplicated) == (1001, True)
+    # 合併時優先順序取較高者
+    assert run(job_repo.get_report_job, 1001)["priority"] == 2
+
+
+def test_claim_order_and_bulk_limit(stopped_queue, run):
+    run(job_repo.enqueue_report_job, 2001, "claim-a", 7)
+    run(job_repo.enqueue_report_job, 2002, "claim-b", 0)
+    run(job_repo.enqueue_report_job, 2003, "claim-c", 0)
+
+    assert run(job_repo.claim_report_job, "owner-1", 60, 5) == (2002, "claim-b", 0)
+    assert run(job_repo.claim_report_job, "owner-1", 60, 5) == (2003, "claim-c", 0)
+    # 批量名額用完時不取出優先順序達門檻的工作
+    assert run(job_repo.claim_report_job, "owner-1", 60, 5) is None
+    assert run(job_repo.claim_report_job, "owner-1", 60) == (2001, "claim-a", 7)
+    assert run(job_repo.claim_report_job, "owner-1", 60) is None
+
+
+def test_requeue_only_expired_leases(stopped_queue, run):
+    run(job_repo.enqueue_report_job, 3001, "lease-a", 0)
+    run(job_repo.enqueue_report_job, 3002, "lease-b", 0)
+    run(job_repo.claim_report_job, "owner-live", 60)
+    run(job_repo.claim_report_job, "owner-dead", 60)
+
+    # 租約未過期的執行中工作不會被重新排入（滾動重啟時不會重複執行）
+    assert run(job_repo.requeue_expired_jobs) == 0
+
+    _expire(3002)
+    assert run(job_repo.requeue_expired_jobs) == 1
+    assert run(job_repo.get_report_job, 3001)["status"] == job_repo.JOB_RUNNING
+    assert run(job_repo.get_report_job, 3002)["status"] == job_repo.JOB_PENDING
+
+    # 原本的持有者不能再續約或寫入結果
+    assert run(job_repo.renew_report_job_lease, 3002, "owner-dead", 60) is False
+    assert run(job_repo.claim_report_job, "owner-new", 60) == (3002, "lease-b", 0)
+    assert run(job_repo.finish_report_job, 3002, "owner-dead", "{}") is False
+    assert run(job_repo.finish_report_job, 3002, "owner-new", "{}") is True
+    assert run(job_repo.get_report_job, 3002)["status"] == job_repo.JOB_COMPLETED
+
+
+def test_renew_keeps_the_lease(stopped_queue, run):
+    run(job_repo.enqueue_report_job, 4001, "renew-a", 0)
+    run(job_repo.claim_report_job, "owner-1", 60)
+    _expire(4001)
+    assert run(job_repo.renew_report_job_lease, 4001, "owner-1", 60) is True
+    assert run(job_repo.requeue_expired_jobs) == 0
+
+
+def test_release_owned_jobs(stopped_queue, run):
+    run(job_repo.enqueue_report_job, 5001, "release-a", 0)
+    run(job_repo.enqueue_report_job, 5002, "release-b", 0)
+    run(job_repo.claim_report_job, "owner-1", 60)
+    run(job_repo.claim_report_job, "owner-2", 60)
+
+    assert run(job_repo.release_owned_jobs, "owner-1") == 1
+    assert run(job_repo.get_report_job, 5001)["status"] == job_repo.JOB_PENDING
+    assert run(job_repo.get_report_job, 5002)["status"] == job_repo.JOB_RUNNING
+
+
+def test_job_api_completes_with_report(client, user_id, questions, submit):
+    for test_type in ("MBTI", "DISC", "BIG5", "enneagram"):
+        submit(user_id, test_type, questions(test_type))
+
+    response = client.post("/api/v1/jobs/reports", json={"user_id": user_id})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    job = client.get(f"/api/v1/jobs/{job_id}", params={"wait": 20}).json()
+    assert job["status"] == job_repo.JOB_COMPLETED
+    assert job["report"]["summary"] == client.get(f"/api/v1/reports/{user_id}").json()["summary"]
+
+
+def test_job_api_validation(client):
+    assert client.post("/api/v1/jobs/reports", json={"user_id": "x", "priority": 10}).status_code == 400
+    assert client.post("/api/v1/jobs/reports/batch", json={"user_ids": []}).status_code == 400
+    assert client.get("/api/v1/jobs/1").status_code == 404
@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+
+import orjson
+import pytest
+
+from app.core.database import get_connection
+from app.core.responses import dumps, fragment, raw_fragment
+from app.services import report_store
+from app.services.comprehensive_analysis import ComprehensivePersonalityAnalyzer
+from app.services.question_bank import question_bank
+from app.services.report_cache import report_cache
+from app.services.report_store import REPORT_ANALYSES, iter_analyses, load_current_analyses
+
+TEST_TYPES = ("MBTI", "DISC", "BIG5", "enneagram")
+SECTIONS = {"MBTI": "mbti", "DISC": "disc", "BIG5": "big5", "enneagram": "enneagram"}
+
+
+@pytest.fixture
+def answered_user(user_id, questions, submit):
+    for test_type in TEST_TYPES:
+        submit(user_id, test_type, questions(test_type), option=lambda q: q["id"] % len(q["options"]))
+    return user_id
+
+
+def _parse_events(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_report_cache_hits_until_answers_change(client, answered_user, questions):
+    first = client.get(f"/api/v1/reports/{answered_user}").content
+    hits = report_cache.stats()["hits"]
+    assert client.get(f"/api/v1/reports/{answered_user}").content == first
+    assert report_cache.stats()["hits"] == hits + 1
+
+    disc = questions("DISC")[0]
+    client.post("/api/v1/answers/", json={"user_id": answered_user, "question_id": disc["id"], "answer": disc["options"][3]})
+    client.get(f"/api/v1/reports/{answered_user}")
+    assert report_cache.stats()["hits"] == hits + 1
+
+
+def test_report_cache_follows_versions_written_by_other_workers(client, answered_user):
+    client.get(f"/api/v1/reports/{answered_user}")
+    hits = report_cache.stats()["hits"]
+
+    # 其他 worker 寫入答案時只會遞增資料庫中的版本
+    with get_connection() as conn:
+        conn.execute("UPDATE user_answer_version SET version = version + 1 WHERE user_id = ? AND test_type = 'BIG5'", (answered_user,))
+        conn.commit()
+    client.get(f"/api/v1/reports/{answered_user}")
+    assert report_cache.stats()["hits"] == hits
+
+
+def test_reports_are_materialized_with_version_stamps(client, answered_user, questions, submit):
+    client.get(f"/api/v1/reports/{answered_user}")
+    analyses, stale = load_current_analyses(answered_user)
+    assert stale == [] and set(analyses) == set(REPORT_ANALYSES)
+    with get_connection() as conn:
+        stamps = {
+            test_type: json.loads(result)["version"]
+            for test_type, result in conn.execute("SELECT test_type, result FROM test_report WHERE user_id = ?", (answered_user,))
+        }
+    assert stamps == {test_type: f"{question_bank.version}:1" for test_type in REPORT_ANALYSES}
+
+    # 只有答案異動的測驗需要重新計算
+    submit(answered_user, "DISC", questions("DISC")[:2], option=1)
+    assert load_current_analyses(answered_user)[1] == ["DISC"]
+
+
+def test_failed_analysis_is_isolated(client, answered_user, monkeypatch):
+    def broken(self, user_id, result=None):
+        raise RuntimeError("boom")
+
+    # 整批提交時已在背景實體化報告，清除後才會重新分析
+    with get_connection() as conn:
+        conn.execute("DELETE FROM test_report WHERE user_id = ?", (answered_user,))
+        conn.commit()
+    monkeypatch.setattr(ComprehensivePersonalityAnalyzer, REPORT_ANALYSES["DISC"], broken)
+    report = client.get(f"/api/v1/reports/{answered_user}").json()
+
+    assert set(report["errors"]) == {"DISC"}
+    assert "error" in report["detailed_analysis"]["disc"]
+    assert "error" not in report["detailed_analysis"]["mbti"]
+    # 失敗的測驗不寫入，下次請求重新計算
+    assert load_current_analyses(answered_user)[1] == ["DISC"]
+
+    monkeypatch.undo()
+    assert "errors" not in client.get(f"/api/v1/reports/{answered_user}").json()
+
+
+def test_analysis_timeout_starts_when_the_analysis_runs(client, answered_user, monkeypatch):
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def slow(self, user_id, result=None):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.2)
+        with lock:
+            running[0] -= 1
+        return {"ok": True}
+
+    for method in REPORT_ANALYSES.values():
+        monkeypatch.setattr(ComprehensivePersonalityAnalyzer, method, slow)
+
+    # 先佔滿共用的分析執行緒池：排隊的時間不計入逾時
+    blockers = [report_store._analysis_pool.submit(time.sleep, 0.6) for _ in range(report_store.REPORT_ANALYSIS_WORKERS)]
+    outcomes = dict(iter_analyses(answered_user, list(REPORT_ANALYSES), None, timeout=0.5, max_in_flight=2))
+    for blocker in blockers:
+        blocker.result()
+
+    assert outcomes == {test_type: {"ok": True} for test_type in REPORT_ANALYSES}
+    assert peak[0] <= 2
+
+
+def test_analysis_timeout(client, answered_user, monkeypatch):
+    def hang(self, user_id, result=None):
+        time.sleep(0.5)
+        return {}
+
+    monkeypatch.setattr(ComprehensivePersonalityAnalyzer, REPORT_ANALYSES["BIG5"], hang)
+    outcomes = dict(iter_analyses(answered_user, ["BIG5", "MBTI"], None, timeout=0.1))
+    assert "逾時" in outcomes["BIG5"]["error"]
+
+
+def test_stream_matches_full_report(client, answered_user):
+    # 清除實體化報告：第一次串流需要計算，第二次直接使用回寫的報告
+    with get_connection() as conn:
+        conn.execute("DELETE FROM test_report WHERE user_id = ?", (answered_user,))
+        conn.commit()
+    for _ in range(2):
+        response = client.get(f"/api/v1/reports/{answered_user}/stream")
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _parse_events(response.text)
+        names = [name for name, _ in events]
+        assert names[0] == "summary" and names[-2:] == ["integrated_insights", "done"]
+        assert sorted(names[1:-2]) == sorted(SECTIONS.values())
+
+        full = client.get(f"/api/v1/reports/{answered_user}").json()
+        data = dict(events)
+        assert {key: value for key, value in data["summary"].items() if key != "user_id"} == full["summary"]
+        assert all(data[section] == full["detailed_analysis"][section] for section in SECTIONS.values())
+        assert data["integrated_insights"] == full["integrated_insights"]
+
+
+def test_batch_reports_stream_one_line_per_user(client, questions, submit):
+    user_ids = [f"batch-report-{index}" for index in range(3)]
+    for index, user_id in enumerate(user_ids):
+        for test_type in TEST_TYPES:
+            submit(user_id, test_type, questions(test_type), option=index)
+
+    response = client.post("/api/v1/reports/batch", json={"user_ids": user_ids + [user_ids[0]]})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["user_id"] for line in lines) == sorted(user_ids)
+    for line in lines:
+        assert line["report"]["summary"] == client.get(f"/api/v1/reports/{line['user_id']}").json()["summary"]
+
+
+def test_fragments_encode_like_plain_values():
+    value = {"text": fragment("固定敘述"), "items": fragment(["甲", "乙"]), "raw": raw_fragment(b'{"a":1}'), "plain": [1, "二"]}
+    assert orjson.loads(dumps(value)) == {"text": "固定敘述", "items": ["甲", "乙"], "raw": {"a": 1}, "plain": [1, "二"]}
+    assert fragment("固定敘述") is fragment("固定敘述")
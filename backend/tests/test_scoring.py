@@ -0,0 +1,208 @@
+import asyncio
+
+import pytest
+
+from app.core.database import create_indexes, get_connection
+from app.repositories import answers as answer_repo
+from app.repositories.answer_versions import load_answer_versions
+from app.services.analysis import PersonalityAnalyzer
+from app.services.batch_scoring import score_users
+from app.services.question_bank import question_bank
+from app.services.scoring import (
+    MBTI_TARGETS,
+    SCORING_DIMENSIONS,
+    USER_ANSWERS_QUERY,
+    get_scoring_table,
+    load_dimension_scores,
+    normalize_test_type,
+    score_rows,
+    score_user,
+)
+
+TEST_TYPES = ("MBTI", "DISC", "BIG5", "enneagram")
+
+
+def _reference_scores(test_type, answers):
+    """逐題以選項索引與權重計分（計分表取代的原始做法）"""
+    scores = {dimension: 0.0 for dimension in SCORING_DIMENSIONS[test_type]}
+    for question, answer in answers:
+        if test_type == "MBTI":
+            if question.category not in MBTI_TARGETS:
+                continue
+            dimension = MBTI_TARGETS[question.category][1 if question.is_reverse else 0]
+        else:
+            dimension = question.category
+        if dimension in scores:
+            scores[dimension] += question.weight[question.options.index(answer)]
+    return scores
+
+
+def _aggregate_and_rescan(user_id):
+    table = get_scoring_table()
+    with get_connection() as conn:
+        aggregate = load_dimension_scores(conn, user_id, table)
+        rescan = score_rows(user_id, conn.execute(USER_ANSWERS_QUERY, (user_id,)).fetchall(), table)
+    return aggregate, rescan
+
+
+def _assert_equal(aggregate, rescan):
+    assert aggregate is not None
+    assert aggregate.counts == rescan.counts
+    assert aggregate.totals == pytest.approx(rescan.totals)
+
+
+@pytest.mark.parametrize("test_type", TEST_TYPES)
+def test_scoring_table_matches_reference_scores(client, test_type):
+    answers = [(question, question.options[question.id % len(question.options)]) for question in question_bank.by_type(test_type)]
+    rows = [(question.id, answer) for question, answer in answers]
+    # 不在選項中的答案不計分
+    rows.append((answers[0][0].id, "不存在的選項"))
+
+    assert get_scoring_table().score(rows, test_type) == pytest.approx(_reference_scores(test_type, answers))
+
+
+def test_score_user_scores_every_test_in_one_pass(client, user_id, questions, submit):
+    answered = {}
+    for test_type in ("MBTI", "DISC", "BIG5"):
+        answered[test_type] = questions(test_type)
+        submit(user_id, test_type, answered[test_type], option=lambda q: q["id"] % len(q["options"]))
+
+    result = score_user(user_id)
+    for test_type, submitted in answered.items():
+        answers = [(question_bank.get(q["id"]), q["options"][q["id"] % len(q["options"])]) for q in submitted]
+        assert result.scores(test_type) == pytest.approx(_reference_scores(test_type, answers))
+    assert sum(result.answer_counts("enneagram").values()) == 0
+    assert result.scores("BIG5") == result.big5
+
+
+def _big5_answers(score):
+    """每題選擇計分為 score（1–5）的選項"""
+    return [(question.id, question.options[question.weight.index(score)]) for question in question_bank.by_type("BIG5")]
+
+
+@pytest.mark.parametrize("score, level, profile", [(1, "低", "情緒穩定"), (5, "高", "富有創意和想像力")])
+def test_legacy_big5_levels_use_the_answer_scale(client, score, level, profile):
+    analysis = PersonalityAnalyzer().analyze_big5("big5-scale", score_rows("big5-scale", _big5_answers(score)))
+
+    assert all(0 <= analysis[trait] <= 1 for trait in ("openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism"))
+    assert analysis["description"].split("、") == [f"{trait}{level}" for trait in ("開放性", "盡責性", "外向性", "親和性", "神經質")]
+    assert profile in analysis["personality_profile"]
+
+
+def test_normalize_test_type():
+    assert [normalize_test_type(name) for name in ("Big5", "mbti", "Enneagram", "DISC")] == ["BIG5", "MBTI", "enneagram", "DISC"]
+
+
+def test_batch_scorer_matches_single_user_scoring(client, questions, submit):
+    user_ids = [f"batch-score-{index}" for index in range(3)]
+    for index, user_id in enumerate(user_ids):
+        for test_type in TEST_TYPES:
+            submit(user_id, test_type, questions(test_type), option=index % 4)
+
+    batch = score_users(user_ids + ["batch-score-nobody"])
+    for user_id in user_ids:
+        single = score_user(user_id)
+        result = batch.result(user_id)
+        assert result.counts == single.counts
+        assert result.totals == pytest.approx(single.totals)
+    assert sum(batch.result("batch-score-nobody").counts) == 0
+
+
+def test_aggregate_matches_rescan_after_writes(client, user_id, questions, submit):
+    for test_type in TEST_TYPES:
+        submit(user_id, test_type, questions(test_type), option=lambda q: q["id"] % len(q["options"]))
+
+    _assert_equal(*_aggregate_and_rescan(user_id))
+
+
+def test_aggregate_matches_rescan_after_replacing_answers(client, user_id, questions, submit):
+    mbti = questions("MBTI")
+    session_id = client.post("/api/v1/sessions/create", json={
+        "user_id": user_id, "test_type": "MBTI", "question_ids": [q["id"] for q in mbti]
+    }).json()["session_id"]
+
+    submit(user_id, "MBTI", mbti, option=0, session_id=session_id)
+    # 同一 session 重新作答會取代先前的答案，累計分數需扣除舊答案
+    submit(user_id, "MBTI", mbti[:10], option=1, session_id=session_id)
+    response = client.post("/api/v1/answers/", json={
+        "user_id": user_id, "question_id": mbti[0]["id"], "answer": mbti[0]["options"][2], "session_id": session_id
+    })
+    assert response.status_code == 200
+    # 不同 session 的答案累加
+    submit(user_id, "MBTI", mbti[:5], option=3)
+
+    aggregate, rescan = _aggregate_and_rescan(user_id)
+    _assert_equal(aggregate, rescan)
+    assert sum(rescan.answer_counts("MBTI").values()) > 0
+
+
+def test_delete_answers_resets_aggregate(client, user_id, questions, submit):
+    submit(user_id, "DISC", questions("DISC"))
+    assert client.delete(f"/api/v1/answers/{user_id}").json()["deleted_count"] == 30
+
+    aggregate, rescan = _aggregate_and_rescan(user_id)
+    assert rescan.counts == (0,) * len(rescan.counts)
+    assert aggregate is None or aggregate.counts == rescan.counts
+
+
+def test_answer_versions_bump_per_test_type(client, user_id, questions, submit):
+    with get_connection() as conn:
+        assert load_answer_versions(conn, user_id) == {}
+
+    submit(user_id, "MBTI", questions("MBTI"))
+    submit(user_id, "MBTI", questions("MBTI")[:3])
+    submit(user_id, "DISC", questions("DISC"))
+    with get_connection() as conn:
+        versions = load_answer_versions(conn, user_id)
+    assert versions == {"MBTI": 2, "DISC": 1}
+
+    client.delete(f"/api/v1/answers/{user_id}")
+    with get_connection() as conn:
+        after_delete = load_answer_versions(conn, user_id)
+    # 刪除後所有測驗的版本都會改變（包含尚未作答的測驗）
+    assert all(after_delete[test_type] > versions.get(test_type, 0) for test_type in after_delete)
+    assert {"MBTI", "DISC", "BIG5"} <= set(after_delete)
+
+
+def test_concurrent_reanswers_keep_one_row_per_session_question(client, user_id, questions, run):
+    question = questions("DISC")[0]
+    session_id = client.post("/api/v1/sessions/create", json={"user_id": user_id, "test_type": "DISC"}).json()["session_id"]
+    score_user(user_id)  # 先建立累計分數，並行寫入時以分數變化累加
+
+    async def reanswer_concurrently():
+        for _ in range(20):
+            await asyncio.gather(*(
+                answer_repo.insert_answers(user_id, [(question["id"], question["options"][index])], session_id)
+                for index in range(4)
+            ))
+
+    run(reanswer_concurrently)
+    with get_connection() as conn:
+        rows = conn.execute(
+            "SELECT COUNT(*) FROM test_answer WHERE session_id = ? AND question_id = ?", (session_id, question["id"])
+        ).fetchone()[0]
+    assert rows == 1
+    _assert_equal(*_aggregate_and_rescan(user_id))
+
+
+def test_index_migration_removes_duplicate_session_answers(client, user_id, questions):
+    question = questions("DISC")[0]
+    session_id = client.post("/api/v1/sessions/create", json={"user_id": user_id, "test_type": "DISC"}).json()["session_id"]
+    with get_connection() as conn:
+        conn.execute("DROP INDEX ux_test_answer_session_question")
+        conn.executemany(
+            "INSERT INTO test_answer (user_id, question_id, answer, session_id, created_at) VALUES (?, ?, ?, ?, datetime('now'))",
+            [(user_id, question["id"], answer, session_id) for answer in question["options"][:3]]
+        )
+        conn.commit()
+        version = load_answer_versions(conn, user_id).get("DISC", 0)
+
+        assert "ux_test_answer_session_question" in create_indexes(conn)
+        answers = conn.execute(
+            "SELECT answer FROM test_answer WHERE session_id = ? AND question_id = ?", (session_id, question["id"])
+        ).fetchall()
+        assert answers == [(question["options"][2],)]
+        assert load_answer_versions(conn, user_id)["DISC"] == version + 1
+        assert load_dimension_scores(conn, user_id, get_scoring_table()) is None
+    score_user(user_id)  # 讀取時重建累計分數
+    _assert_equal(*_aggregate_and_rescan(user_id))
@@ -0,0 +1,73 @@
+from app.core.database import get_connection
+from app.repositories import sessions as session_repo
+from app.services.session_timer import SessionTimeBuffer, session_time_buffer
+
+
+def _create_session(client, user_id, test_type="MBTI"):
+    response = client.post("/api/v1/sessions/create", json={"user_id": user_id, "test_type": test_type})
+    assert response.status_code == 200
+    return response.json()
+
+
+def _stored_time(session_id):
+    with get_connection() as conn:
+        return conn.execute("SELECT total_time_seconds, status FROM test_session WHERE id = ?", (session_id,)).fetchone()
+
+
+def test_session_questions_are_normalized(client, user_id, submit):
+    session = _create_session(client, user_id)
+    with get_connection() as conn:
+        rows = conn.execute(
+            "SELECT question_id FROM session_question WHERE session_id = ? ORDER BY position", (session["session_id"],)
+        ).fetchall()
+    assert [row[0] for row in rows] == session["question_ids"]
+
+    questions = [{"id": qid, "options": ["A", "B", "C", "D", "E"]} for qid in session["question_ids"][:4]]
+    submit(user_id, "MBTI", questions, session_id=session["session_id"])
+    latest = client.get(f"/api/v1/sessions/{user_id}/MBTI/latest").json()
+    assert latest["answered_count"] == 4
+    assert latest["next_question_index"] == 4
+    assert latest["remaining_questions"] == session["question_ids"][4:]
+
+
+def test_heartbeats_are_buffered_until_flush(client, user_id, run):
+    session_id = _create_session(client, user_id)["session_id"]
+    for elapsed in (5, 10, 15):
+        assert client.post(f"/api/v1/sessions/{session_id}/update-time", json={"elapsed_seconds": elapsed}).status_code == 200
+
+    run(session_time_buffer.flush)
+    assert _stored_time(session_id) == (15, "in_progress")
+
+
+def test_pause_flushes_the_latest_heartbeat(client, user_id):
+    session_id = _create_session(client, user_id)["session_id"]
+    client.post(f"/api/v1/sessions/{session_id}/update-time", json={"elapsed_seconds": 42})
+    paused = client.post(f"/api/v1/sessions/{session_id}/pause").json()
+    assert paused["total_time_seconds"] == 42
+
+
+def test_late_flush_does_not_overwrite_finished_sessions(client, user_id, run):
+    session_id = _create_session(client, user_id)["session_id"]
+    # 另一個 worker 的緩衝：在 session 結束前記錄、結束後才寫入
+    other_worker = SessionTimeBuffer()
+    run(other_worker.record, session_id, 30)
+    finished = client.post(f"/api/v1/sessions/{session_id}/finish", json={"elapsed_seconds": 60}).json()
+    assert finished["total_time_seconds"] == 60
+
+    run(other_worker.flush)
+    assert _stored_time(session_id) == (60, "completed")
+
+    run(session_repo.store_session_times, [(session_id, 5)])
+    assert _stored_time(session_id) == (60, "completed")
+
+
+def test_time_updates_to_paused_sessions_are_rejected(client, user_id, run):
+    session_id = _create_session(client, user_id)["session_id"]
+    client.post(f"/api/v1/sessions/{session_id}/pause", json={"elapsed_seconds": 20})
+
+    response = client.post(f"/api/v1/sessions/{session_id}/update-time", json={"elapsed_seconds": 25})
+    assert response.status_code == 409
+    run(session_time_buffer.flush)
+    assert _stored_time(session_id) == (20, "paused")
+
+    assert client.post("/api/v1/sessions/999999999/update-time", json={"elapsed_seconds": 1}).status_code == 404